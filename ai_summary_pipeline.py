@@ -1,70 +1,236 @@
 import os
 import pandas as pd
-import csv
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from processing.data_extractor import DataExtractor
 from processing.data_classifier import DataClassifier
-from summarization.summarizerAgent import generate_summary, classify_document
-from summarization.evaluate_rouge import evaluate_summary_with_original
-from scraping.huggingface_automatic_scraping import update_csv_from_huggingface
-from scraping.reddit_scraping import update_csv_from_reddit
+from processing.failures import CONFIGURATION, ConfigurationError, ParseError, classify_failure
+from processing.pdf_extractor import extract_pdf_text
+from processing.staged_pipeline import Job, Stage, StagedPipeline
+from summarization.summarizerAgent import generate_summary, classify_document, classify_and_summarize, print_llm_stats
+from summarization.evaluate_rouge import score_batch
+from summarization.compression import compress_text
+from scraping.huggingface_automatic_scraping import update_store_from_huggingface
+from scraping.reddit_scraping import update_store_from_reddit
+from storage.summary_store import SummaryStore
+from storage.journal import DocumentJournal, journal_path
 
 # Constants for configuration
 SCRAP_REDDIT=True
 SCRAP_HUGGINGFACE=True
 INPUT_FILE = "./output/new_summaries.csv"
+STORE_PATH = "./output/summaries.sqlite"  # tracked documents; INPUT_FILE is imported into it on first run
+EXPORT_AFTER_RUN = False  # also rewrite INPUT_FILE from the store at the end of each run
 # INPUT_FILE = "./output/AI takeaways benchmark.csv" ##used for evaluation only
 CALCULATE_ROUGE = False  # used for evaluation only
 HUGGINGFACE_MAIN_PAGE_ID = "week/2025-W12" # month/2025-03 for March 2025 or week/2025-W12 for week 12 of 2025
-headers = ['Reception date','Link','Review priority','Category (Illuin)','Category AI','Status','Reviewed','Topic / Keywords (Illuin)','Topic / Keywords AI','Take-away (Illuin)','Take-away AI','rouge1 precision','rouge2 precision','rougeL precision']
+MAX_WORKERS = 8  # number of documents processed concurrently (1 = sequential)
+DEFAULT_MAX_PER_HOST = 4  # concurrent documents allowed per host when not listed below
+MAX_PER_HOST = {
+    "arxiv.org": 2,  # arXiv asks API clients to stay polite
+    "github.com": 4,
+    "huggingface.co": 4,
+    "api.openai.com": 8,
+}
+LLM_HOST = "api.openai.com"
+SUMMARY_MODE = "combined"  # "combined": category, take-away and keywords in one LLM call; "separate": two calls
+COMPRESS_CONTENT = False  # keep only the top-ranked sentences (no references/appendix) before the LLM calls
+USE_LLM_CACHE = True  # False to send every document to the LLM again (results still refresh the cache)
+# Staged pipeline (main): discover -> fetch -> parse -> summarize -> persist, connected by bounded queues
+FETCH_WORKERS = 8  # threads downloading documents (still capped per host by MAX_PER_HOST)
+PARSE_PROCESSES = os.cpu_count() or 1  # processes parsing PDFs
+SUMMARY_WORKERS = 8  # threads waiting on LLM calls
+QUEUE_SIZE = 16  # documents waiting between two stages before the upstream stage blocks
 #automatic scraping
-def scrape_data():
-    # Create file Headers
-    new_file = 0
-    with open(INPUT_FILE, mode='r', newline='') as file:
-        reader = csv.reader(file)
-        if next(reader,None) == None:
-            new_file = 1
-    
-    if new_file:
-        with open(INPUT_FILE, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(headers)
-
+def scrape_data(store):
+    # New links are inserted in the store; links already tracked are skipped
     if SCRAP_HUGGINGFACE:
-        update_csv_from_huggingface(INPUT_FILE, max_papers=20, main_page_id=HUGGINGFACE_MAIN_PAGE_ID)
+        update_store_from_huggingface(store, max_papers=20, main_page_id=HUGGINGFACE_MAIN_PAGE_ID)
 
     if SCRAP_REDDIT:
-        update_csv_from_reddit(INPUT_FILE)
+        update_store_from_reddit(store)
+
+class HostLimiter:
+    """Caps how many documents hit the same host at the same time."""
+
+    def __init__(self, limits=None, default_limit=DEFAULT_MAX_PER_HOST):
+        self.limits = MAX_PER_HOST if limits is None else limits
+        self.default_limit = default_limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host):
+        host = urlparse(url_or_host).netloc or url_or_host
+        host = host.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                # Subdomains share the budget of their parent entry (export.arxiv.org -> arxiv.org)
+                limit = next((value for key, value in self.limits.items()
+                              if host == key or host.endswith("." + key)), self.default_limit)
+                self._semaphores[host] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[host]
+
+    @contextmanager
+    def limit(self, url_or_host):
+        with self._semaphore(self.host_of(url_or_host)):
+            yield
 
 # Function to process a document
-def process_document(row, extractor, classifier):
+def process_document(row, extractor, classifier, host_limiter=None, summary_mode=SUMMARY_MODE, job=None):
+    """
+    Extracts and summarizes one row. job (optional Job): its failed_stage follows the step in progress
+    ("fetch", "parse", "summarize"), the same steps as the staged pipeline, to classify a failure.
+    """
     url_or_id = row["Link"]
+    host_limiter = host_limiter or HostLimiter()
+    job = job or Job(url_or_id)
     print(f"Processing document: {url_or_id}")
-    data = extractor.extract(url_or_id).to_dict()
-    category_ai, _ = classify_document(data)
+    job.failed_stage = "fetch"
+    with host_limiter.limit(url_or_id):
+        fetched = extractor.fetch(url_or_id)
+    job.failed_stage = "parse"
+    data = extractor.parse(fetched).to_dict()
+    job.failed_stage = "summarize"
+    result = summarize_document(data, classifier, host_limiter, summary_mode)
+    job.failed_stage = None
+    return result
+
+def summarize_document(data, classifier, host_limiter, summary_mode=SUMMARY_MODE):
+    """LLM part of process_document: returns (category, take-away, keywords) for extracted data."""
+    if not (data.get("content") or "").strip():
+        # e.g. a scanned PDF: nothing to summarize, do not spend tokens on it
+        raise ParseError("No text could be extracted from the document")
+    if COMPRESS_CONTENT and data.get("content"):
+        data["content"] = compress_text(data["content"])
+    # Models, datasets and libraries recognised from their metadata need no LLM classification
+    certain_category = classifier.certain_category(data)
+    if summary_mode == "combined":
+        with host_limiter.limit(LLM_HOST):
+            (category_ai, take_away_ai, keywords_ai), _ = classify_and_summarize(data, use_cache=USE_LLM_CACHE)
+        category_ai = certain_category or category_ai
+        print(f"Detected AI category: {category_ai}")
+        print(f"Generated AI Take-away.")
+        return category_ai, take_away_ai, ", ".join(keywords_ai)
+
+    if certain_category:
+        category_ai = certain_category
+    else:
+        with host_limiter.limit(LLM_HOST):
+            category_ai, _ = classify_document(data, use_cache=USE_LLM_CACHE)
     print(f"Detected AI category: {category_ai}")
-    take_away_ai, _ = generate_summary(data)
+    with host_limiter.limit(LLM_HOST):
+        take_away_ai, _ = generate_summary(data, use_cache=USE_LLM_CACHE)
     print(f"Generated AI Take-away.")
 
-    return category_ai, take_away_ai
+    return category_ai, take_away_ai, ""
+
+def _run_document(row, extractor, classifier, host_limiter, summary_mode):
+    """Returns (result, error, failed stage) so that a failing row never breaks the worker pool."""
+    job = Job(row["Link"])
+    try:
+        return process_document(row, extractor, classifier, host_limiter, summary_mode, job=job), None, None
+    except Exception as e:
+        return None, e, job.failed_stage
+
+def _record_failure(checkpoint, link, error, stage=None):
+    """
+    Reports a failed document and records it (failure kind, attempts and next retry in a SummaryStore).
+    Returns the failure kind.
+    """
+    print(f"Error processing {link}: {error}")
+    outcome = checkpoint.record_failure(link, error, stage) if checkpoint is not None else None
+    if outcome is None:
+        return classify_failure(error, stage)
+    kind, attempts, retry_at = outcome
+    if kind == CONFIGURATION:
+        print(f"🔑 {link}: configuration error (API key, model), not counted as an attempt")
+    elif retry_at is None:
+        print(f"🪦 {link}: {kind} failure after {attempts} attempts, moved to the dead-letter table")
+    else:
+        print(f"⏳ {link}: {kind} failure (attempt {attempts}), next retry after "
+              f"{datetime.fromtimestamp(retry_at):%d/%m/%Y %H:%M}")
+    return kind
+
+def _abort(error):
+    """A rejected API key or an unknown model would fail every remaining document: stop the run."""
+    return ConfigurationError(f"Run aborted, fix the configuration and run again: {error}")
+
+def _document_values(result, error):
+    """Columns written back for one document: AI results, or the error in the status."""
+    if error is not None:
+        return {"Status": f"Error: {error}"}
+    category_ai, take_away_ai, keywords_ai = result
+    values = {"Category AI": category_ai, "Status": "Processed", "Take-away AI": take_away_ai}
+    if keywords_ai:
+        values["Topic / Keywords AI"] = keywords_ai
+    return values
 
 # Function to process multiple documents in the dataframe
-def process_documents(df, extractor, classifier):
+def process_documents(df, extractor, classifier, max_workers=MAX_WORKERS, host_limiter=None, summary_mode=SUMMARY_MODE, checkpoint=None):
+    """
+    Summarizes the rows without AI take-away. Each document is written to the dataframe as soon as it
+    finishes and, with a checkpoint (SummaryStore or DocumentJournal), durably committed right away,
+    so an interrupted run keeps every completed document.
+    Raises ConfigurationError on a rejected API key or unknown model; documents not started stay pending.
+    """
     df_to_process = df[df["Take-away AI"].isna() | df["Take-away AI"].eq("")]
     if df_to_process.empty:
         print("No new documents to process.")
+        return df
+    print(f"Processing {len(df_to_process)} documents with {max_workers} worker(s) in {summary_mode} mode...")
+
+    # Columns that are still empty are read back as float: make room for text results
+    for column in ("Category AI", "Status", "Take-away AI", "Topic / Keywords AI"):
+        df[column] = df[column].astype(object)
+
+    def commit(index, outcome):
+        """Writes one document back; returns the configuration error that must stop the run, if any."""
+        # Rows are addressed by index, so the output does not depend on completion order
+        result, error, stage = outcome
+        link = df.at[index, "Link"]
+        values = _document_values(result, error)
+        for column, value in values.items():
+            df.at[index, column] = value
+        if error is not None:
+            if _record_failure(checkpoint, link, error, stage) == CONFIGURATION:
+                return error
+        elif checkpoint is not None:
+            checkpoint.upsert(link, values)
+        return None
+
+    host_limiter = host_limiter or HostLimiter()
+    rows = list(df_to_process.iterrows())
+    configuration_error = None
+    if max_workers <= 1:
+        for index, row in rows:
+            configuration_error = commit(index, _run_document(row, extractor, classifier, host_limiter, summary_mode))
+            if configuration_error is not None:
+                break
     else:
-        print(f"Processing {len(df_to_process)} documents...")
-    for index, row in df_to_process.iterrows():
-        try:
-            category_ai, take_away_ai = process_document(row, extractor, classifier)
-            df.at[index, "Category AI"] = category_ai
-            df.at[index, "Status"] = "Processed"
-            df.at[index, "Take-away AI"] = take_away_ai
-        except Exception as e:
-            print(f"Error processing {row['Link']}: {e}")
-            df.at[index, "Status"] = f"Error: {e}"
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_run_document, row, extractor, classifier, host_limiter, summary_mode): index
+                for index, row in rows
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                error = commit(futures[future], future.result())
+                if error is not None and configuration_error is None:
+                    configuration_error = error
+                    # Documents not started yet stay pending, those already running are still committed
+                    for other in futures:
+                        other.cancel()
 
+    if configuration_error is not None:
+        raise _abort(configuration_error) from configuration_error
     return df
 
 def calculate_rouge_scores(df):
@@ -76,10 +242,10 @@ def calculate_rouge_scores(df):
         print("No ROUGE scores to calculate.")
     else:
         print(f"{len(df_to_evaluate)} entries need ROUGE scores.")
-        for index, row in df_to_evaluate.iterrows():
-            if pd.isna(row["Take-away AI"]) or pd.isna(row["Take-away (Illuin)"]):
-                continue
-            rouge_scores = evaluate_summary_with_original(row["Take-away AI"], row["Take-away (Illuin)"])
+        df_to_evaluate = df_to_evaluate[df_to_evaluate["Take-away (Illuin)"].notna()]
+        # One batch call: each reference take-away is tokenized and stemmed only once
+        all_scores = score_batch(df_to_evaluate["Take-away AI"].tolist(), df_to_evaluate["Take-away (Illuin)"].tolist())
+        for index, rouge_scores in zip(df_to_evaluate.index, all_scores):
             df.at[index, "rouge1 precision"] = round(float(rouge_scores["rouge1_precision"]), 4)
             df.at[index, "rouge2 precision"] = round(float(rouge_scores["rouge2_precision"]), 4)
             df.at[index, "rougeL precision"] = round(float(rouge_scores["rougeL_precision"]), 4)
@@ -88,29 +254,164 @@ def calculate_rouge_scores(df):
     return df
 
 ### Generating the AI Summaries
-def generate_summaries(input_file=INPUT_FILE, calculate_rouge=CALCULATE_ROUGE):
-    """Main function to process and summarize documents."""
-    if os.path.exists(input_file):
+def generate_summaries(input_file=INPUT_FILE, calculate_rouge=CALCULATE_ROUGE, max_workers=MAX_WORKERS, summary_mode=SUMMARY_MODE, extractor=None, store=None):
+    """
+    Main function to process and summarize documents (extractor: optional DataExtractor, e.g. for replayed benchmarks).
+    With a SummaryStore, only the pending documents are loaded and each result is committed to the store
+    as soon as the document finishes. Otherwise input_file is read as a whole, each result is appended to
+    its journal (replayed here after an interrupted run) and the caller writes it back with save_summaries.
+    """
+    if store is not None:
+        # Dead letters and failures waiting for their next retry are left out
+        df = store.pending()
+        checkpoint = store
+    elif os.path.exists(input_file):
         df = pd.read_csv(input_file)
+        checkpoint = DocumentJournal(journal_path(input_file))
+        restored = checkpoint.apply(df)
+        if restored:
+            print(f"♻️ Resumed {restored} documents from {checkpoint.path}")
     else:
         raise FileNotFoundError(f"File not found: {input_file}")
 
-    extractor = DataExtractor()
+    extractor = extractor or DataExtractor()
     classifier = DataClassifier()
 
-    df = process_documents(df, extractor, classifier)
+    try:
+        df = process_documents(df, extractor, classifier, max_workers=max_workers, summary_mode=summary_mode,
+                               checkpoint=checkpoint)
+    finally:
+        if store is None:
+            checkpoint.close()
+    extractor.http.print_stats()
+    print_llm_stats()
 
     if calculate_rouge:
+        if store is not None:
+            # ROUGE needs the already processed rows too
+            df = store.to_dataframe()
         df = calculate_rouge_scores(df)
+        if store is not None:
+            store.save_dataframe(df)
 
     return df
 
+def discover_documents(store):
+    """Discover stage: pending documents already tracked first, then the new ones found by the scrapers."""
+    seen = set()
+
+    def pending():
+        for link in store.pending()["Link"]:
+            if link not in seen:
+                seen.add(link)
+                yield Job(link)
+
+    yield from pending()
+    scrape_data(store)
+    yield from pending()
+
+def run_staged_pipeline(store, jobs=None, extractor=None, summary_mode=SUMMARY_MODE, fetch_workers=FETCH_WORKERS,
+                        parse_processes=PARSE_PROCESSES, summary_workers=SUMMARY_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    Processes documents through stages connected by bounded queues, so that downloads, PDF parsing
+    and LLM calls of different documents overlap:
+    discover (scrapers + pending rows) -> fetch (threads) -> parse (threads handing PDFs to a process pool)
+    -> summarize (threads) -> persist (one writer committing each document to the store).
+
+    jobs: iterable of Job to process instead of discover_documents(store).
+    Returns the per-stage metrics (throughput, busy ratio, queue depth, time blocked on a full queue).
+    Raises ConfigurationError on a rejected API key or unknown model: discovery stops, the queued
+    documents are skipped and stay pending.
+    """
+    extractor = extractor or DataExtractor()
+    classifier = DataClassifier()
+    host_limiter = HostLimiter()
+    aborted = []  # configuration error that stopped the run
+
+    def until_aborted(jobs):
+        for job in jobs:
+            if aborted:
+                break
+            yield job
+
+    def check_aborted():
+        if aborted:
+            raise ConfigurationError("Run aborted")
+
+    def fetch(job):
+        check_aborted()
+        print(f"Processing document: {job.link}")
+        with host_limiter.limit(job.link):
+            job.fetched = extractor.fetch(job.link)
+
+    def summarize(job):
+        check_aborted()
+        job.result = summarize_document(job.data, classifier, host_limiter, summary_mode)
+        job.data = None
+
+    def persist(job):
+        if aborted and isinstance(job.error, ConfigurationError):
+            return  # skipped after the abort, left pending
+        if job.error is not None:
+            if _record_failure(store, job.link, job.error, job.failed_stage) == CONFIGURATION:
+                aborted.append(job.error)
+        else:
+            store.upsert(job.link, _document_values(job.result, None))
+
+    with ProcessPoolExecutor(max_workers=parse_processes) as pool:
+        def parse_pdf(pdf_bytes, max_pages=None, max_chars=None):
+            # Single-process extraction inside the worker: the pool already spreads documents
+            return pool.submit(extract_pdf_text, pdf_bytes, max_pages, max_chars, max_workers=1).result()
+
+        def parse(job):
+            check_aborted()
+            job.data = extractor.parse(job.fetched, pdf_parser=parse_pdf).to_dict()
+            job.fetched = None  # release the downloaded PDF / HTML
+
+        pipeline = StagedPipeline([
+            Stage("fetch", fetch, fetch_workers, queue_size),
+            Stage("parse", parse, parse_processes, queue_size),
+            Stage("summarize", summarize, summary_workers, queue_size),
+            Stage("persist", persist, 1, queue_size, always=True),
+        ])
+        metrics = pipeline.run(until_aborted(discover_documents(store) if jobs is None else jobs))
+
+    pipeline.print_metrics(metrics)
+    extractor.http.print_stats()
+    print_llm_stats()
+    if aborted:
+        raise _abort(aborted[0]) from aborted[0]
+    return metrics
+
+def save_summaries(df, output_file=INPUT_FILE):
+    """Writes the CSV atomically, then drops the journal whose results it now contains."""
+    temporary_file = f"{output_file}.tmp"
+    df.to_csv(temporary_file, index=False)
+    os.replace(temporary_file, output_file)
+    DocumentJournal(journal_path(output_file)).clear()
+
 def main():
     """Main execution flow for scraping, processing, and saving results."""
-    scrape_data()
-    df = generate_summaries(INPUT_FILE)
-    df.to_csv(INPUT_FILE, index=False)
-    print("✅ Update complete! File saved.")
+    store = SummaryStore(STORE_PATH)
+    if store.count() == 0 and os.path.exists(INPUT_FILE):
+        print(f"📥 Importing {INPUT_FILE}: {store.import_csv(INPUT_FILE)} rows.")
+
+    # Scraping runs as the first stage, so already pending documents start processing right away
+    try:
+        run_staged_pipeline(store)
+    except ConfigurationError as e:
+        print(f"❌ {e}")
+        store.close()
+        return
+    if CALCULATE_ROUGE:
+        store.save_dataframe(calculate_rouge_scores(store.to_dataframe()))
+
+    if EXPORT_AFTER_RUN:
+        store.export(INPUT_FILE)
+        print(f"✅ Update complete! Exported to {INPUT_FILE}.")
+    else:
+        print(f"✅ Update complete! Export with: python -m storage.summary_store export {INPUT_FILE}")
+    store.close()
 
 
 if __name__ == "__main__":
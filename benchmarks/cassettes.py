@@ -0,0 +1,223 @@
+"""
+Cassettes HTTP : enregistrement puis rejeu déterministe des réponses réseau du pipeline.
+
+Une cassette est un dossier contenant un index JSON Lines (une réponse par ligne : requête,
+statut, en-têtes, durée mesurée) et les corps de réponse rangés par empreinte SHA-256,
+comme le cache HTTP. Deux points d'interception :
+- CassetteAdapter, monté sur la session requests de HttpClient (arXiv, GitHub, Hugging Face, blogs)
+- CassetteTransport, transport httpx des clients OpenAI (summarizerAgent.LLM_HTTP_TRANSPORT)
+SampleAdapter remplace le réseau par des pages sauvegardées pour enregistrer une cassette hors ligne.
+
+En enregistrement, les requêtes partent sur le réseau et les réponses sont ajoutées à la
+cassette ; en rejeu, elles sont servies depuis la cassette (après la durée enregistrée si
+replay_latency est activé) et une requête absente lève CassetteMiss.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+RECORD = "record"
+REPLAY = "replay"
+
+# En-têtes de requête qui changent la réponse (ex: README brut GitHub) ; les autres sont ignorés
+KEY_HEADERS = ("accept",)
+# En-têtes de transport sans objet pour une réponse rejouée
+SKIPPED_RESPONSE_HEADERS = ("content-encoding", "transfer-encoding", "connection", "content-length")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Requête absente de la cassette rejouée."""
+
+
+class Cassette:
+    """Réponses enregistrées, indexées par (méthode, URL, en-têtes significatifs, corps de la requête)."""
+
+    def __init__(self, directory, mode=REPLAY, replay_latency=True):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Mode de cassette inconnu : {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self._lock = threading.Lock()
+        self._entries = {}  # clé -> réponses enregistrées, dans l'ordre
+        self._served = {}  # clé -> nombre de réponses déjà rejouées
+        self.timings = []  # (URL, secondes) de chaque requête servie, latence rejouée comprise
+        self.misses = []
+
+        if mode == REPLAY and not os.path.exists(self.index_path):
+            raise FileNotFoundError(f"Cassette introuvable : {self.index_path} (lancer d'abord l'enregistrement)")
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        if mode == RECORD:
+            # Un nouvel enregistrement remplace le précédent
+            open(self.index_path, "w").close()
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+
+    @staticmethod
+    def make_key(method, url, headers=None, body=b""):
+        significant = sorted((name.lower(), value) for name, value in (headers or {}).items()
+                             if name.lower() in KEY_HEADERS)
+        body_hash = hashlib.sha256(body or b"").hexdigest()
+        raw = json.dumps([method.upper(), url, significant, body_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, "bodies", body_hash)
+
+    def record(self, key, method, url, status, headers, body, seconds):
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+        entry = {
+            "key": key, "method": method, "url": url, "status": status, "body": body_hash, "seconds": seconds,
+            "headers": {name: value for name, value in headers.items()
+                        if name.lower() not in SKIPPED_RESPONSE_HEADERS},
+        }
+        with self._lock:
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(body)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries.setdefault(key, []).append(entry)
+            self.timings.append((url, seconds))
+
+    def play(self, key, url):
+        """
+        Réponse enregistrée pour cette clé : les réponses successives d'une même requête
+        sont rejouées dans l'ordre, la dernière étant répétée ensuite.
+
+        Returns:
+            tuple: (statut, en-têtes, corps)
+        """
+        start = time.perf_counter()
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses.append(url)
+                raise CassetteMiss(f"Requête absente de la cassette : {url}")
+            position = self._served.get(key, 0)
+            self._served[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+        if self.replay_latency:
+            time.sleep(entry["seconds"])
+        with open(self._body_path(entry["body"]), "rb") as f:
+            body = f.read()
+        with self._lock:
+            self.timings.append((url, time.perf_counter() - start))
+        return entry["status"], entry["headers"], body
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+
+class CassetteAdapter(BaseAdapter):
+    """Adaptateur requests : enregistre ou rejoue les réponses de la session HttpClient."""
+
+    def __init__(self, cassette, network=None):
+        super().__init__()
+        self.cassette = cassette
+        self._network = (network or HTTPAdapter()) if cassette.mode == RECORD else None
+
+    def send(self, request, **kwargs):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else (request.body or b"")
+        key = Cassette.make_key(request.method, request.url, request.headers, body)
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            response = self._network.send(request, **kwargs)
+            content = response.content
+            self.cassette.record(key, request.method, request.url, response.status_code, response.headers,
+                                 content, time.perf_counter() - start)
+            return response
+
+        status, headers, content = self.cassette.play(key, request.url)
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response.headers = CaseInsensitiveDict(headers)
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        if self._network is not None:
+            self._network.close()
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Transport httpx : enregistre ou rejoue les réponses de l'API chat-completions."""
+
+    def __init__(self, cassette):
+        self.cassette = cassette
+        self._network = httpx.HTTPTransport() if cassette.mode == RECORD else None
+
+    def handle_request(self, request):
+        body = request.read()
+        url = str(request.url)
+        key = Cassette.make_key(request.method, url, request.headers, body)
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            response = self._network.handle_request(request)
+            content = response.read()
+            self.cassette.record(key, request.method, url, response.status_code, dict(response.headers),
+                                 content, time.perf_counter() - start)
+            headers = [(name, value) for name, value in response.headers.items()
+                       if name.lower() not in SKIPPED_RESPONSE_HEADERS]
+            return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+        status, headers, content = self.cassette.play(key, url)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    def close(self):
+        if self._network is not None:
+            self._network.close()
+
+
+class SampleAdapter(BaseAdapter):
+    """
+    Adaptateur requests servant des pages HTML sauvegardées à la place du réseau. Le manifeste
+    JSON du dossier associe chaque fichier à l'URL d'origine de la page ; les autres URL reçoivent un 404.
+    """
+
+    def __init__(self, directory, manifest="sources.json"):
+        super().__init__()
+        with open(os.path.join(directory, manifest), encoding="utf-8") as f:
+            self.pages = {url: os.path.join(directory, filename) for filename, url in json.load(f).items()}
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        path = self.pages.get(request.url)
+        if path is None:
+            response.status_code = 404
+            response._content = b""
+            return response
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "text/html"})
+        with open(path, "rb") as f:
+            response._content = f.read()
+        return response
+
+    def close(self):
+        pass
+
+
+def mount(cassette, http_client, network=None):
+    """Fait passer toutes les requêtes d'un HttpClient par la cassette (network : adaptateur d'enregistrement)."""
+    # En enregistrement, le pool keep-alive du client reste utilisé
+    adapter = CassetteAdapter(cassette, network or http_client._adapters[0])
+    http_client.session.mount("https://", adapter)
+    http_client.session.mount("http://", adapter)
+    return adapter
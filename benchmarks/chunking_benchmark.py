@@ -0,0 +1,88 @@
+"""
+Gain du résumé par parties (map-reduce) sur les documents longs.
+
+Pour chaque document dont le contenu dépasse le budget de tokens du modèle, résume
+une fois en envoyant le contenu complet (ancien comportement) et une fois avec le
+découpage par sections, puis compare les tokens envoyés et la latence. Les appels
+passent par le LLM configuré (.env.local), sans le cache des résultats.
+    python -m benchmarks.chunking_benchmark --limit 10
+    python -m benchmarks.chunking_benchmark --links https://arxiv.org/abs/2401.16658
+"""
+import argparse
+import time
+
+import pandas as pd
+
+import summarization.chunking as chunking
+import summarization.summarizerAgent as agent
+from processing.data_extractor import DataExtractor
+from summarization.token_counter import count_tokens
+
+BENCHMARK_FILE = "./output/AI takeaways benchmark.csv"
+
+
+def summarize(data, chunked):
+    """Résume un document avec ou sans découpage ; retourne (tokens en entrée, tokens en sortie, secondes, erreur)."""
+    model_name = agent._model_key(True)[1]
+    saved_budgets = dict(chunking.TOKEN_BUDGETS)
+    if not chunked:
+        chunking.TOKEN_BUDGETS[model_name] = float("inf")
+    start = time.perf_counter()
+    try:
+        _, (input_tokens, output_tokens) = agent.generate_summary(data, use_cache=False)
+        return input_tokens, output_tokens, time.perf_counter() - start, None
+    except Exception as e:
+        # Typiquement : dépassement de la fenêtre de contexte en envoyant le document entier
+        return 0, 0, time.perf_counter() - start, e
+    finally:
+        chunking.TOKEN_BUDGETS.clear()
+        chunking.TOKEN_BUDGETS.update(saved_budgets)
+
+
+def run(links):
+    extractor = DataExtractor()
+    model_name = agent._model_key(True)[1]
+    budget = chunking.token_budget(model_name)
+    print(f"Modèle {model_name}, budget {budget} tokens\n")
+    print(f"{'document':50} {'tokens':>8} {'complet':>18} {'par parties':>18} {'gain tokens':>12} {'gain temps':>11}")
+
+    for link in links:
+        try:
+            data = extractor.extract(link).to_dict()
+        except Exception as e:
+            print(f"{link[:50]:50} extraction impossible: {e}")
+            continue
+        document_tokens = count_tokens(data["content"] or "", model_name)
+        if document_tokens <= budget:
+            continue
+
+        full_in, full_out, full_seconds, full_error = summarize(data, chunked=False)
+        chunk_in, chunk_out, chunk_seconds, chunk_error = summarize(data, chunked=True)
+        full_cell = "échec" if full_error else f"{full_in + full_out}t {full_seconds:.1f}s"
+        chunk_cell = "échec" if chunk_error else f"{chunk_in + chunk_out}t {chunk_seconds:.1f}s"
+        if full_error or chunk_error:
+            token_gain = time_gain = "-"
+        else:
+            token_gain = f"{1 - (chunk_in + chunk_out) / (full_in + full_out):.0%}"
+            time_gain = f"{1 - chunk_seconds / full_seconds:.0%}"
+        print(f"{link[:50]:50} {document_tokens:>8} {full_cell:>18} {chunk_cell:>18} {token_gain:>12} {time_gain:>11}")
+        for error in (full_error, chunk_error):
+            if error:
+                print(f"    {error}")
+
+    agent.print_llm_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-file", default=BENCHMARK_FILE)
+    parser.add_argument("--links", nargs="+", help="Documents à tester (par défaut : ceux du fichier d'entrée)")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    links = args.links or pd.read_csv(args.input_file)["Link"].dropna().tolist()
+    run(links[:args.limit])
+
+
+if __name__ == "__main__":
+    main()
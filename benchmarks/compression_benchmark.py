@@ -0,0 +1,115 @@
+"""
+Impact de la compression extractive (summarization/compression.py) sur le jeu de référence.
+
+Extrait les documents de output/AI takeaways benchmark.csv, les compresse un par un comme
+le pipeline (ou en un seul lot avec --batch, IDF calculé sur le lot), puis affiche par document les tokens avant / après et la part du take-away de référence
+(Illuin) encore présente dans le contenu (rappel ROUGE-1 / ROUGE-2), sans appel au LLM.
+Avec --summarize, résume aussi chaque document avec et sans compression et compare
+tokens, latence et ROUGE (précision, comme le pipeline) des take-aways générés.
+    python -m benchmarks.compression_benchmark --limit 20
+    python -m benchmarks.compression_benchmark --limit 10 --summarize
+    python -m benchmarks.compression_benchmark --limit 20 --batch
+"""
+import argparse
+import time
+
+import pandas as pd
+from rouge_score import rouge_scorer
+
+import summarization.summarizerAgent as agent
+from processing.data_extractor import DataExtractor
+from summarization.compression import compress_documents, compress_text, COMPRESSION_TARGET_TOKENS
+from summarization.evaluate_rouge import evaluate_summary_with_original
+from summarization.token_counter import count_tokens
+
+BENCHMARK_FILE = "./output/AI takeaways benchmark.csv"
+
+
+def load_documents(input_file, limit):
+    df = pd.read_csv(input_file)
+    df = df[df["Link"].notna() & df["Take-away (Illuin)"].notna()].head(limit)
+    extractor = DataExtractor()
+    documents = []
+    for _, row in df.iterrows():
+        try:
+            data = extractor.extract(row["Link"]).to_dict()
+        except Exception as e:
+            print(f"⚠️ {row['Link'][:60]}: {e}")
+            continue
+        if data.get("content"):
+            documents.append((row["Link"], data, row["Take-away (Illuin)"]))
+    return documents
+
+
+def summarize(data):
+    start = time.perf_counter()
+    summary, (input_tokens, output_tokens) = agent.generate_summary(data, use_cache=False)
+    return summary, input_tokens + output_tokens, time.perf_counter() - start
+
+
+def run(input_file, limit, target_tokens, with_summaries, batch=False):
+    documents = load_documents(input_file, limit)
+    if not documents:
+        print("Aucun document extrait.")
+        return
+
+    start = time.perf_counter()
+    contents = [data["content"] for _, data, _ in documents]
+    if batch:
+        compressed = compress_documents(contents, target_tokens)
+    else:
+        compressed = [compress_text(content, target_tokens) for content in contents]
+    elapsed = time.perf_counter() - start
+    print(f"🗜️ {len(documents)} documents compressés {'en un lot' if batch else 'un par un'} en "
+          f"{elapsed * 1000:.0f} ms (cible {target_tokens} tokens)\n")
+
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2"], use_stemmer=True)
+    totals = {"before": 0, "after": 0}
+    print(f"{'document':50} {'tokens':>8} {'compressé':>10} {'rappel R1':>14} {'rappel R2':>14}")
+    for (link, data, reference), content in zip(documents, compressed):
+        before, after = count_tokens(data["content"]), count_tokens(content)
+        totals["before"] += before
+        totals["after"] += after
+        original_scores = scorer.score(reference, data["content"])
+        compressed_scores = scorer.score(reference, content)
+        recalls = [f"{original_scores[name].recall:.2f}->{compressed_scores[name].recall:.2f}" for name in ("rouge1", "rouge2")]
+        print(f"{link[:50]:50} {before:>8} {after:>10} {recalls[0]:>14} {recalls[1]:>14}")
+    print(f"\nTotal : {totals['before']} -> {totals['after']} tokens "
+          f"({1 - totals['after'] / totals['before']:.0%} de moins)")
+
+    if not with_summaries:
+        return
+
+    print(f"\n{'document':50} {'tokens':>16} {'latence':>16} {'ROUGE-1 préc.':>16} {'ROUGE-L préc.':>16}")
+    sums = {key: 0.0 for key in ("tokens", "tokens_c", "seconds", "seconds_c", "r1", "r1_c", "rl", "rl_c")}
+    for (link, data, reference), content in zip(documents, compressed):
+        summary, tokens, seconds = summarize(data)
+        summary_c, tokens_c, seconds_c = summarize({**data, "content": content})
+        scores = evaluate_summary_with_original(summary, reference)
+        scores_c = evaluate_summary_with_original(summary_c, reference)
+        for key, value in (("tokens", tokens), ("tokens_c", tokens_c), ("seconds", seconds), ("seconds_c", seconds_c),
+                           ("r1", scores["rouge1_precision"]), ("r1_c", scores_c["rouge1_precision"]),
+                           ("rl", scores["rougeL_precision"]), ("rl_c", scores_c["rougeL_precision"])):
+            sums[key] += value
+        print(f"{link[:50]:50} {f'{tokens}->{tokens_c}':>16} {f'{seconds:.1f}s->{seconds_c:.1f}s':>16} "
+              f"{scores['rouge1_precision']:>7.2f}->{scores_c['rouge1_precision']:<7.2f} "
+              f"{scores['rougeL_precision']:>7.2f}->{scores_c['rougeL_precision']:<7.2f}")
+    n = len(documents)
+    print(f"\nMoyennes sans -> avec compression : {sums['tokens'] / n:.0f} -> {sums['tokens_c'] / n:.0f} tokens, "
+          f"{sums['seconds'] / n:.1f}s -> {sums['seconds_c'] / n:.1f}s, "
+          f"ROUGE-1 {sums['r1'] / n:.3f} -> {sums['r1_c'] / n:.3f}, ROUGE-L {sums['rl'] / n:.3f} -> {sums['rl_c'] / n:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-file", default=BENCHMARK_FILE)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--target-tokens", type=int, default=COMPRESSION_TARGET_TOKENS)
+    parser.add_argument("--summarize", action="store_true", help="Compare aussi les take-aways générés (appels LLM)")
+    parser.add_argument("--batch", action="store_true", help="Compresse tous les documents en un lot (IDF sur le lot)")
+    args = parser.parse_args()
+    run(args.input_file, args.limit, args.target_tokens, args.summarize, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Évaluation de l'extraction du contenu principal des blogs sur des pages sauvegardées localement.
+
+Pour chaque page blog_<nom>.html de benchmarks/samples/html, compare le texte complet
+(tous les p/h1/h2/h3/li, ancien comportement) au contenu principal extrait, affiche la
+baisse du nombre de tokens et vérifie les attentes de la fixture associée
+blog_<nom>.json si elle existe :
+    {"must_contain": ["phrase de l'article", ...], "must_not_contain": ["Subscribe to our newsletter", ...]}
+
+Pour sauvegarder une page et un squelette de fixture à compléter :
+    python -m benchmarks.content_extraction_eval --download https://exemple.com/article
+Puis :
+    python -m benchmarks.content_extraction_eval
+"""
+import argparse
+import json
+import os
+
+from benchmarks.html_parsing_benchmark import SAMPLES_DIR, download
+from processing.data_extractor import DataExtractor
+from summarization.token_counter import count_tokens
+
+_extractor = DataExtractor(use_cache=False)
+
+
+def load_fixture(html_path):
+    fixture_path = os.path.splitext(html_path)[0] + ".json"
+    if not os.path.exists(fixture_path):
+        return None
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_fixture(content, fixture):
+    """Retourne la liste des attentes non respectées."""
+    failures = [f"absent: {text!r}" for text in fixture.get("must_contain", []) if text not in content]
+    failures += [f"présent: {text!r}" for text in fixture.get("must_not_contain", []) if text in content]
+    return failures
+
+
+def evaluate_page(html):
+    _extractor.blog_main_content = False
+    full = _extractor.parse_blog(html, "sample")["content"]
+    _extractor.blog_main_content = True
+    main = _extractor.parse_blog(html, "sample")["content"]
+    return full, main
+
+
+def run(samples_dir):
+    files = sorted(f for f in os.listdir(samples_dir)
+                   if f.startswith("blog_") and f.endswith(".html")) if os.path.isdir(samples_dir) else []
+    if not files:
+        print(f"⚠️ Aucune page blog_*.html dans {samples_dir}. Utilisez --download <url> pour en sauvegarder.")
+        return
+
+    total_full = total_main = 0
+    checked = passed = 0
+    print(f"{'page':45} {'tokens complets':>16} {'tokens article':>15} {'baisse':>8}  fixture")
+    for filename in files:
+        path = os.path.join(samples_dir, filename)
+        with open(path, "rb") as f:
+            html = f.read()
+        full, main = evaluate_page(html)
+        full_tokens, main_tokens = count_tokens(full), count_tokens(main)
+        total_full += full_tokens
+        total_main += main_tokens
+        drop = 1 - main_tokens / full_tokens if full_tokens else 0
+
+        fixture = load_fixture(path)
+        if fixture is None:
+            status = "-"
+            failures = []
+        else:
+            checked += 1
+            failures = check_fixture(main, fixture)
+            passed += not failures
+            status = "✅" if not failures else f"❌ {len(failures)} échec(s)"
+        print(f"{filename[:45]:45} {full_tokens:>16} {main_tokens:>15} {drop:>7.0%}  {status}")
+        for failure in failures:
+            print(f"    {failure}")
+
+    if total_full:
+        print(f"\nTotal : {total_full} -> {total_main} tokens ({1 - total_main / total_full:.0%} de moins)")
+    if checked:
+        print(f"Fixtures : {passed}/{checked} conformes")
+
+
+def write_fixture_template(samples_dir):
+    """Crée un squelette de fixture vide pour les pages qui n'en ont pas."""
+    for filename in sorted(os.listdir(samples_dir)):
+        if not (filename.startswith("blog_") and filename.endswith(".html")):
+            continue
+        fixture_path = os.path.join(samples_dir, filename[:-len(".html")] + ".json")
+        if not os.path.exists(fixture_path):
+            with open(fixture_path, "w", encoding="utf-8") as f:
+                json.dump({"must_contain": [], "must_not_contain": []}, f, indent=2)
+            print(f"📝 Fixture à compléter : {fixture_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples-dir", default=SAMPLES_DIR)
+    parser.add_argument("--download", metavar="URL", help="Sauvegarde un article de blog")
+    args = parser.parse_args()
+
+    if args.download:
+        download("blog", args.download, args.samples_dir)
+        write_fixture_template(args.samples_dir)
+    else:
+        run(args.samples_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Classification par règles (processing/data_classifier.py) sur les CSV de sortie du pipeline.
+
+Pour chaque lien, affiche le type de contenu détecté et sa confiance, puis compte les
+documents dont la catégorie est jugée certaine (appel LLM de classification évité) et
+leur accord avec la catégorie annotée (Illuin) et celle du LLM. Sans --extract, seul le
+type de source déduit de l'URL est utilisé (aucun appel réseau) ; avec --extract, les
+métadonnées (cardData, pipeline_tag, langage GitHub, README, catégories arXiv) sont
+récupérées par DataExtractor.
+    python -m benchmarks.data_classifier_benchmark
+    python -m benchmarks.data_classifier_benchmark --extract --input-files "./output/AI takeaways benchmark.csv"
+"""
+import argparse
+import time
+from collections import Counter
+
+import pandas as pd
+
+from processing.data_classifier import DataClassifier, CERTAIN_CONFIDENCE
+from processing.data_extractor import DataExtractor
+
+OUTPUT_FILES = ["./output/AI takeaways benchmark.csv", "./output/new_summaries.csv", "./output/reddit.csv"]
+
+
+def load_items(input_files, extract):
+    extractor = DataExtractor()
+    rows = []
+    for input_file in input_files:
+        df = pd.read_csv(input_file)
+        for _, row in df[df["Link"].notna()].iterrows():
+            try:
+                if extract:
+                    data = extractor.extract(row["Link"]).to_dict()
+                else:
+                    source_type, identifier = extractor.get_source_type(row["Link"])
+                    data = {"source_type": source_type, "identifier": identifier, "content": "", "metadata": {}}
+            except Exception as e:
+                print(f"⚠️ {row['Link'][:60]}: {e}")
+                continue
+            rows.append((row["Link"], row.get("Category (Illuin)"), row.get("Category AI"), data))
+    return rows
+
+
+def run(input_files, extract, min_confidence, verbose):
+    rows = load_items(input_files, extract)
+    if not rows:
+        print("Aucun document.")
+        return
+
+    items = [data for _, _, _, data in rows]
+    start = time.perf_counter()
+    predictions = DataClassifier.classify_batch(items)
+    elapsed = time.perf_counter() - start
+    print(f"⚡ {len(items)} documents classifiés en {elapsed * 1000:.1f} ms "
+          f"({elapsed / len(items) * 1e6:.0f} µs/document)\n")
+
+    types = Counter(content_type for content_type, _ in predictions)
+    print(f"{'type':10} {'documents':>10} {'confiance moy.':>15}")
+    for content_type, count in types.most_common():
+        confidences = [confidence for predicted, confidence in predictions if predicted == content_type]
+        print(f"{content_type:10} {count:>10} {sum(confidences) / count:>15.2f}")
+
+    certain = agree_reference = labelled = agree_llm = llm_labelled = 0
+    if verbose:
+        print(f"\n{'document':60} {'type':>9} {'conf.':>6} {'certaine':>9} {'Illuin':>10} {'LLM':>10}")
+    for (link, reference, llm_category, data), (content_type, confidence) in zip(rows, predictions):
+        category = DataClassifier.certain_category(data, min_confidence)
+        if verbose:
+            print(f"{link[:60]:60} {content_type:>9} {confidence:>6.2f} {str(category or '-'):>9} "
+                  f"{str(reference if pd.notna(reference) else '-'):>10} {str(llm_category if pd.notna(llm_category) else '-'):>10}")
+        if category is None:
+            continue
+        certain += 1
+        if pd.notna(reference):
+            labelled += 1
+            agree_reference += category == reference
+        if pd.notna(llm_category):
+            llm_labelled += 1
+            agree_llm += category == llm_category
+
+    print(f"\n🎯 Catégorie certaine (confiance >= {min_confidence}) : {certain}/{len(rows)} documents, "
+          f"soit {certain} appels LLM de classification évités")
+    if labelled:
+        print(f"   Accord avec la catégorie annotée : {agree_reference}/{labelled} ({agree_reference / labelled:.0%})")
+    if llm_labelled:
+        print(f"   Accord avec la catégorie du LLM : {agree_llm}/{llm_labelled} ({agree_llm / llm_labelled:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-files", nargs="+", default=OUTPUT_FILES)
+    parser.add_argument("--extract", action="store_true", help="Récupère les métadonnées (appels réseau)")
+    parser.add_argument("--min-confidence", type=float, default=CERTAIN_CONFIDENCE)
+    parser.add_argument("--verbose", action="store_true", help="Affiche chaque document")
+    args = parser.parse_args()
+    run(args.input_files, args.extract, args.min_confidence, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Faux serveur chat-completions (API OpenAI) pour tester et mesurer le pipeline sans appel payant.
+
+Répond après une latence fixe, avec un usage de tokens estimé, et applique un quota de
+requêtes et de tokens par seconde : au-delà, réponse 429 avec Retry-After, comme l'API,
+et en-têtes x-ratelimit-* sur chaque réponse. Les requêtes "stream": true reçoivent la
+réponse mot par mot (server-sent events), le premier mot arrivant après la latence.
+    python -m benchmarks.fake_llm_server --port 8765 --latency 0.2 --rps 20
+Puis OPENAI_BASE_URL=http://127.0.0.1:8765/v1 dans .env.local.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORY_ANSWER = "Method"
+SUMMARY_ANSWER = "This document presents a new method.\n- It improves the results.\n- It is evaluated on benchmarks."
+STREAM_WORD_INTERVAL = 0.01  # secondes entre deux mots d'une réponse en streaming
+STRUCTURED_ANSWER = {"category": "Method", "take_away": SUMMARY_ANSWER, "keywords": ["llm", "benchmark"]}
+
+
+class RateWindow:
+    """Quota de requêtes et de tokens sur une fenêtre glissante d'une seconde."""
+
+    def __init__(self, rps=None, tps=None):
+        self.rps = rps
+        self.tps = tps
+        self.events = []  # (instant, tokens)
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def admit(self, tokens):
+        """Retourne (accepté, requêtes restantes, tokens restants, délai avant réinitialisation)."""
+        with self.lock:
+            now = time.monotonic()
+            self.events = [(t, n) for t, n in self.events if now - t < 1.0]
+            reset = 1.0 - (now - self.events[0][0]) if self.events else 0.0
+            used_requests = len(self.events)
+            used_tokens = sum(n for _, n in self.events)
+            if (self.rps and used_requests + 1 > self.rps) or (self.tps and used_tokens + tokens > self.tps):
+                self.rejected += 1
+                return False, 0, 0, reset
+            self.events.append((now, tokens))
+            remaining_requests = self.rps - used_requests - 1 if self.rps else None
+            remaining_tokens = self.tps - used_tokens - tokens if self.tps else None
+            return True, remaining_requests, remaining_tokens, reset or 1.0
+
+
+def make_handler(latency, window):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, headers):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, model, answer, prompt_tokens, completion_tokens, include_usage, headers):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+
+            def event(payload):
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            words = answer.split(" ")
+            for i, word in enumerate(words):
+                delta = {"role": "assistant", "content": word} if i == 0 else {"content": " " + word}
+                event(json.dumps({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}))
+                time.sleep(STREAM_WORD_INTERVAL)
+            event(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}))
+            if include_usage:
+                event(json.dumps({**base, "choices": [], "usage": {
+                    "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens}}))
+            event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = " ".join(str(message.get("content", "")) for message in request.get("messages", []))
+            prompt_tokens = max(1, len(prompt) // 4)
+
+            accepted, remaining_requests, remaining_tokens, reset = window.admit(prompt_tokens)
+            headers = {}
+            if window.rps:
+                headers["x-ratelimit-limit-requests"] = str(window.rps)
+                headers["x-ratelimit-remaining-requests"] = str(remaining_requests)
+                headers["x-ratelimit-reset-requests"] = f"{reset:.3f}s"
+            if window.tps:
+                headers["x-ratelimit-limit-tokens"] = str(window.tps)
+                headers["x-ratelimit-remaining-tokens"] = str(remaining_tokens)
+                headers["x-ratelimit-reset-tokens"] = f"{reset:.3f}s"
+            if not accepted:
+                headers["retry-after"] = f"{max(reset, 0.05):.3f}"
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, headers)
+                return
+
+            time.sleep(latency)
+            if "response_format" in request:
+                answer = json.dumps(STRUCTURED_ANSWER)
+            elif "Classify" in prompt:
+                answer = CATEGORY_ANSWER
+            else:
+                answer = SUMMARY_ANSWER
+            completion_tokens = max(1, len(answer) // 4)
+            if request.get("stream"):
+                include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+                self._send_stream(request.get("model", "fake"), answer, prompt_tokens, completion_tokens,
+                                  include_usage, headers)
+                return
+            self._send(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            }, headers)
+
+    return Handler
+
+
+def start_fake_llm_server(port=0, latency=0.2, rps=None, tps=None):
+    """Démarre le serveur dans un thread ; retourne (serveur, base_url, fenêtre de quota)."""
+    window = RateWindow(rps, tps)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, window))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", window
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Secondes par réponse")
+    parser.add_argument("--rps", type=int, help="Requêtes par seconde avant 429")
+    parser.add_argument("--tps", type=int, help="Tokens par seconde avant 429")
+    args = parser.parse_args()
+
+    server, base_url, _ = start_fake_llm_server(args.port, args.latency, args.rps, args.tps)
+    print(f"🧪 Faux serveur LLM sur {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
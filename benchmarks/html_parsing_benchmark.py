@@ -0,0 +1,142 @@
+"""
+Benchmark des backends de parsing HTML sur des pages sauvegardées localement.
+
+Compare, pour chaque page, l'ancien comportement (html.parser, arbre complet) aux backends
+disponibles (lxml natif, BeautifulSoup + lxml / html.parser, parsing ciblé ou non), vérifie que le texte extrait est
+identique et affiche l'accélération.
+
+Sur du HTML mal formé, chaque constructeur d'arbre répare l'imbrication à sa façon : le texte
+de repli (tous les blocs de la page, dont seule la taille est conservée dans
+metadata['content_stats']['full_chars']) peut alors différer sans que le titre ni le contenu
+extrait ne changent. Ces pages sont marquées « ~ » plutôt que « ≠ ».
+
+Les pages fournies (blog_*.html) sont de vrais articles de presse, voir samples/html/README.md.
+
+Les pages sont des fichiers <type>_<nom>.html dans benchmarks/samples/html, avec
+<type> parmi blog, hfblog, space, hfpapers. Pour en sauvegarder :
+    python -m benchmarks.html_parsing_benchmark --download blog https://exemple.com/article
+Puis :
+    python -m benchmarks.html_parsing_benchmark
+"""
+import argparse
+import os
+import re
+import time
+
+from processing.data_extractor import DataExtractor
+from processing.html_parsing import AVAILABLE_BACKENDS
+from scraping.huggingface_automatic_scraping import parse_papers_page
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "samples", "html")
+PAGE_KINDS = ["blog", "hfblog", "space", "hfpapers"]
+BASELINE = ("html.parser", False)
+
+_extractor = DataExtractor(use_cache=False)
+
+
+def parse_page(kind, html, parser, targeted):
+    """Applique l'extraction du pipeline correspondant au type de page."""
+    if kind == "hfpapers":
+        return parse_papers_page(html, parser=parser, targeted=targeted)
+
+    extractor = _extractor
+    extractor.html_parser = parser
+    extractor.targeted_parsing = targeted
+    if kind == "blog":
+        return extractor.parse_blog(html, "sample")
+    if kind == "hfblog":
+        return extractor.parse_huggingface_blog(html)
+    return extractor.parse_huggingface_space(html)
+
+
+def _extracted(result):
+    """Résultat sans les statistiques de taille du texte de repli (voir docstring du module)."""
+    if not isinstance(result, dict) or 'content_stats' not in result.get('metadata', {}):
+        return result
+    metadata = {key: value for key, value in result['metadata'].items() if key != 'content_stats'}
+    return {**result, 'metadata': metadata}
+
+
+def compare(result, reference):
+    """« = » identique, « ~ » même texte extrait (seul le repli diffère), « ≠ » différent."""
+    if result == reference:
+        return "="
+    return "~" if _extracted(result) == _extracted(reference) else "≠"
+
+
+def time_parse(kind, html, parser, targeted, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse_page(kind, html, parser, targeted)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(samples_dir, repeat):
+    files = sorted(f for f in os.listdir(samples_dir) if f.endswith(".html")) if os.path.isdir(samples_dir) else []
+    if not files:
+        print(f"⚠️ Aucune page dans {samples_dir}. Utilisez --download <type> <url> pour en sauvegarder.")
+        return
+
+    variants = [(parser, targeted) for parser in AVAILABLE_BACKENDS for targeted in (False, True)
+                if not (parser == "lxml-native" and targeted)]
+    totals = {variant: 0.0 for variant in variants}
+
+    print(f"{'page':40} " + " ".join(f"{p + (' ciblé' if t else ''):>18}" for p, t in variants))
+    for filename in files:
+        kind = filename.split("_", 1)[0]
+        if kind not in PAGE_KINDS:
+            print(f"⚠️ {filename}: type inconnu, ignoré")
+            continue
+        with open(os.path.join(samples_dir, filename), "rb") as f:
+            html = f.read()
+
+        reference_time, reference = time_parse(kind, html, *BASELINE, repeat)
+        cells = []
+        for variant in variants:
+            elapsed, result = time_parse(kind, html, *variant, repeat) if variant != BASELINE else (reference_time, reference)
+            totals[variant] += elapsed
+            identical = compare(result, reference)
+            cells.append(f"{elapsed * 1000:8.1f}ms x{reference_time / elapsed:4.1f} {identical}")
+        print(f"{filename[:40]:40} " + " ".join(f"{cell:>18}" for cell in cells))
+
+    baseline_total = totals[BASELINE]
+    print("\nTotal : " + ", ".join(
+        f"{parser}{' ciblé' if targeted else ''} {total * 1000:.0f}ms (x{baseline_total / total:.1f})"
+        for (parser, targeted), total in totals.items()
+    ))
+    print("= : résultat identique à html.parser complet, ~ : même titre et contenu (seul le texte de repli diffère), "
+          "≠ : différent")
+
+
+def download(kind, url, samples_dir):
+    os.makedirs(samples_dir, exist_ok=True)
+    extractor = DataExtractor()
+    response = extractor.http.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    response.raise_for_status()
+    name = re.sub(r"[^A-Za-z0-9]+", "-", url.split("://", 1)[-1]).strip("-")[:80]
+    path = os.path.join(samples_dir, f"{kind}_{name}.html")
+    with open(path, "wb") as f:
+        f.write(response.content)
+    print(f"💾 {url} -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples-dir", default=SAMPLES_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--download", nargs=2, metavar=("TYPE", "URL"), help=f"TYPE parmi {PAGE_KINDS}")
+    args = parser.parse_args()
+
+    if args.download:
+        kind, url = args.download
+        if kind not in PAGE_KINDS:
+            parser.error(f"type inconnu: {kind}")
+        download(kind, url, args.samples_dir)
+    else:
+        run(args.samples_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
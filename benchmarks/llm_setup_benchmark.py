@@ -0,0 +1,56 @@
+"""
+Coût de préparation des appels LLM : construction d'un client et d'une chaîne à chaque appel
+(ancien comportement) comparée au registre partagé de summarization.summarizerAgent.
+
+Aucune requête n'est envoyée : seul le temps passé avant l'appel réseau est mesuré,
+pour les trois appels (classification, résumé, critique) de chaque document.
+    python -m benchmarks.llm_setup_benchmark --documents 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+
+import summarization.summarizerAgent as agent
+
+TASKS = ["classify", "summary", "critique"]
+
+
+def build_per_call(task):
+    model = ChatOpenAI(model=agent.OPENAI_MODEL, temperature=agent.TEMPERATURE, openai_api_key=agent.API_KEY)
+    return ChatPromptTemplate.from_template(agent.TEMPLATES[task]) | model
+
+
+def run(documents):
+    start = time.perf_counter()
+    for _ in range(documents):
+        for task in TASKS:
+            build_per_call(task)
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(documents):
+        for task in TASKS:
+            agent.get_chain(task)
+    shared = time.perf_counter() - start
+
+    calls = documents * len(TASKS)
+    print(f"{documents} documents, {calls} appels LLM")
+    print(f"  construction à chaque appel : {per_call:.2f}s ({per_call * 1000 / calls:.2f} ms/appel)")
+    print(f"  registre partagé            : {shared:.3f}s ({shared * 1000 / calls:.3f} ms/appel)")
+    print(f"  gain : {per_call - shared:.2f}s (x{per_call / shared:.0f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    args = parser.parse_args()
+    run(args.documents)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Débit du résumé asynchrone par lots (agenerate_summaries) à plusieurs niveaux de concurrence.
+
+Par défaut, les requêtes partent vers un faux serveur chat-completions local
+(benchmarks/fake_llm_server.py) qui applique un quota de requêtes par seconde et
+répond 429 au-delà ; la dernière ligne laisse le limiteur adaptatif trouver seul la
+bonne concurrence. Le cache des résultats LLM est désactivé.
+    python -m benchmarks.llm_throughput_benchmark --documents 200 --rps 40
+    python -m benchmarks.llm_throughput_benchmark --base-url https://api.openai.com/v1 --documents 20
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import summarization.summarizerAgent as agent
+from benchmarks.fake_llm_server import start_fake_llm_server
+from summarization.rate_limiter import AdaptiveConcurrency
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+def make_documents(count):
+    return [{"content": f"Document {i}: we propose a new method for retrieval augmented generation. " * 20}
+            for i in range(count)]
+
+
+def run_level(documents, limiter, max_concurrency):
+    start = time.perf_counter()
+    results = asyncio.run(agent.agenerate_summaries(documents, use_cache=False,
+                                                    max_concurrency=max_concurrency, limiter=limiter))
+    elapsed = time.perf_counter() - start
+    errors = [error for _, error in results if error is not None]
+    return elapsed, errors
+
+
+def run(documents_count, levels, base_url, window=None):
+    agent.OPENAI_BASE_URL = base_url
+    agent.LLM_CACHE_ENABLED = False
+    documents = make_documents(documents_count)
+
+    print(f"{documents_count} documents vers {base_url}\n")
+    print(f"{'concurrence':>14} {'durée':>8} {'docs/s':>8} {'429':>6} {'erreurs':>8} {'limite finale':>14}")
+    rows = [(str(level), AdaptiveConcurrency(level, level), level) for level in levels]
+    rows.append(("adaptative", AdaptiveConcurrency(agent.ASYNC_INITIAL_CONCURRENCY, max(levels)), max(levels)))
+    for label, limiter, max_concurrency in rows:
+        elapsed, errors = run_level(documents, limiter, max_concurrency)
+        print(f"{label:>14} {elapsed:>7.2f}s {documents_count / elapsed:>8.1f} {limiter.rate_limited:>6} "
+              f"{len(errors):>8} {limiter.limit:>14}")
+        if errors:
+            print(f"    ex: {errors[0]!r}"[:200])
+    if window is not None:
+        print(f"\nRequêtes refusées par le serveur : {window.rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--levels", type=int, nargs="+", default=CONCURRENCY_LEVELS)
+    parser.add_argument("--base-url", help="Serveur compatible OpenAI réel (sinon faux serveur local)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Faux serveur : secondes par réponse")
+    parser.add_argument("--rps", type=int, default=40, help="Faux serveur : requêtes par seconde avant 429")
+    args = parser.parse_args()
+
+    if args.base_url:
+        run(args.documents, args.levels, args.base_url)
+    else:
+        server, base_url, window = start_fake_llm_server(latency=args.latency, rps=args.rps)
+        try:
+            run(args.documents, args.levels, base_url, window)
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Benchmark de bout en bout du pipeline (generate_summaries), rejoué hors ligne.
+
+"record" exécute le pipeline sur le jeu de référence avec le réseau (arXiv, GitHub,
+Hugging Face, blogs, OpenAI) et enregistre chaque réponse dans des cassettes
+(benchmarks/cassettes.py). "replay" rejoue ensuite ces réponses sans réseau ni clé,
+avec leur latence enregistrée (ou sans, --no-latency), et mesure : documents par seconde,
+percentiles de latence par étape (document, extraction = téléchargement, requêtes HTTP, requêtes LLM),
+tokens et ROUGE. Les métriques sont comparées à une référence enregistrée
+(--save-baseline) ; toute dégradation au-delà des tolérances est signalée et le code de
+sortie vaut 1. Une requête absente de la cassette (prompt ou extraction modifiés) compte
+comme une erreur : il faut alors réenregistrer.
+Avec --staged, les documents passent par le pipeline par étapes (run_staged_pipeline, files
+bornées) au lieu de generate_summaries ; les métriques de chaque étape sont alors affichées.
+
+Par défaut, le benchmark porte sur le petit jeu versionné avec le dépôt
+(benchmarks/samples/pipeline_samples.csv, cassettes dans benchmarks/cassettes/samples et
+référence benchmarks/pipeline_baseline.json) : replay fonctionne sur un checkout neuf. Ses
+cassettes ont été enregistrées hors ligne : pages servies depuis benchmarks/samples/html
+(--samples), réponses du faux serveur LLM (--fake-llm). Le ROUGE de ce jeu ne mesure donc
+pas la qualité des résumés, seulement leur stabilité. --full utilise le jeu de référence
+complet, dont les cassettes (réseau et API réels) restent locales.
+    python -m benchmarks.pipeline_benchmark replay
+    python -m benchmarks.pipeline_benchmark replay --staged
+    python -m benchmarks.pipeline_benchmark record --samples --fake-llm
+    python -m benchmarks.pipeline_benchmark replay --save-baseline
+    python -m benchmarks.pipeline_benchmark record --full
+    python -m benchmarks.pipeline_benchmark replay --full --save-baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("OPENAI_API_KEY", "cassette")
+
+import numpy as np
+import pandas as pd
+
+import ai_summary_pipeline as pipeline
+import summarization.summarizerAgent as agent
+from benchmarks.cassettes import Cassette, CassetteTransport, RECORD, REPLAY, SampleAdapter, mount
+from benchmarks.fake_llm_server import start_fake_llm_server
+from processing.data_extractor import DataExtractor
+from processing.http_client import HttpClient
+from processing.staged_pipeline import Job
+from storage.journal import DocumentJournal, journal_path
+from storage.summary_store import SummaryStore
+
+# Jeu versionné (rejouable sans rien enregistrer) et jeu de référence complet (cassettes locales)
+SAMPLES_FILE = "./benchmarks/samples/pipeline_samples.csv"
+SAMPLES_CASSETTE_DIR = "./benchmarks/cassettes/samples"
+SAMPLES_BASELINE = "./benchmarks/pipeline_baseline.json"
+BENCHMARK_FILE = "./output/AI takeaways benchmark.csv"
+FULL_CASSETTE_DIR = "./benchmarks/cassettes/full"
+FULL_BASELINE = "./benchmarks/pipeline_baseline_full.json"
+SAMPLE_PAGES_DIR = "./benchmarks/samples/html"  # pages servies par --samples (voir sources.json)
+# Point d'accès LLM utilisé à l'enregistrement, restauré au rejeu (l'URL fait partie de la clé des requêtes)
+LLM_SETTINGS_FILE = "llm.json"
+FAKE_LLM_LATENCY = 0.3  # secondes par réponse du faux serveur LLM (--fake-llm)
+# Rejeux du jeu versionné dont on garde la médiane : sur quelques documents, les démarrages à
+# froid (imports, construction du client LLM) du premier rejeu dépassent les tolérances
+SAMPLES_REPEAT = 3
+
+# Colonnes remplies par le pipeline, vidées avant chaque exécution
+GENERATED_COLUMNS = ["Category AI", "Status", "Topic / Keywords AI", "Take-away AI",
+                     "rouge1 precision", "rouge2 precision", "rougeL precision"]
+STAGES = ("document", "extraction", "http", "llm")
+PERCENTILES = (50, 90, 99)
+
+# Tolérances avant de signaler une dégradation par rapport à la référence
+TIME_TOLERANCE = 0.15  # relative
+LATENCY_FLOOR_MS = 20  # écart absolu minimal sur une latence (les étapes de quelques ms sont bruitées)
+TOKEN_TOLERANCE = 0.02  # relative
+ROUGE_TOLERANCE = 0.005  # absolue
+# Métrique -> (sens favorable, type de tolérance) ; les p99 sont affichés mais trop bruités pour être comparés
+COMPARED_METRICS = {
+    "docs_per_second": ("higher", "time"),
+    "errors": ("lower", "count"),
+    "input_tokens": ("lower", "tokens"),
+    "output_tokens": ("lower", "tokens"),
+    "rouge1_precision": ("higher", "rouge"),
+    "rouge2_precision": ("higher", "rouge"),
+    "rougeL_precision": ("higher", "rouge"),
+    **{f"{stage}_p{p}_ms": ("lower", "latency") for stage in STAGES for p in (50, 90)},
+}
+# Paramètres qui doivent être identiques pour que la comparaison ait un sens
+RUN_SETTINGS = ("replay_latency", "max_workers", "summary_mode", "limit", "staged")
+
+
+def prepare_input(input_file, limit):
+    """Copie du jeu de référence sans les colonnes générées, pour que tout soit retraité."""
+    df = pd.read_csv(input_file)
+    df = df[df["Link"].notna()]
+    if limit:
+        df = df.head(limit)
+    for column in GENERATED_COLUMNS:
+        df[column] = None
+    handle, path = tempfile.mkstemp(suffix=".csv")
+    os.close(handle)
+    df.to_csv(path, index=False)
+    return path
+
+
+def timed(function, durations):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - start)
+    return wrapper
+
+
+def setup(mode, cassette_dir, replay_latency, samples=False, fake_llm=False):
+    """
+    Branche les cassettes HTTP et LLM ; retourne (extracteur, cassette HTTP, cassette LLM).
+    samples / fake_llm (enregistrement) : pages sauvegardées au lieu du réseau, faux serveur au lieu de l'API.
+    """
+    http_cassette = Cassette(os.path.join(cassette_dir, "http"), mode, replay_latency)
+    llm_cassette = Cassette(os.path.join(cassette_dir, "llm"), mode, replay_latency)
+
+    settings_path = os.path.join(cassette_dir, LLM_SETTINGS_FILE)
+    if mode == RECORD:
+        if fake_llm:
+            _, agent.OPENAI_BASE_URL, _ = start_fake_llm_server(port=0, latency=FAKE_LLM_LATENCY)
+        with open(settings_path, "w", encoding="utf-8") as f:
+            json.dump({"base_url": agent.OPENAI_BASE_URL}, f, indent=2)
+    elif os.path.exists(settings_path):
+        with open(settings_path, encoding="utf-8") as f:
+            agent.OPENAI_BASE_URL = json.load(f)["base_url"]
+
+    agent.LLM_HTTP_TRANSPORT = CassetteTransport(llm_cassette)
+    # Les clients construits lors d'une répétition précédente garderaient l'ancienne cassette
+    agent.reset_llm_clients()
+    # Chaque document doit réellement passer par le LLM (rejoué) : ni cache de résultats ni classifieur local
+    agent.LLM_CACHE_ENABLED = False
+    agent.USE_FAST_CLASSIFIER = False
+    agent.reset_llm_stats()
+
+    http = HttpClient(cache=None)
+    if mode == REPLAY:
+        http.max_retries = 0  # une requête absente de la cassette ne se rattrape pas en réessayant
+    mount(http_cassette, http, SampleAdapter(SAMPLE_PAGES_DIR) if samples else None)
+    return DataExtractor(http=http), http_cassette, llm_cassette
+
+
+def percentiles(durations):
+    if not durations:
+        return {p: 0.0 for p in PERCENTILES}
+    values = np.percentile(np.array(durations) * 1000, PERCENTILES)
+    return dict(zip(PERCENTILES, values))
+
+
+def run_staged(path, extractor, max_workers, summary_mode, durations):
+    """Même jeu de documents, via le pipeline par étapes et un stockage SQLite temporaire."""
+    extractor.fetch = timed(extractor.fetch, durations["extraction"])
+    summarize_document = pipeline.summarize_document
+    pipeline.summarize_document = timed(summarize_document, durations["document"])
+    directory = tempfile.mkdtemp()
+    store = SummaryStore(os.path.join(directory, "summaries.sqlite"))
+    try:
+        store.import_csv(path)
+        jobs = [Job(link) for link in store.pending()["Link"]]
+        pipeline.run_staged_pipeline(store, jobs=jobs, extractor=extractor, summary_mode=summary_mode,
+                                     fetch_workers=max_workers, summary_workers=max_workers)
+        return store.to_dataframe()
+    finally:
+        pipeline.summarize_document = summarize_document
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run(mode, input_file, cassette_dir, replay_latency, max_workers, summary_mode, limit, staged=False,
+        samples=False, fake_llm=False):
+    extractor, http_cassette, llm_cassette = setup(mode, cassette_dir, replay_latency, samples, fake_llm)
+    durations = {"document": [], "extraction": []}
+    process_document = pipeline.process_document
+    if not staged:
+        extractor.fetch = timed(extractor.fetch, durations["extraction"])
+        pipeline.process_document = timed(process_document, durations["document"])
+
+    path = prepare_input(input_file, limit)
+    try:
+        start = time.perf_counter()
+        if staged:
+            # document : partie LLM seulement (les étapes se recouvrent), extraction : téléchargement
+            df = run_staged(path, extractor, max_workers, summary_mode, durations)
+        else:
+            df = pipeline.generate_summaries(input_file=path, calculate_rouge=False, max_workers=max_workers,
+                                             summary_mode=summary_mode, extractor=extractor)
+        process_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        df = pipeline.calculate_rouge_scores(df)
+        rouge_seconds = time.perf_counter() - start
+    finally:
+        pipeline.process_document = process_document
+        os.remove(path)
+        DocumentJournal(journal_path(path)).clear()
+
+    durations["http"] = [seconds for _, seconds in http_cassette.timings]
+    durations["llm"] = [seconds for _, seconds in llm_cassette.timings]
+    processed = df[df["Status"].eq("Processed")]
+    llm_stats = agent.get_llm_stats()
+    metrics = {
+        "documents": len(df),
+        "processed": len(processed),
+        "errors": len(df) - len(processed),
+        "cassette_misses": len(http_cassette.misses) + len(llm_cassette.misses),
+        "seconds": round(process_seconds, 3),
+        "docs_per_second": round(len(processed) / process_seconds, 3),
+        "rouge_seconds": round(rouge_seconds, 3),
+        "llm_calls": llm_stats["calls"],
+        "input_tokens": llm_stats["input_tokens"],
+        "output_tokens": llm_stats["output_tokens"],
+    }
+    for stage in STAGES:
+        for p, value in percentiles(durations[stage]).items():
+            metrics[f"{stage}_p{p}_ms"] = round(float(value), 1)
+    for rouge_type in ("rouge1", "rouge2", "rougeL"):
+        scores = pd.to_numeric(processed[f"{rouge_type} precision"], errors="coerce").dropna()
+        metrics[f"{rouge_type}_precision"] = round(float(scores.mean()), 4) if len(scores) else 0.0
+    settings = {"mode": mode, "replay_latency": replay_latency if mode == REPLAY else None,
+                "max_workers": max_workers, "summary_mode": summary_mode, "limit": limit}
+    if staged:
+        settings["staged"] = True
+    return metrics, settings, http_cassette, llm_cassette
+
+
+def median_metrics(runs):
+    """Médiane de chaque métrique sur plusieurs rejeux."""
+    if len(runs) == 1:
+        return runs[0]
+    medians = {}
+    for name, value in runs[0].items():
+        median = float(np.median([metrics[name] for metrics in runs]))
+        medians[name] = int(median) if isinstance(value, int) else round(median, 4)
+    return medians
+
+
+def print_report(metrics, http_cassette, llm_cassette):
+    print(f"\n📊 {metrics['processed']}/{metrics['documents']} documents traités en {metrics['seconds']:.2f}s "
+          f"({metrics['docs_per_second']:.2f} docs/s), {metrics['errors']} erreur(s)")
+    if metrics["cassette_misses"]:
+        misses = (http_cassette.misses + llm_cassette.misses)[:5]
+        print(f"⚠️ {metrics['cassette_misses']} requête(s) absente(s) de la cassette (réenregistrer), ex. : {misses}")
+    print(f"\n{'étape':12} {'n':>6} " + " ".join(f"{f'p{p} (ms)':>10}" for p in PERCENTILES))
+    counts = {"document": metrics["processed"] + metrics["errors"], "extraction": None,
+              "http": len(http_cassette.timings), "llm": len(llm_cassette.timings)}
+    for stage in STAGES:
+        count = "" if counts[stage] is None else counts[stage]
+        print(f"{stage:12} {count:>6} " + " ".join(f"{metrics[f'{stage}_p{p}_ms']:>10.1f}" for p in PERCENTILES))
+    print(f"\n🪙 {metrics['llm_calls']} appels LLM, {metrics['input_tokens']} tokens en entrée, "
+          f"{metrics['output_tokens']} en sortie")
+    print(f"🧮 ROUGE (précision moyenne) : R1 {metrics['rouge1_precision']:.4f}, R2 {metrics['rouge2_precision']:.4f}, "
+          f"RL {metrics['rougeL_precision']:.4f} (calculé en {metrics['rouge_seconds'] * 1000:.0f} ms)")
+
+
+def _regressed(direction, kind, baseline, value):
+    if kind == "count":
+        return value > baseline
+    if kind == "rouge":
+        return value < baseline - ROUGE_TOLERANCE
+    if kind == "latency" and value - baseline < LATENCY_FLOOR_MS:
+        return False
+    tolerance = TOKEN_TOLERANCE if kind == "tokens" else TIME_TOLERANCE
+    if direction == "higher":
+        return value < baseline * (1 - tolerance)
+    return value > baseline * (1 + tolerance)
+
+
+def compare(metrics, settings, baseline):
+    """Affiche l'écart à la référence et retourne la liste des métriques dégradées."""
+    different = [name for name in RUN_SETTINGS if baseline["settings"].get(name) != settings.get(name)]
+    if different:
+        print(f"\n⚠️ Référence obtenue avec d'autres paramètres ({', '.join(different)}) : pas de comparaison")
+        return []
+
+    print(f"\nComparaison avec la référence du {baseline['created']}")
+    print(f"{'métrique':22} {'référence':>12} {'actuel':>12} {'écart':>9}")
+    regressions = []
+    for name, (direction, kind) in COMPARED_METRICS.items():
+        reference, value = baseline["metrics"].get(name), metrics[name]
+        if reference is None:
+            continue
+        change = (value - reference) / reference if reference else 0.0
+        flag = _regressed(direction, kind, reference, value)
+        if flag:
+            regressions.append(name)
+        print(f"{name:22} {reference:>12} {value:>12} {change:>+8.1%} {'❌' if flag else ''}")
+    if regressions:
+        print(f"\n❌ Dégradation : {', '.join(regressions)}")
+    else:
+        print("\n✅ Aucune dégradation par rapport à la référence")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=[RECORD, REPLAY])
+    parser.add_argument("--full", action="store_true", help="Jeu de référence complet au lieu du jeu versionné")
+    parser.add_argument("--input-file", help=f"Défaut : {SAMPLES_FILE} ({BENCHMARK_FILE} avec --full)")
+    parser.add_argument("--cassette-dir", help=f"Défaut : {SAMPLES_CASSETTE_DIR} ({FULL_CASSETTE_DIR} avec --full)")
+    parser.add_argument("--baseline", help=f"Défaut : {SAMPLES_BASELINE} ({FULL_BASELINE} avec --full)")
+    parser.add_argument("--samples", action="store_true",
+                        help=f"Enregistrement : pages de {SAMPLE_PAGES_DIR} au lieu du réseau")
+    parser.add_argument("--fake-llm", action="store_true", help="Enregistrement : faux serveur LLM au lieu de l'API")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistre ces métriques comme référence")
+    parser.add_argument("--no-latency", action="store_true", help="Rejoue les réponses sans leur latence enregistrée")
+    parser.add_argument("--max-workers", type=int, default=pipeline.MAX_WORKERS)
+    parser.add_argument("--summary-mode", default=pipeline.SUMMARY_MODE, choices=["combined", "separate"])
+    parser.add_argument("--limit", type=int, default=None, help="Nombre de documents (tous par défaut)")
+    parser.add_argument("--staged", action="store_true", help="Pipeline par étapes (run_staged_pipeline)")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help=f"Rejeux dont la médiane est retenue (défaut : {SAMPLES_REPEAT}, 1 avec --full)")
+    args = parser.parse_args()
+    input_file = args.input_file or (BENCHMARK_FILE if args.full else SAMPLES_FILE)
+    cassette_dir = args.cassette_dir or (FULL_CASSETTE_DIR if args.full else SAMPLES_CASSETTE_DIR)
+    baseline = args.baseline or (FULL_BASELINE if args.full else SAMPLES_BASELINE)
+
+    # Un enregistrement remplace la cassette : une seule exécution
+    repeat = 1 if args.mode == RECORD else args.repeat or (1 if args.full else SAMPLES_REPEAT)
+
+    runs = []
+    for _ in range(repeat):
+        metrics, settings, http_cassette, llm_cassette = run(
+            args.mode, input_file, cassette_dir, not args.no_latency, args.max_workers, args.summary_mode,
+            args.limit, args.staged, args.samples, args.fake_llm)
+        runs.append(metrics)
+    metrics = median_metrics(runs)
+    if repeat > 1:
+        print(f"\n🔁 Médiane de {repeat} rejeux")
+    print_report(metrics, http_cassette, llm_cassette)
+    if args.mode == RECORD:
+        print(f"\n📼 Cassettes : {len(http_cassette)} réponses HTTP, {len(llm_cassette)} réponses LLM dans {cassette_dir}")
+
+    regressions = []
+    if args.save_baseline:
+        with open(baseline, "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "settings": settings,
+                       "metrics": metrics}, f, indent=2)
+        print(f"\n💾 Référence enregistrée : {baseline}")
+    elif args.mode == REPLAY and os.path.exists(baseline):
+        with open(baseline, encoding="utf-8") as f:
+            regressions = compare(metrics, settings, json.load(f))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Calcul ROUGE en lot (summarization/evaluate_rouge.score_batch) contre rouge_score ligne à ligne.
+
+Reprend les paires (take-away AI, take-away Illuin) du jeu de référence, répétées --repeat
+fois pour simuler un plus gros fichier, puis compare la durée de l'ancienne boucle (un
+RougeScorer par ligne, comme avant) à celle de score_batch, en local puis sur un pool de
+processus. Vérifie que précision, rappel et F1 sont identiques à rouge_score.
+Avec --full-content, la cible est le contenu complet du document (cas de l'interface) :
+il faut alors extraire les documents.
+    python -m benchmarks.rouge_benchmark --repeat 10
+    python -m benchmarks.rouge_benchmark --full-content --limit 10
+"""
+import argparse
+import time
+
+import pandas as pd
+from rouge_score import rouge_scorer
+
+import summarization.evaluate_rouge as evaluate_rouge
+from processing.data_extractor import DataExtractor
+
+BENCHMARK_FILE = "./output/AI takeaways benchmark.csv"
+SCORE_FIELDS = (("precision", "precision"), ("recall", "recall"), ("fmeasure", "f1"))
+
+
+def load_pairs(input_file, full_content, limit):
+    df = pd.read_csv(input_file)
+    df = df[df["Take-away AI"].notna() & df["Take-away (Illuin)"].notna()].head(limit)
+    if not full_content:
+        return list(zip(df["Take-away AI"], df["Take-away (Illuin)"]))
+    extractor = DataExtractor()
+    pairs = []
+    for _, row in df.iterrows():
+        try:
+            content = extractor.extract(row["Link"]).to_dict().get("content")
+        except Exception as e:
+            print(f"⚠️ {row['Link'][:60]}: {e}")
+            continue
+        if content:
+            pairs.append((row["Take-away AI"], content))
+    return pairs
+
+
+def reference_scores(pairs):
+    """Ancienne méthode : un RougeScorer construit pour chaque ligne."""
+    results = []
+    for prediction, target in pairs:
+        scorer = rouge_scorer.RougeScorer(list(evaluate_rouge.ROUGE_TYPES), use_stemmer=True)
+        results.append(scorer.score(target, prediction))
+    return results
+
+
+def clear_caches():
+    for function in (evaluate_rouge.tokenize, evaluate_rouge._ngram_counts, evaluate_rouge._position_masks):
+        function.cache_clear()
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def mismatches(expected, actual):
+    count = 0
+    for reference, scores in zip(expected, actual):
+        for rouge_type in evaluate_rouge.ROUGE_TYPES:
+            for field, key in SCORE_FIELDS:
+                count += getattr(reference[rouge_type], field) != scores[f"{rouge_type}_{key}"]
+    return count
+
+
+def run(input_file, repeat, workers, full_content, limit):
+    pairs = load_pairs(input_file, full_content, limit) * repeat
+    if not pairs:
+        print("Aucune paire à évaluer.")
+        return
+    predictions, targets = [prediction for prediction, _ in pairs], [target for _, target in pairs]
+    print(f"{len(pairs)} paires ({len(set(targets))} cibles distinctes)\n")
+
+    expected, baseline = timed(lambda: reference_scores(pairs))
+    clear_caches()
+    local, local_seconds = timed(lambda: evaluate_rouge.score_batch(predictions, targets, workers=1))
+    warm, warm_seconds = timed(lambda: evaluate_rouge.score_batch(predictions, targets, workers=1))
+    clear_caches()
+    minimum = evaluate_rouge.MIN_ROWS_PER_WORKER
+    evaluate_rouge.MIN_ROWS_PER_WORKER = 1  # force le pool, même sur un petit lot
+    try:
+        pooled, pooled_seconds = timed(lambda: evaluate_rouge.score_batch(predictions, targets, workers=workers))
+    finally:
+        evaluate_rouge.MIN_ROWS_PER_WORKER = minimum
+
+    print(f"{'méthode':42} {'durée':>10} {'gain':>8} {'écarts':>8}")
+    for label, results, seconds in (
+            ("rouge_score ligne à ligne", expected, baseline),
+            ("score_batch (cache vide)", local, local_seconds),
+            ("score_batch (cache chaud)", warm, warm_seconds),
+            (f"score_batch ({workers} processus)", pooled, pooled_seconds)):
+        errors = 0 if results is expected else mismatches(expected, results)
+        print(f"{label:42} {seconds * 1000:>8.0f}ms {baseline / seconds:>7.1f}x {errors:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-file", default=BENCHMARK_FILE)
+    parser.add_argument("--repeat", type=int, default=10, help="Nombre de copies du jeu de paires")
+    parser.add_argument("--workers", type=int, default=evaluate_rouge.ROUGE_WORKERS)
+    parser.add_argument("--full-content", action="store_true", help="Cible = contenu complet (extraction)")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    run(args.input_file, args.repeat, args.workers, args.full_content, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import re
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+from processing.html_parsing import LxmlDocument, element_text
+
+# Blocs de texte conservés dans le contenu principal
+CONTENT_TAGS = ('p', 'h1', 'h2', 'h3', 'li', 'pre', 'blockquote')
+
+# Sous-arbres jamais retenus
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'nav', 'footer', 'header', 'aside', 'form',
+                'iframe', 'svg', 'button', 'select', 'template'}
+BOILERPLATE_PATTERN = re.compile(
+    r'cookie|consent|banner|footer|\bnav|menu|sidebar|related|share|social|comment|newsletter|'
+    r'subscribe|promo|breadcrumb|advert|\bads?\b|popup|modal|signup|author-bio|recommend',
+    re.IGNORECASE,
+)
+CONTENT_PATTERN = re.compile(r'article|content|post|entry|main|body|text|story|prose|markdown', re.IGNORECASE)
+
+MIN_BLOCK_CHARS = 25  # blocs plus courts ignorés pour le score (légendes, boutons...)
+MAX_LINK_DENSITY = 0.5  # au-delà, un bloc est considéré comme une liste de liens
+SIBLING_SCORE_RATIO = 0.2  # un voisin du meilleur candidat est gardé s'il atteint ce ratio de son score
+MIN_MAIN_CONTENT_CHARS = 200  # en dessous, on considère que l'extraction a échoué
+
+
+def _class_weight(element):
+    names = f"{element.get('class', '')} {element.get('id', '')}"
+    if not names.strip():
+        return 0
+    weight = 0
+    if BOILERPLATE_PATTERN.search(names):
+        weight -= 25
+    if CONTENT_PATTERN.search(names):
+        weight += 25
+    return weight
+
+
+def _is_boilerplate(element):
+    tag = element.tag if isinstance(element.tag, str) else ''
+    if tag in SKIPPED_TAGS:
+        return True
+    if element.get('role') in ('navigation', 'banner', 'contentinfo', 'complementary', 'dialog'):
+        return True
+    return _class_weight(element) < 0
+
+
+def _link_length(element):
+    return sum(len(a.text_content()) for a in element.iter('a'))
+
+
+def _headline(root):
+    """
+    Titre de l'article : premier <h1> hors navigation / pied de page. Il est souvent dans un
+    <header> ou à côté du conteneur de l'article, donc absent du contenu retenu.
+    """
+    for h1 in root.iter('h1'):
+        if any(ancestor.tag in ('nav', 'footer', 'aside') for ancestor in h1.iterancestors()):
+            continue
+        text = " ".join(h1.text_content().split())
+        if text:
+            return text
+    return None
+
+
+def extract_main_content(root):
+    """
+    Extrait le corps de l'article d'une page en écartant menus, pieds de page, bannières
+    et listes de liens (score de densité de texte à la Readability). Le titre (<h1>) de la page
+    est remis en tête s'il n'est pas dans le conteneur retenu.
+
+    Un seul parcours de l'arbre élague les sous-arbres de boilerplate, relève les blocs de
+    texte et crédite leurs parents / grands-parents ; le conteneur le mieux noté (et ses
+    voisins bien notés) fournit ensuite le contenu.
+
+    Args:
+        root: Racine lxml de la page
+
+    Returns:
+        str: Texte du contenu principal, un bloc par ligne (None si rien de probant)
+    """
+    if root is None:
+        return None
+
+    blocks = []  # (élément, texte)
+    scores = {}
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if not isinstance(element.tag, str) or _is_boilerplate(element):
+            continue
+
+        if element.tag in CONTENT_TAGS:
+            # Bloc de texte : ses descendants font partie de son texte, inutile de descendre
+            text = element_text(element).strip()
+            if not text:
+                continue
+            link_density = _link_length(element) / len(text)
+            if link_density > MAX_LINK_DENSITY:
+                continue
+            blocks.append((element, text))
+
+            if len(text) >= MIN_BLOCK_CHARS:
+                score = 1 + text.count(',') + min(len(text) / 100, 3)
+                score *= 1 - link_density
+                parent = element.getparent()
+                if parent is not None:
+                    scores[parent] = scores.get(parent, 0) + score
+                    grandparent = parent.getparent()
+                    if grandparent is not None:
+                        scores[grandparent] = scores.get(grandparent, 0) + score / 2
+            continue
+
+        # Parcours en profondeur dans l'ordre du document
+        stack.extend(reversed(element))
+
+    if not scores:
+        return None
+
+    def weighted(candidate):
+        bonus = 10 if candidate.tag in ('article', 'main') else 0
+        return scores[candidate] + _class_weight(candidate) + bonus
+
+    best = max(scores, key=weighted)
+    best_score = weighted(best)
+
+    # Les voisins bien notés du meilleur candidat appartiennent souvent au même article
+    containers = {best}
+    parent = best.getparent()
+    if parent is not None:
+        for sibling in parent:
+            if sibling in scores and weighted(sibling) >= best_score * SIBLING_SCORE_RATIO:
+                containers.add(sibling)
+
+    kept = [text for element, text in blocks
+            if element in containers or any(ancestor in containers for ancestor in element.iterancestors())]
+    headline = _headline(root)
+    if headline and not any(headline in " ".join(text.split()) for text in kept[:3]):
+        kept.insert(0, headline)
+    content = "\n".join(kept)
+    return content if len(content) >= MIN_MAIN_CONTENT_CHARS else None
+
+
+def extract_main_content_from_html(markup):
+    """Raccourci : parse le HTML (str ou bytes) puis extrait le contenu principal."""
+    if lxml is None:
+        return None
+    return extract_main_content(LxmlDocument(markup).root)
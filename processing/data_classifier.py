@@ -1,8 +1,84 @@
+import re
+from urllib.parse import urlparse
+
+# Types de contenu détectés
+MODEL = "model"
+DATASET = "dataset"
+LIBRARY = "library"
+PAPER = "paper"
+UNKNOWN = "unknown"
+
+# Catégorie du pipeline correspondant à un type de contenu (un article peut relever de n'importe quelle catégorie)
+CONTENT_TYPE_CATEGORIES = {MODEL: "Model", DATASET: "Dataset", LIBRARY: "Library"}
+
+# Confiance à partir de laquelle la classification LLM est inutile
+CERTAIN_CONFIDENCE = 0.9
+
+# Poids fictif ajouté au total : un indice isolé et faible ne suffit pas à rendre un type certain
+EVIDENCE_PRIOR = 0.4
+
+# Seul le début des README est examiné : les marqueurs utiles y figurent et les très longs README coûtent cher
+README_SCAN_CHARS = 20000
+
+# Poids des indices : chaque règle vérifiée ajoute son poids au type qu'elle désigne
+SOURCE_TYPE_WEIGHTS = {
+    "huggingface_model": (MODEL, 4.0),
+    "huggingface_dataset": (DATASET, 4.0),
+    "arxiv": (PAPER, 3.0),
+    "github": (LIBRARY, 1.0),
+}
+# Pages du site Hugging Face que l'extracteur prend pour des modèles (huggingface.co/<page>/...)
+HUGGINGFACE_PAGES = {"papers": PAPER, "collections": UNKNOWN, "docs": UNKNOWN, "learn": UNKNOWN, "posts": UNKNOWN}
+MODEL_CARD_KEYS = frozenset({"base_model", "model-index", "library_name", "pipeline_tag", "model_name", "model_type"})
+DATASET_CARD_KEYS = frozenset({"task_categories", "size_categories", "dataset_info", "configs", "source_datasets",
+                               "annotations_creators", "multilinguality", "task_ids"})
+MODEL_TAGS = frozenset({"transformers", "safetensors", "pytorch", "gguf", "onnx", "diffusers", "peft", "text-generation-inference"})
+DATASET_TAG_PREFIXES = ("task_categories:", "size_categories:", "format:", "modality:")
+
+# Langages d'une bibliothèque ; les dépôts de notebooks ou sans code ne donnent pas d'indice
+LIBRARY_LANGUAGES = frozenset({"Python", "C++", "C", "Rust", "Go", "Java", "JavaScript", "TypeScript", "Julia",
+                               "Cuda", "Scala", "Kotlin", "Swift", "C#", "R", "Mojo", "Zig"})
+# Pages d'un dépôt (fichier, PR, issue...) : elles ne présentent pas forcément le dépôt lui-même
+GITHUB_SUBPAGES = frozenset({"blob", "tree", "pull", "issues", "discussions", "releases", "wiki"})
+
+README_MARKERS = [
+    (LIBRARY, 2.0, re.compile(r"\b(?:pip3? install|conda install|npm (?:install|i)|yarn add|cargo (?:add|install)|"
+                              r"go get|poetry add|uv add|brew install)\b", re.IGNORECASE)),
+    (LIBRARY, 1.0, re.compile(r"^#+\s*(?:installation|install|quick ?start|usage|api reference)\b",
+                              re.IGNORECASE | re.MULTILINE)),
+    (MODEL, 1.5, re.compile(r"\b(?:model weights|pre-?trained (?:weights|checkpoints?|models?)|download (?:the )?"
+                            r"(?:model|checkpoints?|weights)|model card|from_pretrained)\b", re.IGNORECASE)),
+    (DATASET, 1.5, re.compile(r"\b(?:download (?:the )?(?:dataset|data)|dataset card|huggingface\.co/datasets/|"
+                              r"load_dataset\(|data collection|annotation guidelines)\b", re.IGNORECASE)),
+    (DATASET, 1.0, re.compile(r"^#+\s*(?:dataset|data(?:set)? statistics|data format)\b", re.IGNORECASE | re.MULTILINE)),
+    (PAPER, 1.5, re.compile(r"\b(?:official (?:\w+ )?implementation|code for (?:the|our) paper|"
+                            r"@(?:article|inproceedings|misc)\{)", re.IGNORECASE)),
+]
+
+# Résumés arXiv : ce que l'article dit publier
+ABSTRACT_MARKERS = [
+    (DATASET, 1.5, re.compile(r"\bwe (?:introduce|present|release|construct|collect|build|curate|propose)\b"
+                              r"[^.]{0,80}\b(?:dataset|corpus|benchmark)\b", re.IGNORECASE)),
+    (LIBRARY, 1.5, re.compile(r"\b(?:open[- ]source|we (?:introduce|present|release))\b[^.]{0,60}"
+                              r"\b(?:library|toolkit|framework|package)\b", re.IGNORECASE)),
+    (MODEL, 1.5, re.compile(r"\bwe (?:introduce|present|release)\b[^.]{0,80}\b(?:model|models|LLM|LLMs)\b"
+                            r"[^.]{0,40}\b(?:weights|checkpoints?|parameters|publicly available)\b", re.IGNORECASE)),
+]
+# Catégories arXiv annonçant plutôt du logiciel ou des données
+ARXIV_CATEGORY_WEIGHTS = {"cs.SE": (LIBRARY, 1.0), "cs.MS": (LIBRARY, 1.0), "cs.DB": (DATASET, 0.5)}
+
+
 class DataClassifier:
     """
     Classe pour classifier les données extraites en fonction de leur type :
     - Dataset
     - Modèle
+    - Bibliothèque
+    - Article
+
+    Chaque règle (type de source, métadonnées Hugging Face, langage et README GitHub,
+    catégories et résumé arXiv) ajoute un poids au type qu'elle désigne ; la confiance
+    est la part du poids total (augmenté de EVIDENCE_PRIOR) revenant au type retenu.
     """
 
     @staticmethod
@@ -17,17 +93,116 @@ class DataClassifier:
         else:
             return "unknown"
 
+    @staticmethod
+    def _as_dict(data):
+        """Accepte un ExtractedData ou le dictionnaire produit par to_dict()."""
+        return data.to_dict() if hasattr(data, "to_dict") else data
+
+    @staticmethod
+    def _huggingface_evidence(metadata):
+        # Réponse brute de l'API (modelId / datasetId) ou métadonnées de l'extracteur
+        content_type = DataClassifier.classify_huggingface_data(metadata)
+        if content_type != UNKNOWN:
+            yield content_type, 2.0
+        if metadata.get('pipeline_tag'):
+            yield MODEL, 2.0
+        card = metadata.get('cardData') or {}
+        if isinstance(card, dict):
+            if MODEL_CARD_KEYS.intersection(card):
+                yield MODEL, 1.0
+            if DATASET_CARD_KEYS.intersection(card):
+                yield DATASET, 2.0
+        if metadata.get('features'):
+            yield DATASET, 1.0
+        tags = metadata.get('tags') or []
+        if MODEL_TAGS.intersection(tags):
+            yield MODEL, 1.0
+        if any(tag.startswith(DATASET_TAG_PREFIXES) for tag in tags):
+            yield DATASET, 1.0
+
+    @staticmethod
+    def _github_evidence(identifier, metadata, content):
+        if metadata.get('language') in LIBRARY_LANGUAGES:
+            yield LIBRARY, 1.0
+        path_parts = urlparse(identifier or "").path.strip('/').split('/')
+        if len(path_parts) > 2 and path_parts[2] in GITHUB_SUBPAGES:
+            yield UNKNOWN, 2.0
+        readme = content[:README_SCAN_CHARS]
+        for content_type, weight, marker in README_MARKERS:
+            if marker.search(readme):
+                yield content_type, weight
+
+    @staticmethod
+    def _arxiv_evidence(metadata, content):
+        categories = metadata.get('categories') or ""
+        for category in categories if isinstance(categories, list) else [categories]:
+            if category in ARXIV_CATEGORY_WEIGHTS:
+                yield ARXIV_CATEGORY_WEIGHTS[category]
+        abstract = metadata.get('summary') or content[:README_SCAN_CHARS]
+        for content_type, weight, marker in ABSTRACT_MARKERS:
+            if marker.search(abstract):
+                yield content_type, weight
+
+    @staticmethod
+    def _evidence(data):
+        source_type = data.get('source_type')
+        metadata = data.get('metadata') or {}
+        content = data.get('content') or ""
+        page = (data.get('identifier') or "").split('/', 1)[0]
+        if source_type == "huggingface_model" and page in HUGGINGFACE_PAGES:
+            yield HUGGINGFACE_PAGES[page], SOURCE_TYPE_WEIGHTS[source_type][1]
+            return
+        if source_type in SOURCE_TYPE_WEIGHTS:
+            yield SOURCE_TYPE_WEIGHTS[source_type]
+        if source_type in ("huggingface_model", "huggingface_dataset") or 'cardData' in metadata:
+            yield from DataClassifier._huggingface_evidence(metadata)
+        elif source_type == "github" or 'language' in metadata:
+            yield from DataClassifier._github_evidence(data.get('identifier'), metadata, content)
+        elif source_type == "arxiv":
+            yield from DataClassifier._arxiv_evidence(metadata, content)
+
+    @staticmethod
+    def predict(data):
+        """
+        Type de contenu le plus probable et confiance associée.
+
+        Args:
+            data: ExtractedData ou dictionnaire (source_type, identifier, content, metadata)
+
+        Returns:
+            tuple: (type de contenu, confiance entre 0 et 1)
+        """
+        scores = {}
+        for content_type, weight in DataClassifier._evidence(DataClassifier._as_dict(data)):
+            scores[content_type] = scores.get(content_type, 0.0) + weight
+        if not scores:
+            return UNKNOWN, 0.0
+        content_type = max(scores, key=scores.get)
+        return content_type, scores[content_type] / (sum(scores.values()) + EVIDENCE_PRIOR)
+
+    @staticmethod
+    def classify_batch(items):
+        """Classifie une liste de documents ; retourne les (type de contenu, confiance) dans l'ordre."""
+        return [DataClassifier.predict(data) for data in items]
+
+    @staticmethod
+    def certain_category(data, min_confidence=CERTAIN_CONFIDENCE):
+        """
+        Catégorie du pipeline (Model, Dataset, Library) lorsque les règles suffisent à la déterminer,
+        sinon None : la classification doit alors être demandée au LLM.
+        """
+        content_type, confidence = DataClassifier.predict(data)
+        if confidence < min_confidence:
+            return None
+        return CONTENT_TYPE_CATEGORIES.get(content_type)
+
     @staticmethod
     def is_dataset(data):
         """
         Vérifie si les données correspondent à un dataset.
 
         """
-        if data.get('source_type') == "huggingface_dataset" :
-            return True
-        else:
-            # METTRE METHODE DE CLASSIFICATION
-            return False
+        return DataClassifier.predict(data)[0] == DATASET
 
     @staticmethod
     def is_model(data):
@@ -35,20 +210,11 @@ class DataClassifier:
         Vérifie si les données correspondent à un modèle.
 
         """
-        if data.get('source_type') == "huggingface_model" :
-            return True
-        else:
-            # METTRE METHODE DE CLASSIFICATION
-            return False
+        return DataClassifier.predict(data)[0] == MODEL
 
     @staticmethod
     def classify(data):
         """
         Classifie génériquement les données extraites.
         """
-        if DataClassifier.is_dataset(data):
-            return "dataset"
-        elif DataClassifier.is_model(data):
-            return "model"
-        else:
-            return "unknown"
+        return DataClassifier.predict(data)[0]
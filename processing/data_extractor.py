@@ -1,51 +1,217 @@
 
 import re
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-import os
-import pymupdf
 from urllib.parse import urlparse
 from processing.extracted_data import ExtractedData
+from processing.failures import ParseError
+from processing.http_client import HttpClient, HttpStatusError, HostThrottle
+from processing.http_cache import HttpCache, DEFAULT_CACHE_DIR
+from processing.pdf_extractor import extract_pdf_text
+from processing.html_parsing import HTML_PARSER, TARGETED_PARSING, BLOG_TAGS, SPACE_TAGS, parse_html, LxmlDocument
+from processing.content_extraction import extract_main_content, extract_main_content_from_html
+
+ARXIV_API_URL = 'https://export.arxiv.org/api/query'
+ARXIV_BATCH_SIZE = 100  # nombre d'identifiants envoyés par requête id_list
+ARXIV_API_INTERVAL = 3  # secondes minimum entre deux appels réseau à l'API arXiv
+
+# Papiers arXiv cités dans les tags d'un modèle / dataset HuggingFace
+HF_ARXIV_TAGS_MODE = 'metadata'  # 'metadata' : références paresseuses, 'full' : texte complet immédiat
+HF_MAX_ARXIV_PAPERS = 3  # nombre maximum de papiers rattachés à un modèle / dataset
+HF_ARXIV_WORKERS = 3  # téléchargements simultanés en mode 'full'
+
+# Résolution du README des dépôts HuggingFace, par ordre de préférence
+HF_README_FILENAMES = ['README.md', 'README.rst', 'README.txt']
+HF_README_BRANCHES = ['main', 'master']
+README_UNAVAILABLE = "README non disponible."
+# Statuts indiquant que le README n'existe pas : seuls cas mémorisés comme absents
+README_MISSING_STATUSES = {404, 410}
+
+# Ne garder que le corps de l'article des blogs (sans menus, pieds de page, bannières...)
+BLOG_MAIN_CONTENT = True
+
+# Partagé par toutes les instances : l'intervalle de politesse vaut pour tout le processus
+_arxiv_api_throttle = HostThrottle(ARXIV_API_INTERVAL)
+
+def _arxiv_base_id(arxiv_id):
+    """Retire le suffixe de version (ex: 2401.05856v2 -> 2401.05856)."""
+    return re.sub(r'v\d+$', '', arxiv_id.strip())
+
+class ArxivPaperRef(dict):
+    """
+    Référence paresseuse vers un papier arXiv cité par un modèle ou un dataset HuggingFace.
+
+    Contient dès sa création les métadonnées issues de l'appel groupé (titre, résumé, auteurs...).
+    Le texte complet n'est téléchargé qu'au premier accès à ref['content'] ou ref.resolve() ;
+    tant qu'il n'est pas résolu, il n'apparaît ni dans l'itération ni dans la sérialisation.
+    """
+
+    def __init__(self, extractor, arxiv_id, entry):
+        super().__init__(
+            arxiv_id=arxiv_id,
+            title=entry['title'],
+            metadata=dict(entry['metadata']),
+            links=[f'https://arxiv.org/abs/{arxiv_id}'],
+        )
+        self._extractor = extractor
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self):
+        return dict.__contains__(self, 'content')
+
+    def resolve(self):
+        """Télécharge et extrait le texte complet (une seule fois)."""
+        with self._lock:
+            if not self.resolved:
+                try:
+                    self.update(self._extractor.extract_arxiv(self['arxiv_id']))
+                except Exception as e:
+                    self['content'] = ""
+                    self['error'] = str(e)
+        return self
+
+    def __missing__(self, key):
+        if key == 'content':
+            return self.resolve()['content']
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key == 'content':
+            return self['content']
+        return super().get(key, default)
 
 class DataExtractor:
-    def __init__(self):
-        # Utiliser une session pour réutiliser les connexions HTTP
-        self.session = requests.Session()
+    def __init__(self, http=None, use_cache=True, cache_dir=DEFAULT_CACHE_DIR,
+                 pdf_max_pages=None, pdf_max_chars=None,
+                 arxiv_tags_mode=HF_ARXIV_TAGS_MODE, max_arxiv_tag_papers=HF_MAX_ARXIV_PAPERS):
+        # Toutes les requêtes passent par la même couche de transport (pool keep-alive, timeouts, retries)
+        # et, sauf demande contraire, par le cache disque partagé entre le pipeline et Streamlit
+        if http is None:
+            http = HttpClient(cache=HttpCache(cache_dir) if use_cache else None)
+        self.http = http
+        self.http.throttles[urlparse(ARXIV_API_URL).netloc] = _arxiv_api_throttle
+        self.session = self.http.session
+        # Limites optionnelles sur l'extraction du texte des PDF arXiv
+        self.pdf_max_pages = pdf_max_pages
+        self.pdf_max_chars = pdf_max_chars
+        # Expansion des tags arxiv:XXXX des modèles / datasets HuggingFace
+        self.arxiv_tags_mode = arxiv_tags_mode
+        self.max_arxiv_tag_papers = max_arxiv_tag_papers
+        # Backend de parsing HTML (blogs, blog HF, Spaces)
+        self.html_parser = HTML_PARSER
+        self.targeted_parsing = TARGETED_PARSING
+        self.blog_main_content = BLOG_MAIN_CONTENT
+        # Métadonnées arXiv déjà résolues par cette instance, par identifiant demandé
+        self._arxiv_metadata = {}
+        self._arxiv_metadata_lock = threading.Lock()
+        # Dépôts HuggingFace sans README (complété par le cache disque s'il est actif)
+        self._missing_readmes = set()
+
+    def _query_arxiv_api(self, params):
+        """
+        Appel à l'API arXiv. L'intervalle de 3 secondes entre deux requêtes réseau est appliqué
+        par le client HTTP (HostThrottle) : une réponse fraîche du cache n'attend pas.
+        """
+        return self.http.get(ARXIV_API_URL, params=params)
+
+    @staticmethod
+    def _parse_arxiv_entry(entry):
+        arxiv_id = entry.id.text.strip().split('/abs/')[-1]
+        pdf_link = entry.find('link', title='pdf')
+        return {
+            'arxiv_id': arxiv_id,
+            'title': entry.title.text.strip(),
+            'metadata': {
+                'authors': [author.find('name').text for author in entry.find_all('author')],
+                'summary': entry.summary.text.strip(),
+                'publication_date': entry.published.text,
+                'categories': entry.find('arxiv:primary_category')['term'],
+            },
+            'pdf_url': pdf_link['href'] if pdf_link else f'https://arxiv.org/pdf/{arxiv_id}',
+        }
+
+    def fetch_arxiv_metadata(self, arxiv_ids):
+        """
+        Récupère les métadonnées de plusieurs articles arXiv en un minimum de requêtes id_list.
+
+        Args:
+            arxiv_ids: Liste d'identifiants arXiv (avec ou sans suffixe de version)
+
+        Returns:
+            dict: identifiant demandé -> métadonnées ('title', 'metadata', 'pdf_url', ...).
+                  Les identifiants inconnus d'arXiv sont absents du dictionnaire.
+        """
+        requested = list(dict.fromkeys(arxiv_id.strip() for arxiv_id in arxiv_ids))
+        with self._arxiv_metadata_lock:
+            missing = [arxiv_id for arxiv_id in requested if arxiv_id not in self._arxiv_metadata]
+
+        for start in range(0, len(missing), ARXIV_BATCH_SIZE):
+            batch = missing[start:start + ARXIV_BATCH_SIZE]
+            response = self._query_arxiv_api({'id_list': ','.join(batch), 'max_results': len(batch)})
+            if response.status_code != 200:
+                raise HttpStatusError(f"Erreur lors de la récupération des données arXiv: {response.status_code}", response.status_code)
+            soup = BeautifulSoup(response.content, 'xml')
+
+            # arXiv renvoie les entrées avec leur version : on les rattache aux identifiants demandés
+            by_id = {}
+            for entry in soup.find_all('entry'):
+                if not entry.find('link', title='pdf') and not entry.find('arxiv:primary_category'):
+                    continue  # entrée d'erreur (identifiant invalide)
+                parsed = self._parse_arxiv_entry(entry)
+                by_id[parsed['arxiv_id']] = parsed
+                by_id.setdefault(_arxiv_base_id(parsed['arxiv_id']), parsed)
+
+            with self._arxiv_metadata_lock:
+                for arxiv_id in batch:
+                    # None mémorise qu'arXiv ne connaît pas cet identifiant
+                    self._arxiv_metadata[arxiv_id] = by_id.get(arxiv_id) or by_id.get(_arxiv_base_id(arxiv_id))
+
+        with self._arxiv_metadata_lock:
+            return {arxiv_id: self._arxiv_metadata[arxiv_id] for arxiv_id in requested
+                    if self._arxiv_metadata.get(arxiv_id)}
 
     def extract_arxiv(self, arxiv_id):
-        # Récupérer les métadonnées via l'API arXiv
-        url = f'https://export.arxiv.org/api/query?id_list={arxiv_id}'
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'xml')
-        entry = soup.find('entry')
+        return self.parse_arxiv(self.fetch_arxiv(arxiv_id))
+
+    def fetch_arxiv(self, arxiv_id):
+        """Partie réseau de extract_arxiv : métadonnées et octets du PDF."""
+        # Récupérer les métadonnées via l'API arXiv (ou depuis un appel groupé précédent)
+        arxiv_id = arxiv_id.strip()
+        entry = self.fetch_arxiv_metadata([arxiv_id]).get(arxiv_id)
         if not entry:
             raise ValueError("Aucune entrée trouvée pour l'ID arXiv fourni.")
 
-        title = entry.title.text.strip()
+        pdf_response = self.http.get(entry['pdf_url'])
+        if pdf_response.status_code != 200:
+            raise HttpStatusError(f"Erreur lors du téléchargement du PDF arXiv: {pdf_response.status_code}",
+                                  pdf_response.status_code)
+        return {'arxiv_id': arxiv_id, 'entry': entry, 'pdf': pdf_response.content}
 
-        metadata = {
-            'authors': [author.find('name').text for author in entry.find_all('author')],
-            'summary': entry.summary.text.strip(),
-            'publication_date': entry.published.text,
-            'categories': entry.find('arxiv:primary_category')['term'],
-        }
+    def parse_arxiv(self, fetched, pdf_parser=None):
+        """
+        Partie calcul de extract_arxiv : extraction du texte du PDF, directement en mémoire.
 
-        # Télécharger le PDF et extraire le texte
-        pdf_url = entry.find('link', title='pdf')['href']
-        pdf_response = requests.get(pdf_url)
-        pdf_path = f"{arxiv_id}.pdf"
-        with open(pdf_path, 'wb') as f:
-            f.write(pdf_response.content)
+        Args:
+            fetched: Résultat de fetch_arxiv
+            pdf_parser: Fonction (octets, max_pages, max_chars) -> (texte, statistiques) ;
+                        extract_pdf_text par défaut, ou son exécution dans un pool de processus
+        """
+        arxiv_id, entry = fetched['arxiv_id'], fetched['entry']
+        title = entry['title']
+        metadata = dict(entry['metadata'])
 
         try:
-            with pymupdf.open(pdf_path) as doc:
-                content = ""
-                for page in doc:
-                    content += page.get_text()
+            content, pdf_stats = (pdf_parser or extract_pdf_text)(
+                fetched['pdf'], max_pages=self.pdf_max_pages, max_chars=self.pdf_max_chars
+            )
+            metadata['pdf_stats'] = pdf_stats
+            print(f"📄 {arxiv_id}: {pdf_stats['parsed_pages']}/{pdf_stats['pages']} pages en "
+                  f"{pdf_stats['parse_seconds']:.2f}s (mémoire {pdf_stats['memory_mb']} Mo)")
         except Exception as e:
-            content = f"Erreur lors de l'extraction du texte PDF: {e}"
-        finally:
-            os.remove(pdf_path)
+            # PDF corrompu ou illisible : échec de parsing, sans envoyer le message d'erreur au LLM
+            raise ParseError(f"Erreur lors de l'extraction du texte PDF: {e}") from e
 
         return {
             'title': title,
@@ -54,6 +220,21 @@ class DataExtractor:
             'links': [f'https://arxiv.org/abs/{arxiv_id}']
         }
 
+    def extract_arxiv_batch(self, arxiv_ids):
+        """
+        Extrait plusieurs articles arXiv en résolvant toutes les métadonnées en un seul appel groupé.
+        Retourne une liste dans l'ordre des identifiants ; un article en échec est remplacé par
+        {'arxiv_id': ..., 'error': ...}.
+        """
+        self.fetch_arxiv_metadata(arxiv_ids)
+        results = []
+        for arxiv_id in arxiv_ids:
+            try:
+                results.append(self.extract_arxiv(arxiv_id))
+            except Exception as e:
+                results.append({'arxiv_id': arxiv_id, 'error': str(e)})
+        return results
+
     def extract_github(self, repo_url):
         # Extraire le propriétaire et le nom du dépôt à partir de l'URL
         parsed_url = urlparse(repo_url)
@@ -64,16 +245,16 @@ class DataExtractor:
 
         # Récupérer les métadonnées via l'API GitHub
         api_url = f'https://api.github.com/repos/{repo_owner}/{repo_name}'
-        response = requests.get(api_url)
+        response = self.http.get(api_url)
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération des données GitHub: {response.status_code}")
+            raise HttpStatusError(f"Erreur lors de la récupération des données GitHub: {response.status_code}", response.status_code)
         repo_data = response.json()
 
         title = repo_data.get('name', "Nom non disponible")
 
         # Récupérer le README via l'API GitHub
         readme_url = f'https://api.github.com/repos/{repo_owner}/{repo_name}/readme'
-        response = requests.get(readme_url, headers={'Accept': 'application/vnd.github.v3.raw'})
+        response = self.http.get(readme_url, headers={'Accept': 'application/vnd.github.v3.raw'})
         content =  response.text if response.status_code == 200 else "README non disponible."
 
         metadata = {
@@ -93,13 +274,13 @@ class DataExtractor:
     def extract_huggingface_model(self, model_id):
         # Récupérer les métadonnées via l'API HuggingFace
         api_url = f'https://huggingface.co/api/models/{model_id}'
-        response = requests.get(api_url)
+        response = self.http.get(api_url)
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération des données HuggingFace: {response.status_code}")
+            raise HttpStatusError(f"Erreur lors de la récupération des données HuggingFace: {response.status_code}", response.status_code)
         model_data = response.json()
 
         title = model_data.get('modelId', "Modèle non disponible")
-        content = self._fetch_huggingface_readme(model_id)
+        content = self._fetch_huggingface_readme(model_id, model_data.get('siblings'), model_data.get('sha'))
 
         metadata = {
             'author': model_data.get('author'),
@@ -122,13 +303,13 @@ class DataExtractor:
     def extract_huggingface_dataset(self, dataset_id):
         # Récupérer les métadonnées via l'API HuggingFace
         api_url = f'https://huggingface.co/api/datasets/{dataset_id}'
-        response = requests.get(api_url)
+        response = self.http.get(api_url)
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération des données HuggingFace: {response.status_code}")
+            raise HttpStatusError(f"Erreur lors de la récupération des données HuggingFace: {response.status_code}", response.status_code)
         dataset_data = response.json()
 
         title = dataset_data.get('datasetId', "Dataset non disponible")
-        content = self._fetch_huggingface_readme(f'datasets/{dataset_id}')
+        content = self._fetch_huggingface_readme(f'datasets/{dataset_id}', dataset_data.get('siblings'), dataset_data.get('sha'))
 
         metadata = {
             'author': dataset_data.get('author'),
@@ -152,28 +333,28 @@ class DataExtractor:
         """
         Scrape un article de blog Hugging Face.
         """
-        response = requests.get(blog_url)
+        return self.parse_huggingface_blog(self.fetch_huggingface_blog(blog_url))
+
+    def fetch_huggingface_blog(self, blog_url):
+        response = self.http.get(blog_url)
         
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération du blog: {response.status_code}")
+            raise HttpStatusError(f"Erreur lors de la récupération du blog: {response.status_code}", response.status_code)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        return response.content
 
-        title_tag = soup.find('h1')
-        title = title_tag.text.strip() if title_tag else "Titre non disponible"
+    def parse_huggingface_blog(self, html):
+        # Les tags sont cherchés dans une div : l'arbre complet est nécessaire ici
+        doc = parse_html(html, self.html_parser, targeted=False)
 
-        content_blocks = soup.find_all(['p', 'h2', 'h3', 'li'])
-        content = "\n".join([block.get_text().strip() for block in content_blocks])
+        title = doc.first_text('h1', default="Titre non disponible")
 
-        metadata = {}
-        author_tag = soup.find('a', {'class': 'author'})
-        metadata['author'] = author_tag.text.strip() if author_tag else "Auteur inconnu"
-
-        date_tag = soup.find('time')
-        metadata['publication_date'] = date_tag.text.strip() if date_tag else "Date inconnue"
+        content = doc.text_blocks(['p', 'h2', 'h3', 'li'])
 
-        tags_section = soup.find('div', {'class': 'tags'})
-        metadata['tags'] = [tag.text.strip() for tag in tags_section.find_all('a')] if tags_section else []
+        metadata = {}
+        metadata['author'] = doc.first_text('a', 'author', default="Auteur inconnu")
+        metadata['publication_date'] = doc.first_text('time', default="Date inconnue")
+        metadata['tags'] = doc.all_texts('a', within=('div', 'tags')) or []
 
         return {
             'title': title,
@@ -185,23 +366,24 @@ class DataExtractor:
         """
         Scrape un Hugging Face Space pour récupérer ses informations.
         """
+        return self.parse_huggingface_space(self.fetch_huggingface_space(space_id))
+
+    def fetch_huggingface_space(self, space_id):
         url = f'https://huggingface.co/spaces/{space_id}'
-        response = requests.get(url)
+        response = self.http.get(url)
 
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération du Space: {response.status_code}")
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        title_tag = soup.find('h1')
-        title = title_tag.text.strip() if title_tag else "Nom non disponible"
-        description_tag = soup.find('meta', {'property': 'og:description'})
-        description = description_tag["content"].strip() if description_tag else "Description non disponible"
-        creator_tag = soup.find('a', {'class': 'author'})
-        creator = creator_tag.text.strip() if creator_tag else "Créateur inconnu"
-        tags_section = soup.find_all('span', {'class': 'tag'})
-        tags = [tag.text.strip() for tag in tags_section] if tags_section else []
-        content_blocks = soup.find_all(['p', 'h2', 'h3', 'li'])
-        content = "\n".join([block.get_text().strip() for block in content_blocks])
+            raise HttpStatusError(f"Erreur lors de la récupération du Space: {response.status_code}", response.status_code)
+
+        return response.content
+
+    def parse_huggingface_space(self, html):
+        doc = parse_html(html, self.html_parser, only=SPACE_TAGS, targeted=self.targeted_parsing)
+        title = doc.first_text('h1', default="Nom non disponible")
+        description = doc.meta_content('og:description', default="Description non disponible")
+        creator = doc.first_text('a', 'author', default="Créateur inconnu")
+        tags = doc.all_texts('span', 'tag')
+        content = doc.text_blocks(['p', 'h2', 'h3', 'li'])
 
         metadata = {
             'creator': creator,
@@ -215,62 +397,127 @@ class DataExtractor:
             'metadata': metadata
         }
 
-    def _fetch_huggingface_readme(self, identifier):
+    def _fetch_huggingface_readme(self, identifier, siblings=None, revision=None):
         """
         Méthode interne pour récupérer le README d'un modèle ou d'un dataset HuggingFace.
+
+        La liste des fichiers du dépôt ('siblings' de la réponse de l'API) permet de choisir le bon
+        fichier et de le télécharger en une seule requête. Sans cette liste, les combinaisons
+        branche / nom de fichier sont sondées en parallèle. Les dépôts sans README (absent de la
+        liste des fichiers, ou 404 / 410 partout) sont mémorisés ; toute autre réponse (429, 5xx...)
+        lève HttpStatusError sans rien mémoriser, pour que le document soit retenté plus tard.
         """
-        possible_readme_filenames = ['README.md', 'README.rst', 'README.txt']
-        possible_branches = ['main', 'master']
-        readme_content = "README non disponible."
-
-        for branch in possible_branches:
-            for filename in possible_readme_filenames:
-                readme_url = f'https://huggingface.co/{identifier}/resolve/{branch}/{filename}'
-                readme_response = requests.get(readme_url)
-                if readme_response.status_code == 200:
-                    readme_content = readme_response.text
-                    return readme_content  # Retourner dès que le README est trouvé
+        missing_key = f'hf-readme:{identifier}'
+        if identifier in self._missing_readmes or (self.http.cache and self.http.cache.is_known_missing(missing_key)):
+            return README_UNAVAILABLE
 
+        if siblings is not None:
+            readme_content = self._fetch_listed_huggingface_readme(identifier, siblings, revision)
+        else:
+            readme_content = self._probe_huggingface_readme(identifier)
+
+        if readme_content is None:
+            self._missing_readmes.add(identifier)
+            if self.http.cache:
+                self.http.cache.remember_missing(missing_key)
+            return README_UNAVAILABLE
         return readme_content
 
+    def _fetch_listed_huggingface_readme(self, identifier, siblings, revision=None):
+        """Choisit le README dans la liste des fichiers du dépôt et le télécharge (une requête)."""
+        filenames = {sibling.get('rfilename', '').lower(): sibling.get('rfilename') for sibling in siblings}
+        filename = next((filenames[name.lower()] for name in HF_README_FILENAMES if name.lower() in filenames), None)
+        if filename is None:
+            return None
+
+        readme_url = f'https://huggingface.co/{identifier}/resolve/{revision or "main"}/{filename}'
+        readme_response = self.http.get(readme_url)
+        if readme_response.status_code == 200:
+            return readme_response.text
+        if readme_response.status_code in README_MISSING_STATUSES:
+            return None
+        raise HttpStatusError(f"Erreur lors de la récupération du README HuggingFace: {readme_response.status_code}",
+                              readme_response.status_code)
+
+    def _probe_huggingface_readme(self, identifier):
+        """Sonde toutes les combinaisons branche / nom de fichier en parallèle, garde la première par priorité."""
+        readme_urls = [
+            f'https://huggingface.co/{identifier}/resolve/{branch}/{filename}'
+            for branch in HF_README_BRANCHES
+            for filename in HF_README_FILENAMES
+        ]
+        with ThreadPoolExecutor(max_workers=len(readme_urls)) as executor:
+            responses = list(executor.map(self.http.get, readme_urls))
+
+        for readme_response in responses:
+            if readme_response.status_code == 200:
+                return readme_response.text
+        unexpected = [r.status_code for r in responses if r.status_code not in README_MISSING_STATUSES]
+        if unexpected:
+            # Un 429 / 5xx ne prouve pas l'absence du README : ne pas le mémoriser
+            raise HttpStatusError(f"Erreur lors de la récupération du README HuggingFace: {unexpected[0]}", unexpected[0])
+        return None
+
     def _extract_arxiv_from_tags_for_hugginface(self, tags):
         """
         Méthode interne pour extraire les papiers arXiv à partir des tags présent sur une page huggingface.
-        Retourne une liste de dictionnaires contenant les informations des papiers arXiv.
+        Retourne une liste de dictionnaires contenant les informations des papiers arXiv, limitée à
+        max_arxiv_tag_papers. En mode 'metadata' (par défaut) ce sont des ArxivPaperRef dont le texte
+        n'est téléchargé qu'à la demande ; en mode 'full' les textes sont extraits en parallèle.
         """
-        arxiv_papers = []
         arxiv_pattern = re.compile(r'arxiv:(\d{4}\.\d{5})')
+        arxiv_ids = [match.group(1) for match in map(arxiv_pattern.match, tags or []) if match]
+        arxiv_ids = list(dict.fromkeys(arxiv_ids))[:self.max_arxiv_tag_papers]
+        if not arxiv_ids:
+            return None
 
-        for tag in tags:
-            match = arxiv_pattern.match(tag)
-            if match:
-                arxiv_id = match.group(1)
-                try:
-                    arxiv_data = self.extract_arxiv(arxiv_id)
-                    arxiv_papers.append(arxiv_data)
-                except Exception as e:
-                    arxiv_papers.append({'arxiv_id': arxiv_id, 'error': str(e)})
+        # Une seule requête de métadonnées pour tous les tags
+        try:
+            entries = self.fetch_arxiv_metadata(arxiv_ids)
+        except Exception as e:
+            return [{'arxiv_id': arxiv_id, 'error': str(e)} for arxiv_id in arxiv_ids]
+
+        if self.arxiv_tags_mode == 'full':
+            with ThreadPoolExecutor(max_workers=HF_ARXIV_WORKERS) as executor:
+                arxiv_papers = list(executor.map(self.extract_arxiv_batch, [[arxiv_id] for arxiv_id in arxiv_ids]))
+            return [papers[0] for papers in arxiv_papers]
 
-        return arxiv_papers if arxiv_papers else None
+        return [
+            ArxivPaperRef(self, arxiv_id, entries[arxiv_id]) if arxiv_id in entries
+            else {'arxiv_id': arxiv_id, 'error': "Aucune entrée trouvée pour l'ID arXiv fourni."}
+            for arxiv_id in arxiv_ids
+        ]
 
     def extract_blog(self, blog_url):
-        response = requests.get(blog_url)
+        return self.parse_blog(self.fetch_blog(blog_url), blog_url)
+
+    def fetch_blog(self, blog_url):
+        response = self.http.get(blog_url)
         if response.status_code != 200:
-            raise ValueError(f"Erreur lors de la récupération de l'article de blog: {response.status_code}")
-        soup = BeautifulSoup(response.content, 'html.parser')
+            raise HttpStatusError(f"Erreur lors de la récupération de l'article de blog: {response.status_code}", response.status_code)
+        return response.content
+
+    def parse_blog(self, html, blog_url):
+        doc = parse_html(html, self.html_parser, only=BLOG_TAGS, targeted=self.targeted_parsing)
 
-        title_tag = soup.find('title')
-        title = title_tag.text.strip() if title_tag else "Titre non disponible"
+        title = doc.first_text('title', default="Titre non disponible")
 
-        # Extraction du contenu principal
-        # Partie à ajuster
-        paragraphs = soup.find_all(['p', 'h1', 'h2', 'h3', 'li'])
-        content = '\n'.join([para.get_text().strip() for para in paragraphs])
+        content = doc.text_blocks(['p', 'h1', 'h2', 'h3', 'li'])
 
         metadata = {
             'url': blog_url
         }
 
+        # Extraction du contenu principal : on retombe sur tous les blocs si elle échoue
+        if self.blog_main_content:
+            if isinstance(doc, LxmlDocument):
+                main_content = extract_main_content(doc.root)
+            else:
+                main_content = extract_main_content_from_html(html)
+            if main_content:
+                metadata['content_stats'] = {'full_chars': len(content), 'main_chars': len(main_content)}
+                content = main_content
+
         return {
             'title': title,
             'content': content,
@@ -333,23 +580,59 @@ class DataExtractor:
         return ExtractedData(source_type, identifier, title, content, metadata)
 
     def extract(self, url_or_id):
+        return self.parse(self.fetch(url_or_id))
+
+    def fetch(self, url_or_id):
+        """
+        Étape réseau de extract : télécharge ce qu'il faut pour construire le document.
+
+        Returns:
+            dict: 'source_type', 'identifier' et soit 'raw' (PDF arXiv ou page HTML, à passer à parse),
+                  soit 'result' (sources d'API GitHub / HuggingFace, déjà structurées)
+        """
         source_type, identifier = self.get_source_type(url_or_id)
-    
+        fetched = {'source_type': source_type, 'identifier': identifier}
+
         if source_type == 'arxiv':
-            result = self.extract_arxiv(identifier)
+            fetched['raw'] = self.fetch_arxiv(identifier)
         elif source_type == 'github':
-            result = self.extract_github(identifier)
+            fetched['result'] = self.extract_github(identifier)
         elif source_type == 'huggingface_model':
-            result = self.extract_huggingface_model(identifier)
+            fetched['result'] = self.extract_huggingface_model(identifier)
         elif source_type == 'huggingface_dataset':
-            result = self.extract_huggingface_dataset(identifier)
+            fetched['result'] = self.extract_huggingface_dataset(identifier)
         elif source_type == 'huggingface_blog':
-            result = self.extract_huggingface_blog(identifier)
+            fetched['raw'] = self.fetch_huggingface_blog(identifier)
         elif source_type == 'huggingface_space':
-            result = self.extract_huggingface_space(identifier)
+            fetched['raw'] = self.fetch_huggingface_space(identifier)
         elif source_type == 'blog':
-            result = self.extract_blog(identifier)
-        
+            fetched['raw'] = self.fetch_blog(identifier)
+        return fetched
+
+    def parse(self, fetched, pdf_parser=None):
+        """
+        Étape calcul de extract : parsing du PDF ou du HTML téléchargé par fetch.
+
+        Args:
+            fetched: Résultat de fetch
+            pdf_parser: Voir parse_arxiv (None = extraction dans le processus courant)
+
+        Returns:
+            ExtractedData
+        """
+        source_type, identifier = fetched['source_type'], fetched['identifier']
+
+        if 'result' in fetched:
+            result = fetched['result']
+        elif source_type == 'arxiv':
+            result = self.parse_arxiv(fetched['raw'], pdf_parser)
+        elif source_type == 'huggingface_blog':
+            result = self.parse_huggingface_blog(fetched['raw'])
+        elif source_type == 'huggingface_space':
+            result = self.parse_huggingface_space(fetched['raw'])
+        elif source_type == 'blog':
+            result = self.parse_blog(fetched['raw'], identifier)
+
         # Convertir le résultat en un format uniforme
         return self.convert_to_extracted_data(source_type, identifier, result)
 
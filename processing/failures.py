@@ -0,0 +1,85 @@
+import time
+
+import openai
+import requests
+from langchain_core.exceptions import OutputParserException
+
+from processing.http_client import HttpStatusError, RETRY_STATUSES
+
+# Types d'échec d'un document
+TRANSIENT = "transient"  # réseau, timeout, erreur 5xx
+RATE_LIMIT = "rate_limit"  # 429 (site ou API OpenAI)
+PERMANENT = "permanent"  # 404 et autres 4xx, URL invalide, identifiant arXiv inconnu
+PARSE = "parse"  # PDF / HTML illisible, aucun texte extrait (PDF scanné)
+LLM = "llm"  # réponse du LLM refusée ou illisible, requête rejetée
+FAILURE_KINDS = (TRANSIENT, RATE_LIMIT, PERMANENT, PARSE, LLM)
+# Clé API refusée (401 / 403), modèle inconnu : l'exécution est en cause, pas le document.
+# Aucune tentative n'est comptée et l'exécution est interrompue.
+CONFIGURATION = "configuration"
+
+# Nombre de tentatives avant le passage en lettre morte, par type d'échec
+MAX_ATTEMPTS = {TRANSIENT: 6, RATE_LIMIT: 8, PERMANENT: 2, PARSE: 3, LLM: 4}
+# Attente avant la 2e tentative (secondes), doublée à chaque nouvel échec
+RETRY_BASE_DELAY = {TRANSIENT: 3600, RATE_LIMIT: 6 * 3600, PERMANENT: 24 * 3600, PARSE: 24 * 3600, LLM: 3600}
+MAX_RETRY_DELAY = 14 * 24 * 3600
+
+# Erreurs de requests dues au lien lui-même : une nouvelle tentative échouerait de la même façon
+INVALID_URL_ERRORS = (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                      requests.exceptions.InvalidSchema, requests.exceptions.URLRequired)
+
+
+class ParseError(ValueError):
+    """Document téléchargé mais inexploitable (aucun texte extrait)."""
+
+
+class ConfigurationError(RuntimeError):
+    """Exécution interrompue par une erreur de configuration (clé API, modèle)."""
+
+
+def classify_failure(error, stage=None):
+    """
+    Type d'échec d'une exception levée pendant le traitement d'un document.
+
+    Args:
+        error: Exception levée
+        stage: Étape du pipeline en cause ("fetch", "parse", "summarize"), si connue ;
+               départage les exceptions génériques (ValueError, KeyError...)
+    """
+    if isinstance(error, (ConfigurationError, openai.AuthenticationError, openai.PermissionDeniedError,
+                          openai.NotFoundError)):
+        return CONFIGURATION
+    if isinstance(error, HttpStatusError):
+        if error.status_code == 429:
+            return RATE_LIMIT
+        if error.status_code in RETRY_STATUSES or error.status_code == 408 or error.status_code >= 500:
+            return TRANSIENT
+        return PERMANENT
+    if isinstance(error, INVALID_URL_ERRORS):
+        return PERMANENT
+    if isinstance(error, requests.RequestException):
+        # Connexion coupée, timeout, réponse tronquée (ChunkedEncodingError) ou mal compressée
+        return TRANSIENT
+    if isinstance(error, openai.RateLimitError):
+        return RATE_LIMIT
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return TRANSIENT
+    if isinstance(error, (openai.OpenAIError, OutputParserException)):
+        return LLM
+    if isinstance(error, ParseError):
+        return PARSE
+    if stage == "fetch":
+        return PERMANENT
+    if stage == "summarize":
+        return LLM
+    return PARSE
+
+
+def next_retry_at(kind, attempts, now=None):
+    """
+    Date (timestamp) de la prochaine tentative après `attempts` échecs, avec backoff
+    exponentiel ; None quand le nombre maximal de tentatives est atteint (lettre morte).
+    """
+    if attempts >= MAX_ATTEMPTS[kind]:
+        return None
+    delay = min(RETRY_BASE_DELAY[kind] * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    return (time.time() if now is None else now) + delay
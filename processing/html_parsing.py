@@ -0,0 +1,156 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+except ImportError:
+    lxml = None
+
+# Backends disponibles :
+# - 'lxml-native' : arbre lxml (C) interrogé directement, sans objets BeautifulSoup
+# - 'lxml' : BeautifulSoup avec le parser lxml
+# - 'html.parser' : BeautifulSoup avec le parser pur Python de la stdlib (comportement historique)
+AVAILABLE_BACKENDS = ['lxml-native', 'lxml', 'html.parser'] if lxml else ['html.parser']
+HTML_PARSER = AVAILABLE_BACKENDS[0]
+
+# Avec un backend BeautifulSoup, ne construire que les éléments conservés par l'extracteur
+TARGETED_PARSING = True
+
+# Éléments conservés pour chaque type de page
+BLOG_TAGS = ['title', 'p', 'h1', 'h2', 'h3', 'li']
+SPACE_TAGS = ['h1', 'meta', 'a', 'span', 'p', 'h2', 'h3', 'li']
+
+
+def element_text(element):
+    """
+    Texte d'un élément lxml sans le contenu des <script> / <style> qu'il contient, comme
+    get_text() de BeautifulSoup (widgets intégrés dans un paragraphe, par exemple).
+    """
+    if next(element.iter('script', 'style'), None) is None:
+        return element.text_content()
+    return "".join(element.xpath('.//text()[not(ancestor::script) and not(ancestor::style)]'))
+
+
+def make_soup(markup, parser=None, only=None, targeted=None, **strainer_attrs):
+    """
+    Construit un arbre BeautifulSoup, éventuellement restreint à certaines balises.
+
+    Args:
+        markup: HTML (str ou bytes)
+        parser: 'lxml' ou 'html.parser'
+        only: Noms de balises à conserver ; les autres éléments ne sont pas construits
+        targeted: Active le parsing ciblé (par défaut TARGETED_PARSING)
+        strainer_attrs: Filtres d'attributs supplémentaires pour les balises conservées
+    """
+    if parser is None or parser == 'lxml-native':
+        parser = 'lxml' if lxml else 'html.parser'
+    targeted = TARGETED_PARSING if targeted is None else targeted
+    parse_only = SoupStrainer(only, **strainer_attrs) if targeted and only else None
+    return BeautifulSoup(markup, parser, parse_only=parse_only)
+
+
+def parse_html(markup, backend=None, only=None, targeted=None, **strainer_attrs):
+    """
+    Parse une page avec le backend choisi et retourne un document offrant les quelques
+    requêtes dont ont besoin les extracteurs, quel que soit le backend.
+
+    Args:
+        markup: HTML (str ou bytes)
+        backend: Un des AVAILABLE_BACKENDS (par défaut HTML_PARSER)
+        only, targeted, strainer_attrs: Parsing ciblé pour les backends BeautifulSoup
+    """
+    backend = backend or HTML_PARSER
+    if backend == 'lxml-native':
+        return LxmlDocument(markup)
+    return SoupDocument(make_soup(markup, backend, only=only, targeted=targeted, **strainer_attrs))
+
+
+class SoupDocument:
+    """Document adossé à un arbre BeautifulSoup."""
+
+    def __init__(self, soup):
+        self.soup = soup
+
+    @staticmethod
+    def _attrs(class_):
+        return {'class': class_} if class_ else {}
+
+    def first_text(self, tag, class_=None, default=None):
+        element = self.soup.find(tag, self._attrs(class_))
+        return element.text.strip() if element is not None else default
+
+    def all_texts(self, tag, class_=None, within=None):
+        """Textes des éléments `tag` ; `within` = (balise, classe) du conteneur, None s'il est absent."""
+        root = self.soup
+        if within:
+            root = self.soup.find(within[0], self._attrs(within[1]))
+            if root is None:
+                return None
+        return [element.text.strip() for element in root.find_all(tag, self._attrs(class_))]
+
+    def meta_content(self, property_name, default=None):
+        element = self.soup.find('meta', {'property': property_name})
+        return element['content'].strip() if element is not None and element.has_attr('content') else default
+
+    def text_blocks(self, tags):
+        return "\n".join(block.get_text().strip() for block in self.soup.find_all(tags))
+
+    def links(self, href_prefix):
+        return [(a['href'], a.text.strip()) for a in self.soup.select(f"a[href^='{href_prefix}']")]
+
+
+class LxmlDocument:
+    """Document adossé à un arbre lxml natif, interrogé en XPath."""
+
+    def __init__(self, markup):
+        if isinstance(markup, bytes):
+            # Même détection d'encodage que BeautifulSoup (en-tête meta, BOM, heuristiques)
+            markup = UnicodeDammit(markup, is_html=True).unicode_markup
+        # lxml refuse une chaîne unicode portant une déclaration d'encodage XML
+        markup = re.sub(r'^\s*<\?xml[^>]*\?>', '', markup or '')
+        try:
+            self.root = lxml.html.document_fromstring(markup)
+        except (ParserError, ValueError):
+            self.root = None
+
+    @staticmethod
+    def _xpath_for(tag, class_=None):
+        condition = f"[contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')]" if class_ else ""
+        return f".//{tag}{condition}"
+
+    def first_text(self, tag, class_=None, default=None):
+        if self.root is None:
+            return default
+        elements = self.root.xpath(self._xpath_for(tag, class_))
+        return elements[0].text_content().strip() if elements else default
+
+    def all_texts(self, tag, class_=None, within=None):
+        if self.root is None:
+            return None if within else []
+        root = self.root
+        if within:
+            containers = root.xpath(self._xpath_for(*within))
+            if not containers:
+                return None
+            root = containers[0]
+        return [element.text_content().strip() for element in root.xpath(self._xpath_for(tag, class_))]
+
+    def meta_content(self, property_name, default=None):
+        if self.root is None:
+            return default
+        values = self.root.xpath('.//meta[@property=$name]/@content', name=property_name)
+        return values[0].strip() if values else default
+
+    def text_blocks(self, tags):
+        if self.root is None:
+            return ""
+        return "\n".join(element_text(element).strip() for element in self.root.iter(*tags))
+
+    def links(self, href_prefix):
+        if self.root is None:
+            return []
+        return [(a.get('href'), a.text_content().strip())
+                for a in self.root.xpath('.//a[starts-with(@href, $prefix)]', prefix=href_prefix)]
@@ -0,0 +1,328 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = "./cache/http"
+DEFAULT_MAX_BYTES = 1024 ** 3  # 1 Go, au-delà les entrées les moins récemment utilisées sont évincées
+DAY = 24 * 3600
+
+# Durée pendant laquelle une réponse est servie sans revalidation, par source
+SOURCE_TTLS = {
+    "arxiv_api": 7 * DAY,
+    "arxiv_pdf": 30 * DAY,  # un PDF versionné ne change pas
+    "github": DAY,
+    "huggingface": DAY,
+    "blog": 7 * DAY,
+    "other": DAY,
+}
+
+# Durée pendant laquelle une ressource connue comme absente n'est pas redemandée
+NEGATIVE_TTL = 7 * DAY
+
+# En-têtes de requête qui changent le contenu de la réponse (ex: README brut GitHub)
+VARY_HEADERS = ("Accept",)
+
+
+def source_of(url):
+    """Détermine la source d'une URL pour lui appliquer le bon TTL."""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith("arxiv.org"):
+        return "arxiv_api" if parsed.path.startswith("/api") else "arxiv_pdf"
+    if host.endswith("github.com"):
+        return "github"
+    if host.endswith("huggingface.co"):
+        return "blog" if parsed.path.startswith("/blog") else "huggingface"
+    if host:
+        return "blog"
+    return "other"
+
+
+class CachedEntry:
+    def __init__(self, row):
+        (self.key, self.url, self.source, self.body_hash, self.size, self.status,
+         headers, self.etag, self.last_modified, self.stored_at, self.last_access) = row
+        self.headers = json.loads(headers)
+
+    def is_fresh(self, ttls=SOURCE_TTLS):
+        ttl = ttls.get(self.source, ttls.get("other", DAY))
+        return time.time() - self.stored_at < ttl
+
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+
+
+class HttpCache:
+    """
+    Cache disque des réponses HTTP, adressé par contenu.
+
+    Les corps de réponse sont stockés une seule fois sous objects/<sha256>, un index
+    SQLite associe chaque requête (méthode, URL, en-têtes Vary) à son corps, ses
+    validateurs (ETag / Last-Modified) et sa date de dernière utilisation.
+    La taille totale est bornée par une éviction LRU.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.max_bytes = max_bytes
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_body_hash ON entries(body_hash)")
+        # Cache négatif : ressources dont on sait qu'elles n'existent pas (ex: dépôt HF sans README)
+        self._db.execute("CREATE TABLE IF NOT EXISTS missing (key TEXT PRIMARY KEY, stored_at REAL NOT NULL)")
+        self._db.commit()
+
+    #-------------------- Lecture / écriture --------------------#
+
+    @staticmethod
+    def make_key(method, url, headers=None):
+        headers = CaseInsensitiveDict(headers or {})
+        vary = "|".join(f"{name}={headers.get(name, '')}" for name in VARY_HEADERS)
+        return hashlib.sha256(f"{method.upper()} {url} {vary}".encode("utf-8")).hexdigest()
+
+    def _object_path(self, body_hash):
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash)
+
+    def lookup(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        entry = CachedEntry(row)
+        if not os.path.exists(self._object_path(entry.body_hash)):
+            self.delete(key)
+            return None
+        return entry
+
+    def load_response(self, entry):
+        """Reconstruit un requests.Response à partir d'une entrée du cache."""
+        with open(self._object_path(entry.body_hash), "rb") as f:
+            body = f.read()
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), entry.key))
+            self._db.commit()
+
+        response = requests.Response()
+        response.status_code = entry.status
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.url = entry.url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def store(self, key, url, response):
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        # Les en-têtes de transport n'ont pas de sens pour une réponse rejouée
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in ("content-encoding", "transfer-encoding", "connection", "content-length")}
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT body_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, source_of(url), body_hash, len(body), response.status_code, json.dumps(headers),
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now),
+            )
+            self._db.commit()
+            if previous and previous[0] != body_hash:
+                self._remove_orphan(previous[0])
+        self.evict()
+
+    def refresh(self, entry, response):
+        """Une revalidation a répondu 304 : l'entrée redevient fraîche."""
+        etag = response.headers.get("ETag") or entry.etag
+        last_modified = response.headers.get("Last-Modified") or entry.last_modified
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, last_access = ?, etag = ?, last_modified = ? WHERE key = ?",
+                (now, now, etag, last_modified, entry.key),
+            )
+            self._db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT body_hash FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+            if row:
+                self._remove_orphan(row[0])
+
+    def _remove_orphan(self, body_hash):
+        """Supprime un corps qui n'est plus référencé par aucune entrée (appelé sous verrou)."""
+        still_used = self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+        if not still_used:
+            try:
+                os.remove(self._object_path(body_hash))
+            except FileNotFoundError:
+                pass
+
+    def remember_missing(self, key):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO missing VALUES (?, ?)", (key, time.time()))
+            self._db.commit()
+
+    def is_known_missing(self, key, ttl=NEGATIVE_TTL):
+        with self._lock:
+            row = self._db.execute("SELECT stored_at FROM missing WHERE key = ?", (key,)).fetchone()
+        return row is not None and time.time() - row[0] < ttl
+
+    #-------------------- Maintenance --------------------#
+
+    def total_bytes(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)"
+            ).fetchone()
+        return row[0]
+
+    def evict(self):
+        """Évince les entrées les moins récemment utilisées jusqu'à repasser sous max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            rows = self._db.execute("SELECT key, body_hash, size FROM entries ORDER BY last_access").fetchall()
+            for key, body_hash, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                still_used = self._db.execute(
+                    "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+                ).fetchone()
+                if not still_used:
+                    total -= size
+                    try:
+                        os.remove(self._object_path(body_hash))
+                    except FileNotFoundError:
+                        pass
+                evicted += 1
+            self._db.commit()
+        return evicted
+
+    def purge(self, source=None, older_than=None):
+        """Supprime toutes les entrées, ou celles d'une source / plus vieilles que older_than secondes."""
+        clauses, params = [], []
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if older_than is not None:
+            clauses.append("stored_at < ?")
+            params.append(time.time() - older_than)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(f"SELECT key, body_hash FROM entries {where}", params).fetchall()
+            self._db.execute(f"DELETE FROM entries {where}", params)
+            if not source:
+                self._db.execute(f"DELETE FROM missing {where}", params)
+            self._db.commit()
+            for body_hash in {body_hash for _, body_hash in rows}:
+                self._remove_orphan(body_hash)
+        return len(rows)
+
+    def entries(self, source=None):
+        query = "SELECT * FROM entries"
+        params = ()
+        if source:
+            query += " WHERE source = ?"
+            params = (source,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY last_access DESC", params).fetchall()
+        return [CachedEntry(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY source"
+            ).fetchall()
+        return {
+            "entries": sum(count for _, count, _ in rows),
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+            "per_source": {source: {"entries": count, "bytes": size} for source, count, size in rows},
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecter ou purger le cache HTTP de DataExtractor.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Taille et nombre d'entrées par source")
+
+    list_parser = subparsers.add_parser("list", help="Lister les entrées (les plus récemment utilisées d'abord)")
+    list_parser.add_argument("--source", choices=sorted(SOURCE_TTLS))
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    purge_parser = subparsers.add_parser("purge", help="Supprimer des entrées")
+    purge_parser.add_argument("--source", choices=sorted(SOURCE_TTLS))
+    purge_parser.add_argument("--older-than", type=float, metavar="JOURS",
+                              help="Ne supprimer que les entrées stockées il y a plus de JOURS jours")
+
+    args = parser.parse_args()
+    cache = HttpCache(args.cache_dir)
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"📦 {stats['entries']} entrées, {stats['bytes'] / 1e6:.1f} Mo / {stats['max_bytes'] / 1e6:.0f} Mo")
+        for source, values in sorted(stats["per_source"].items()):
+            print(f"   - {source}: {values['entries']} entrées, {values['bytes'] / 1e6:.1f} Mo")
+    elif args.command == "list":
+        now = time.time()
+        for entry in cache.entries(args.source)[:args.limit]:
+            state = "frais" if entry.is_fresh(cache.ttls) else "périmé"
+            age_hours = (now - entry.stored_at) / 3600
+            print(f"{entry.source:12} {entry.size / 1e3:9.1f} Ko  {age_hours:7.1f} h  {state:7} {entry.url}")
+    elif args.command == "purge":
+        older_than = args.older_than * DAY if args.older_than is not None else None
+        removed = cache.purge(source=args.source, older_than=older_than)
+        print(f"🗑️ {removed} entrées supprimées.")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configuration par défaut de la couche de transport
+DEFAULT_TIMEOUT = (5, 60)  # (connexion, lecture) en secondes
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 1.0  # attente = backoff * 2**tentative (+ jitter)
+MAX_BACKOFF = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_CONNECTIONS = 20  # nombre d'hôtes gardés en pool
+POOL_MAXSIZE = 10  # connexions keep-alive par hôte
+USER_AGENT = "3A-Project-AutomaticNewsletter/1.0 (+https://github.com/ArthurVogels26/3A-Project-AutomaticNewsletter)"
+
+
+class HttpStatusError(ValueError):
+    """Réponse HTTP inattendue (après les nouvelles tentatives) ; status_code permet de classer l'échec."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class HostThrottle:
+    """
+    Intervalle minimal entre deux requêtes réseau vers un hôte (politesse envers une API).
+    Les requêtes passent une par une et le délai court à partir de la fin de la précédente ;
+    une même instance peut être partagée par plusieurs clients pour valoir dans tout le processus.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def __enter__(self):
+        self._lock.acquire()
+        wait = self.interval - (time.monotonic() - self._last)
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._last = time.monotonic()
+        self._lock.release()
+
+
+class HttpClient:
+    """
+    Couche de transport HTTP partagée par toutes les méthodes de DataExtractor.
+
+    - Pool de connexions keep-alive par hôte (une seule poignée de main TCP+TLS par hôte)
+    - Timeout par défaut sur chaque requête
+    - Nouvelles tentatives avec backoff exponentiel sur 429/5xx et erreurs réseau,
+      en respectant l'en-tête Retry-After
+    - Cache disque optionnel (HttpCache) avec revalidation If-None-Match / If-Modified-Since
+    - Intervalle minimal par hôte (HostThrottle, attribut throttles), appliqué aux seules
+      requêtes réseau : une réponse fraîche du cache n'attend pas
+    - Compteurs (requêtes, réutilisation des connexions, tentatives, octets, cache) via stats()
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, cache=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.throttles = {}  # hôte -> HostThrottle
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        # Les tentatives sont gérées ici (et non par urllib3) pour pouvoir les compter
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapters = [adapter]
+
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "errors": 0,
+            "bytes": 0,
+            "cache_hits": 0,
+            "cache_revalidated": 0,
+            "cache_misses": 0,
+            "bytes_saved": 0,
+        }
+        self._per_host = {}
+
+    def get(self, url, use_cache=True, **kwargs):
+        if self.cache is None or not use_cache:
+            return self.request("GET", url, **kwargs)
+        return self._cached_get(url, **kwargs)
+
+    def _cached_get(self, url, **kwargs):
+        """GET servi depuis le cache si frais, revalidé s'il est périmé, téléchargé sinon."""
+        # Les paramètres font partie de l'identité de la réponse en cache
+        params = kwargs.pop("params", None)
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        host = urlparse(url).netloc
+        headers = dict(kwargs.pop("headers", None) or {})
+        key = self.cache.make_key("GET", url, headers)
+        entry = self.cache.lookup(key)
+
+        if entry is not None and entry.is_fresh(self.cache.ttls):
+            self._count(host, cache_hits=1, bytes_saved=entry.size)
+            return self.cache.load_response(entry)
+
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.request("GET", url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(entry, response)
+            self._count(host, cache_revalidated=1, bytes_saved=entry.size)
+            return self.cache.load_response(entry)
+
+        self._count(host, cache_misses=1)
+        if response.status_code == 200:
+            self.cache.store(key, url, response)
+        return response
+
+    def request(self, method, url, **kwargs):
+        """
+        Envoie une requête en réessayant sur les erreurs transitoires.
+        Retourne la dernière réponse obtenue (même en erreur HTTP) pour laisser
+        l'appelant décider, comme avec requests.get.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+
+        throttle = self.throttles.get(host)
+        attempt = 0
+        while True:
+            try:
+                if throttle is None:
+                    response = self.session.request(method, url, **kwargs)
+                else:
+                    with throttle:
+                        response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count(host, errors=1)
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep_before_retry(host, attempt)
+                attempt += 1
+                continue
+
+            self._count(host, requests=1, bytes=len(response.content))
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep_before_retry(host, attempt, response)
+                attempt += 1
+                continue
+            return response
+
+    def _sleep_before_retry(self, host, attempt, response=None):
+        delay = self._retry_after(response)
+        if delay is None:
+            delay = self.backoff_factor * (2 ** attempt) + random.uniform(0, self.backoff_factor)
+        delay = min(delay, MAX_BACKOFF)
+        self._count(host, retries=1)
+        status = response.status_code if response is not None else "erreur réseau"
+        print(f"⏳ {host}: {status}, nouvelle tentative dans {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response):
+        """Durée d'attente demandée par le serveur via Retry-After (secondes ou date HTTP)."""
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _count(self, host, **increments):
+        with self._lock:
+            host_counters = self._per_host.setdefault(host, {key: 0 for key in self._counters})
+            for key, value in increments.items():
+                self._counters[key] += value
+                host_counters[key] += value
+
+    def _connections_opened(self):
+        """Nombre de connexions TCP ouvertes par les pools urllib3."""
+        opened = 0
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+        return opened
+
+    def stats(self):
+        """Retourne les compteurs de la couche de transport."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["per_host"] = {host: dict(counters) for host, counters in self._per_host.items()}
+        connections = self._connections_opened()
+        stats["connections"] = connections
+        stats["reuse_ratio"] = 1 - connections / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"🌐 HTTP: {stats['requests']} requêtes, {stats['connections']} connexions ouvertes "
+              f"(réutilisation {stats['reuse_ratio']:.0%}), {stats['retries']} nouvelles tentatives, "
+              f"{stats['errors']} erreurs réseau, {stats['bytes'] / 1e6:.1f} Mo reçus")
+        if self.cache is not None:
+            print(f"📦 Cache: {stats['cache_hits']} hits, {stats['cache_revalidated']} revalidés (304), "
+                  f"{stats['cache_misses']} misses, {stats['bytes_saved'] / 1e6:.1f} Mo économisés")
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pymupdf
+
+# Au-delà de ce nombre de pages, l'extraction est répartie sur un pool de processus
+PARALLEL_PAGE_THRESHOLD = 40
+MAX_PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+_pools = {}  # nombre de processus -> pool partagé
+_pool_lock = threading.Lock()
+
+
+def _get_pool(max_workers):
+    """Pool de processus partagé de cette taille, créé à la première utilisation."""
+    with _pool_lock:
+        if max_workers not in _pools:
+            _pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return _pools[max_workers]
+
+
+def _reset_pool(max_workers):
+    with _pool_lock:
+        pool = _pools.pop(max_workers, None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _memory_kb(field):
+    """Champ VmRSS / VmHWM de /proc/self/status en ko (None hors Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _start_memory_measure():
+    """
+    Remet à zéro le pic de mémoire résidente du processus (Linux, /proc/self/clear_refs) et
+    retourne la mémoire résidente actuelle en ko ; None si la mesure est indisponible.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    return _memory_kb("VmRSS")
+
+
+def _memory_growth_mb(rss_before):
+    """Pic de mémoire résidente depuis _start_memory_measure, au-delà de la mémoire de départ (Mo)."""
+    if rss_before is None:
+        return None
+    peak = _memory_kb("VmHWM")
+    return None if peak is None else max(peak - rss_before, 0) / 1e3
+
+
+def _extract_page_range(pdf_bytes, start, stop):
+    """
+    Extrait le texte des pages [start, stop) ; exécuté dans un processus du pool.
+
+    Returns:
+        tuple: (textes des pages, mémoire ajoutée dans ce processus en Mo ou None)
+    """
+    rss_before = _start_memory_measure()
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = [doc[i].get_text() for i in range(start, stop)]
+    return pages, _memory_growth_mb(rss_before)
+
+
+def extract_pdf_text(pdf_bytes, max_pages=None, max_chars=None,
+                     parallel_threshold=PARALLEL_PAGE_THRESHOLD, max_workers=MAX_PDF_WORKERS):
+    """
+    Extrait le texte d'un PDF directement depuis ses octets, sans fichier temporaire.
+
+    Args:
+        pdf_bytes: Contenu binaire du PDF
+        max_pages: Nombre maximum de pages à extraire (None = toutes)
+        max_chars: Nombre maximum de caractères de texte à conserver (None = illimité)
+        parallel_threshold: Nombre de pages à partir duquel l'extraction est parallélisée
+        max_workers: Nombre de processus utilisés pour les gros documents (taille du pool partagé)
+
+    Returns:
+        tuple: (texte extrait, statistiques d'extraction). memory_mb est la mémoire résidente
+        ajoutée par ce document (pic pendant l'extraction moins mémoire de départ), processus du
+        pool compris ; None hors Linux. Si d'autres documents sont extraits en même temps dans le
+        même processus (threads), leur mémoire y est comptée aussi.
+    """
+    start_time = time.perf_counter()
+    rss_before = _start_memory_measure()
+    workers_memory_mb = 0.0
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        pages_to_read = page_count if max_pages is None else min(page_count, max_pages)
+
+        parallel = max_workers > 1 and pages_to_read >= parallel_threshold
+        if not parallel:
+            pages = []
+            chars = 0
+            for i in range(pages_to_read):
+                text = doc[i].get_text()
+                pages.append(text)
+                chars += len(text)
+                if max_chars is not None and chars >= max_chars:
+                    break
+
+    if parallel:
+        pages, workers_memory_mb = _extract_pages_parallel(pdf_bytes, pages_to_read, max_workers)
+
+    content = "".join(pages)
+    truncated = pages_to_read < page_count
+    if max_chars is not None and len(content) > max_chars:
+        content = content[:max_chars]
+        truncated = True
+
+    stats = {
+        "pages": page_count,
+        "parsed_pages": len(pages),
+        "pdf_bytes": len(pdf_bytes),
+        "chars": len(content),
+        "truncated": truncated,
+        "parallel": parallel,
+        "parse_seconds": round(time.perf_counter() - start_time, 3),
+        "memory_mb": _total_memory_mb(_memory_growth_mb(rss_before), workers_memory_mb),
+    }
+    return content, stats
+
+
+def _total_memory_mb(own, workers):
+    if own is None or workers is None:
+        return None
+    return round(own + workers, 1)
+
+
+def _extract_pages_parallel(pdf_bytes, page_count, max_workers):
+    """
+    Répartit les pages en plages contiguës, une par processus, puis les remet dans l'ordre.
+
+    Returns:
+        tuple: (textes des pages, mémoire ajoutée dans les processus du pool en Mo ou None)
+    """
+    chunk_size = -(-page_count // max_workers)
+    ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+    try:
+        pool = _get_pool(max_workers)
+        futures = [pool.submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+        pages = []
+        memory_mb = 0.0
+        for future in futures:
+            range_pages, range_memory_mb = future.result()
+            pages.extend(range_pages)
+            # Les plages s'extraient en même temps : leurs pics s'additionnent
+            memory_mb = None if memory_mb is None or range_memory_mb is None else memory_mb + range_memory_mb
+        return pages, memory_mb
+    except BrokenProcessPool:
+        # Un worker a planté (mémoire, PDF corrompu) : on repart sur un pool neuf et on lit en séquentiel
+        _reset_pool(max_workers)
+        pages, _ = _extract_page_range(pdf_bytes, 0, page_count)
+        return pages, 0.0  # mémoire comptée dans ce processus
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+
+# Taille par défaut des files entre étapes : une étape rapide attend dès que la suivante a ce retard
+DEFAULT_QUEUE_SIZE = 16
+# Intervalle d'échantillonnage de la profondeur des files (secondes)
+METRICS_INTERVAL = 0.05
+
+_DONE = object()  # marque de fin, envoyée une fois par worker de l'étape suivante
+
+
+class Job:
+    """Document qui traverse les étapes ; chaque étape complète ses attributs."""
+
+    def __init__(self, link, **attributes):
+        self.link = link
+        self.error = None
+        self.failed_stage = None  # nom de l'étape où l'erreur a été levée
+        self.__dict__.update(attributes)
+
+
+class Stage:
+    """
+    Étape du pipeline : une fonction appliquée à chaque Job par un pool de threads.
+
+    Une exception levée par la fonction est enregistrée dans job.error et le Job continue
+    jusqu'aux étapes marquées always=True (persistance), qui le reçoivent quand même.
+    Les étapes dont le travail est CPU (parsing PDF) déléguent à un pool de processus
+    depuis leurs threads, qui ne font alors qu'attendre le résultat.
+    """
+
+    def __init__(self, name, function, workers=1, queue_size=DEFAULT_QUEUE_SIZE, always=False):
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.always = always
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Métriques
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # attente sur la file suivante pleine (contre-pression)
+        self.started_at = None
+        self.finished_at = None
+        self.depth_samples = []
+        self._lock = threading.Lock()
+        self._remaining = workers
+
+    def metrics(self):
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        depths = self.depth_samples or [0]
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "errors": self.errors,
+            "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+            "busy": self.busy_seconds / (elapsed * self.workers) if elapsed > 0 else 0.0,
+            "blocked_seconds": self.blocked_seconds,
+            "queue_mean": sum(depths) / len(depths),
+            "queue_max": max(depths),
+            "queue_size": self.queue.maxsize,
+        }
+
+
+class StagedPipeline:
+    """
+    Étapes reliées par des files bornées : chaque étape traite un document pendant que
+    les autres avancent sur les suivants (téléchargements, parsing et appels LLM se
+    recouvrent). Une file pleine bloque l'étape qui l'alimente, ce qui borne la mémoire
+    (PDF téléchargés en attente de parsing, par exemple) au lieu d'accumuler du retard.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.source_seconds = 0.0
+        self.source_blocked_seconds = 0.0
+
+    def _put(self, stage, item):
+        start = time.perf_counter()
+        stage.queue.put(item)
+        return time.perf_counter() - start
+
+    def _feed(self, jobs):
+        """Étape source : pousse les Jobs produits par l'itérable (découverte) dans la première file."""
+        first = self.stages[0]
+        start = time.perf_counter()
+        try:
+            for job in jobs:
+                self.source_blocked_seconds += self._put(first, job)
+        finally:
+            for _ in range(first.workers):
+                first.queue.put(_DONE)
+            self.source_seconds = time.perf_counter() - start
+
+    def _work(self, position):
+        stage = self.stages[position]
+        following = self.stages[position + 1] if position + 1 < len(self.stages) else None
+        while True:
+            job = stage.queue.get()
+            if job is _DONE:
+                break
+            with stage._lock:
+                if stage.started_at is None:
+                    stage.started_at = time.perf_counter()
+            if job.error is None or stage.always:
+                start = time.perf_counter()
+                try:
+                    stage.function(job)
+                except Exception as e:
+                    job.error = e
+                    job.failed_stage = stage.name
+                    with stage._lock:
+                        stage.errors += 1
+                elapsed = time.perf_counter() - start
+                with stage._lock:
+                    stage.processed += 1
+                    stage.busy_seconds += elapsed
+            if following is not None:
+                blocked = self._put(following, job)
+                with stage._lock:
+                    stage.blocked_seconds += blocked
+
+        # Le dernier worker de l'étape propage la fin à l'étape suivante
+        with stage._lock:
+            stage._remaining -= 1
+            last = stage._remaining == 0
+            if last:
+                stage.finished_at = time.perf_counter()
+        if last and following is not None:
+            for _ in range(following.workers):
+                following.queue.put(_DONE)
+
+    def _sample(self, stop):
+        while not stop.wait(METRICS_INTERVAL):
+            for stage in self.stages:
+                stage.depth_samples.append(stage.queue.qsize())
+
+    def run(self, jobs):
+        """
+        Fait passer tous les Jobs de l'itérable par les étapes et attend la fin.
+
+        Returns:
+            list: Métriques par étape (voir Stage.metrics)
+        """
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._sample, args=(stop,), daemon=True)]
+        for position, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._work, args=(position,), daemon=True,
+                                         name=f"{stage.name}-{worker}") for worker in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+        self._feed(jobs)
+        for thread in threads[1:]:
+            thread.join()
+        stop.set()
+        threads[0].join()
+        return [stage.metrics() for stage in self.stages]
+
+    def print_metrics(self, metrics=None):
+        metrics = metrics or [stage.metrics() for stage in self.stages]
+        print(f"🔎 Découverte : {self.source_seconds:.1f}s, dont {self.source_blocked_seconds:.1f}s bloquée par la file")
+        print(f"{'étape':12} {'workers':>7} {'docs':>5} {'erreurs':>7} {'docs/s':>7} {'occupation':>10} "
+              f"{'file moy':>8} {'file max':>8} {'bloquée':>8}")
+        for stage in metrics:
+            print(f"{stage['stage']:12} {stage['workers']:>7} {stage['processed']:>5} {stage['errors']:>7} "
+                  f"{stage['throughput']:>7.2f} {stage['busy']:>10.0%} {stage['queue_mean']:>8.1f} "
+                  f"{stage['queue_max']:>4}/{stage['queue_size']:<3} {stage['blocked_seconds']:>7.1f}s")
@@ -1,53 +1,100 @@
-import requests
-from bs4 import BeautifulSoup
 import csv
 from datetime import datetime
 import re
 from processing.data_extractor import DataExtractor
+from processing.html_parsing import parse_html
 
 extractor=DataExtractor()
 
-def get_entries_from_huggingface(max_papers=10, main_page_id="week/2025-W12"):
+def get_entries_from_huggingface(max_papers=10, main_page_id="week/2025-W12", full_text=False):
     """
     Fetches latest HuggingFace papers from the specified weekly page
     and returns a list of structured article data.
+
+    By default only discovery is done: IDs, titles and links come from the papers page,
+    enriched by a single batched ArXiv metadata call (abstract as content), without any
+    PDF download. Set full_text=True to also download and parse every PDF.
     """
     headers = {"User-Agent": "Mozilla/5.0"}
     main_page_url = f"https://huggingface.co/papers/{main_page_id}"
 
-    response = requests.get(main_page_url, headers=headers)
+    response = extractor.http.get(main_page_url, headers=headers)
     if response.status_code != 200:
         raise Exception(f"Failed to fetch HuggingFace page (status code {response.status_code})")
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    arxiv_pattern = re.compile(r"\d+\.\d+$")
+    candidates = parse_papers_page(response.text)
     results = []
-    seen_ids = set()
 
-    for a in soup.select("a[href^='/papers/']"):
-        relative_link = a["href"]
+    if not full_text:
+        return _discover_entries(list(candidates.items())[:max_papers])
+
+    # One batched metadata round-trip for every paper on the page
+    try:
+        extractor.fetch_arxiv_metadata(list(candidates))
+    except Exception as e:
+        print(f"⚠️ Batched ArXiv metadata lookup failed: {e}")
+
+    for arxiv_id, title in candidates.items():
+        try:
+            if extractor:
+                data = extractor.extract_arxiv(arxiv_id)
+            else:
+                # Minimal fallback
+                data = {
+                    "title": title,
+                    "content": "",
+                    "metadata": {"arxiv_id": arxiv_id}
+                }
+            results.append(data)
+        except Exception as e:
+            print(f"❌ Failed to extract ArXiv {arxiv_id}: {e}")
+
+        if len(results) >= max_papers:
+            break
+
+    return results
+
+def parse_papers_page(html, parser=None, targeted=None):
+    """
+    Returns {arxiv_id: title} for every paper linked from a HuggingFace papers page, in page order.
+    Only the /papers/ links are built in the parse tree.
+    """
+    doc = parse_html(html, parser, only="a", targeted=targeted, href=re.compile(r"^/papers/"))
+    arxiv_pattern = re.compile(r"\d+\.\d+$")
+    candidates = {}
+
+    for relative_link, text in doc.links("/papers/"):
         arxiv_id = relative_link.split("/")[-1]
 
-        if arxiv_pattern.search(arxiv_id) and arxiv_id not in seen_ids:
-            seen_ids.add(arxiv_id)
-
-            try:
-                if extractor:
-                    data = extractor.extract_arxiv(arxiv_id)
-                else:
-                    # Minimal fallback
-                    data = {
-                        "title": a.text.strip(),
-                        "content": "",
-                        "metadata": {"arxiv_id": arxiv_id}
-                    }
-                results.append(data)
-            except Exception as e:
-                print(f"❌ Failed to extract ArXiv {arxiv_id}: {e}")
-
-            if len(results) >= max_papers:
-                break
+        if arxiv_pattern.search(arxiv_id):
+            # A paper is linked several times (thumbnail, title...): keep the first non-empty text
+            if not candidates.get(arxiv_id):
+                candidates[arxiv_id] = text
+
+    return candidates
+
+def _discover_entries(candidates):
+    """
+    Builds lightweight entries (title, abstract, link) for (arxiv_id, page title) pairs.
+    Full extraction is left to the processing stage.
+    """
+    try:
+        arxiv_metadata = extractor.fetch_arxiv_metadata([arxiv_id for arxiv_id, _ in candidates])
+    except Exception as e:
+        print(f"⚠️ Batched ArXiv metadata lookup failed, using HuggingFace titles only: {e}")
+        arxiv_metadata = {}
 
+    results = []
+    for arxiv_id, page_title in candidates:
+        entry = arxiv_metadata.get(arxiv_id)
+        metadata = dict(entry["metadata"]) if entry else {}
+        metadata["arxiv_id"] = arxiv_id
+        results.append({
+            "title": entry["title"] if entry else page_title,
+            "content": metadata.get("summary", ""),
+            "metadata": metadata,
+            "links": [f"https://arxiv.org/abs/{arxiv_id}"]
+        })
     return results
 
 def update_csv_from_huggingface(csv_file, max_papers=10, main_page_id="week/2025-W12"):
@@ -100,4 +147,22 @@ def update_csv_from_huggingface(csv_file, max_papers=10, main_page_id="week/2025
                 existing_urls.add(url)
 
     print("💾 Updated CSV with new paper links.")
+
+
+def update_store_from_huggingface(store, max_papers=10, main_page_id="week/2025-W12"):
+    """
+    Fetch new HuggingFace paper links and add the new ArXiv links to the summary store
+    (storage/summary_store.SummaryStore); known links are skipped by the store's unique index.
+    """
+    print(f"Fetching page: https://huggingface.co/papers/{main_page_id}...")
+
+    try:
+        entries = get_entries_from_huggingface(max_papers=max_papers, main_page_id=main_page_id)
+    except Exception as e:
+        print(f"⚠️ Error fetching HuggingFace papers: {e}")
+        return 0
+
+    added = store.add_links(entry["links"][0] for entry in entries)
+    print(f"💾 {added} new paper links out of {len(entries)} fetched.")
+    return added
     
\ No newline at end of file
@@ -140,5 +140,12 @@ def update_csv_from_reddit(csv_file):
         for topic in topics:
             writer.writerow([today,topic['links'][0]] + blank_columns)
 
+def update_store_from_reddit(store):
+    """Ajoute les liens des posts Reddit au stockage des résumés (les liens déjà connus sont ignorés)."""
+    topics = get_entries_from_reddit()
+    added = store.add_links(topic['links'][0] for topic in topics)
+    print(f"💾 {added} nouveaux liens Reddit sur {len(topics)} posts.")
+    return added
+
 if __name__ == "__main__":
     update_csv_from_reddit('./output/reddit.csv')
\ No newline at end of file
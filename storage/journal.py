@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def journal_path(csv_file):
+    """Journal associé à un fichier de suivi CSV (à côté du fichier)."""
+    return csv_file + JOURNAL_SUFFIX
+
+
+class DocumentJournal:
+    """
+    Journal d'écriture en ajout seul (JSON Lines) des documents traités par le pipeline.
+
+    Chaque document terminé y est ajouté puis synchronisé sur disque (fsync) avant de
+    passer au suivant : si l'exécution s'interrompt (mémoire, Ctrl-C, mise en veille),
+    les résultats déjà payés ne sont pas perdus. Au démarrage suivant, replay() relit le
+    journal et les résultats sont réappliqués au CSV ; une dernière ligne tronquée par
+    l'interruption est ignorée. Le journal est supprimé une fois le CSV réécrit.
+    Même interface que SummaryStore.upsert, pour que le pipeline traite les deux de la même façon.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def upsert(self, link, values):
+        """Ajoute durablement le résultat d'un document (colonne du CSV -> valeur)."""
+        line = json.dumps({"link": link, "values": values}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_failure(self, link, error, stage=None):
+        """Échec d'un document : seul le statut est conservé (pas de suivi des tentatives hors SummaryStore)."""
+        self.upsert(link, {"Status": f"Error: {error}"})
+
+    def replay(self):
+        """
+        Résultats enregistrés, par lien (le dernier enregistrement d'un lien l'emporte).
+
+        Returns:
+            dict: lien -> {colonne: valeur}
+        """
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # écriture interrompue
+                results.setdefault(entry["link"], {}).update(entry["values"])
+        return results
+
+    def apply(self, df):
+        """
+        Réapplique le journal aux lignes du DataFrame ayant le même lien.
+
+        Returns:
+            int: Nombre de documents repris
+        """
+        results = self.replay()
+        if not results:
+            return 0
+        restored = 0
+        for index, link in df["Link"].items():
+            values = results.get(link)
+            if not values:
+                continue
+            for column, value in values.items():
+                if column in df.columns and not pd.api.types.is_object_dtype(df[column]):
+                    df[column] = df[column].astype(object)
+                df.at[index, column] = value
+            restored += 1
+        return restored
+
+    def clear(self):
+        """Supprime le journal (une fois ses résultats écrits dans le CSV)."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
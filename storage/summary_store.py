@@ -0,0 +1,426 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from processing.failures import CONFIGURATION, classify_failure, next_retry_at
+
+DEFAULT_STORE_PATH = "./output/summaries.sqlite"
+
+# Colonnes du fichier de suivi de l'équipe éditoriale (ordre conservé à l'export) et champ SQLite correspondant
+COLUMNS = [
+    ("Reception date", "reception_date"),
+    ("Link", "link"),
+    ("Review priority", "review_priority"),
+    ("Category (Illuin)", "category_illuin"),
+    ("Category AI", "category_ai"),
+    ("Status", "status"),
+    ("Reviewed", "reviewed"),
+    ("Topic / Keywords (Illuin)", "keywords_illuin"),
+    ("Topic / Keywords AI", "keywords_ai"),
+    ("Take-away (Illuin)", "take_away_illuin"),
+    ("Take-away AI", "take_away_ai"),
+    ("rouge1 precision", "rouge1_precision"),
+    ("rouge2 precision", "rouge2_precision"),
+    ("rougeL precision", "rougeL_precision"),
+]
+CSV_COLUMNS = [column for column, _ in COLUMNS]
+FIELDS = {column: field for column, field in COLUMNS}
+NUMERIC_FIELDS = ("rouge1_precision", "rouge2_precision", "rougeL_precision")
+DATE_FORMAT = "%d/%m/%Y"  # format des dates du fichier de suivi
+# Suivi des échecs (hors CSV), ajouté aux stockages créés avant son introduction
+RETRY_COLUMNS = (("attempts", "INTEGER NOT NULL DEFAULT 0"), ("failure_kind", "TEXT"), ("next_retry_at", "REAL"))
+
+
+def _iso_date(value):
+    """Date de réception au format ISO (triable et indexable), None si illisible."""
+    try:
+        return datetime.strptime(str(value).strip(), DATE_FORMAT).date().isoformat()
+    except ValueError:
+        return None
+
+
+def _clean(value):
+    """Valeur pandas vers SQLite : NaN et chaînes vides deviennent NULL, scalaires NumPy convertis."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def duplicate_links(df):
+    """
+    Liens présents sur plusieurs lignes d'un DataFrame au format du CSV.
+
+    Returns:
+        dict: lien -> index des lignes concernées, dans l'ordre (la dernière l'emporte)
+    """
+    duplicated = df[df["Link"].notna() & df["Link"].duplicated(keep=False)]
+    return {link: list(group.index) for link, group in duplicated.groupby("Link", sort=False)}
+
+
+def report_duplicates(df):
+    """Signale les liens en double et la ligne conservée pour chacun ; retourne duplicate_links(df)."""
+    duplicates = duplicate_links(df)
+    if duplicates:
+        dropped = sum(len(lines) - 1 for lines in duplicates.values())
+        print(f"⚠️ {len(duplicates)} lien(s) en double : {dropped} ligne(s) fusionnée(s), "
+              f"la dernière ligne de chaque lien est conservée")
+        for link, lines in duplicates.items():
+            print(f"   - {link} : lignes {', '.join(map(str, lines))} -> ligne {lines[-1]} conservée")
+    return duplicates
+
+
+class SummaryStore:
+    """
+    Stockage SQLite des documents suivis (liens, catégories, take-aways, scores).
+
+    Remplace la relecture et la réécriture complètes du CSV à chaque exécution : les
+    scrapers ajoutent des liens, le pipeline ne charge que les documents à traiter et
+    met à jour chaque ligne individuellement. Le lien est unique et indexé, comme le
+    statut et la date de réception. Le CSV (ou Excel) de l'équipe éditoriale s'obtient
+    à la demande avec export(), dans la disposition de colonnes habituelle.
+
+    Chaque échec est classé (voir processing/failures.py) et repousse la tentative suivante
+    (backoff exponentiel) ; au-delà du nombre de tentatives, le document passe dans la table
+    dead_letters et n'est plus proposé au pipeline.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Partagé entre processus (pipeline, scrapers, Streamlit) : WAL et attente sur verrou
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Chaque transaction validée est sur disque : un document enregistré survit à un arrêt brutal
+        self._db.execute("PRAGMA synchronous=FULL")
+        columns = ",\n".join(f"{field} {'REAL' if field in NUMERIC_FIELDS else 'TEXT'}"
+                             for _, field in COLUMNS if field != "link")
+        self._db.execute(f"""
+            CREATE TABLE IF NOT EXISTS summaries (
+                id INTEGER PRIMARY KEY,
+                link TEXT NOT NULL UNIQUE,
+                {columns},
+                received_on TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(summaries)")}
+        for name, definition in RETRY_COLUMNS:
+            if name not in existing:
+                self._db.execute(f"ALTER TABLE summaries ADD COLUMN {name} {definition}")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                link TEXT PRIMARY KEY,
+                failure_kind TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL,
+                dead_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_status ON summaries(status)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_received_on ON summaries(received_on)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_next_retry_at ON summaries(next_retry_at)")
+        self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def existing_links(self, links):
+        """Sous-ensemble des liens déjà présents."""
+        links = list(links)
+        found = set()
+        with self._lock:
+            # Par paquets : SQLite limite le nombre de paramètres d'une requête
+            for start in range(0, len(links), 500):
+                batch = links[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT link FROM summaries WHERE link IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def add_links(self, links, reception_date=None):
+        """
+        Ajoute de nouveaux liens à traiter ; les liens déjà connus sont ignorés.
+
+        Returns:
+            int: Nombre de liens ajoutés
+        """
+        reception_date = reception_date or datetime.today().strftime(DATE_FORMAT)
+        now = time.time()
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO summaries (link, reception_date, received_on, updated_at) VALUES (?, ?, ?, ?)",
+                [(link, reception_date, _iso_date(reception_date), now) for link in dict.fromkeys(links) if link],
+            )
+            self._db.commit()
+            return self._db.total_changes - before
+
+    def upsert(self, link, values):
+        """
+        Crée ou met à jour la ligne d'un lien.
+
+        Args:
+            link: Lien du document
+            values: Dictionnaire colonne du CSV (ou champ SQLite) -> valeur ; seuls ces champs sont modifiés
+        """
+        self.upsert_many([(link, values)])
+
+    def upsert_many(self, rows):
+        """upsert pour plusieurs lignes [(lien, valeurs)], dans une seule transaction."""
+        now = time.time()
+        with self._lock:
+            for link, values in rows:
+                fields = {FIELDS.get(name, name): _clean(value) for name, value in values.items()}
+                fields.pop("link", None)
+                if "reception_date" in fields:
+                    fields["received_on"] = _iso_date(fields["reception_date"])
+                fields["updated_at"] = now
+                names = list(fields)
+                self._db.execute(
+                    f"INSERT INTO summaries (link, {', '.join(names)}) VALUES (?{', ?' * len(names)}) "
+                    f"ON CONFLICT(link) DO UPDATE SET {', '.join(f'{name} = excluded.{name}' for name in names)}",
+                    [link] + [fields[name] for name in names],
+                )
+            self._db.commit()
+
+    def _dataframe(self, where="", params=()):
+        fields = ", ".join(field for _, field in COLUMNS)
+        with self._lock:
+            rows = self._db.execute(f"SELECT {fields} FROM summaries {where} ORDER BY id", params).fetchall()
+        df = pd.DataFrame(rows, columns=CSV_COLUMNS)
+        return df.astype({column: object for column, field in COLUMNS if field not in NUMERIC_FIELDS})
+
+    def pending(self, now=None):
+        """
+        Documents sans take-away AI à traiter maintenant, au format du CSV (une ligne par document) :
+        ni lettres mortes, ni échecs dont la prochaine tentative est à venir.
+        """
+        return self._dataframe(
+            "WHERE take_away_ai IS NULL AND (next_retry_at IS NULL OR next_retry_at <= ?) "
+            "AND link NOT IN (SELECT link FROM dead_letters)",
+            (time.time() if now is None else now,),
+        )
+
+    def record_failure(self, link, error, stage=None):
+        """
+        Enregistre l'échec d'un document : statut, type d'échec, nombre de tentatives et date de
+        la prochaine tentative. Au-delà de MAX_ATTEMPTS, le document passe en lettre morte.
+        Une erreur de configuration (clé API, modèle) ne compte pas comme une tentative.
+
+        Returns:
+            tuple: (type d'échec, tentatives, date de la prochaine tentative ou None si lettre morte)
+        """
+        kind = classify_failure(error, stage)
+        now = time.time()
+        if kind == CONFIGURATION:
+            return self._record_configuration_failure(link, error, now)
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM summaries WHERE link = ?", (link,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry_at = next_retry_at(kind, attempts, now)
+            self._db.execute(
+                "INSERT INTO summaries (link, status, attempts, failure_kind, next_retry_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(link) DO UPDATE SET status = excluded.status, "
+                "attempts = excluded.attempts, failure_kind = excluded.failure_kind, "
+                "next_retry_at = excluded.next_retry_at, updated_at = excluded.updated_at",
+                (link, f"Error: {error}", attempts, kind, retry_at, now),
+            )
+            if retry_at is None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO dead_letters (link, failure_kind, error, attempts, dead_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (link, kind, str(error), attempts, now),
+                )
+            self._db.commit()
+        return kind, attempts, retry_at
+
+    def _record_configuration_failure(self, link, error, now):
+        """Erreur de configuration : statut mis à jour, tentatives et prochaine tentative inchangées."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO summaries (link, status, failure_kind, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(link) DO UPDATE SET status = excluded.status, "
+                "failure_kind = excluded.failure_kind, updated_at = excluded.updated_at",
+                (link, f"Error: {error}", CONFIGURATION, now),
+            )
+            self._db.commit()
+            row = self._db.execute("SELECT attempts, next_retry_at FROM summaries WHERE link = ?", (link,)).fetchone()
+        return (CONFIGURATION, *row)
+
+    def dead_letters(self):
+        """Documents abandonnés, du plus récent au plus ancien."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT link, failure_kind, attempts, error, dead_at FROM dead_letters ORDER BY dead_at DESC"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["link", "failure_kind", "attempts", "error", "dead_at"])
+
+    def scheduled_retries(self):
+        """Échecs en attente de leur prochaine tentative, par date."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT link, failure_kind, attempts, next_retry_at FROM summaries "
+                "WHERE take_away_ai IS NULL AND next_retry_at IS NOT NULL ORDER BY next_retry_at"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["link", "failure_kind", "attempts", "next_retry_at"])
+
+    def requeue(self, links=None):
+        """
+        Remet des lettres mortes (toutes si links est None) dans la file du pipeline,
+        avec un compteur de tentatives à zéro.
+
+        Returns:
+            int: Nombre de documents remis en file
+        """
+        with self._lock:
+            if links is None:
+                links = [row[0] for row in self._db.execute("SELECT link FROM dead_letters")]
+            links = list(links)
+            removed = 0
+            for link in links:
+                removed += self._db.execute("DELETE FROM dead_letters WHERE link = ?", (link,)).rowcount
+                self._db.execute(
+                    "UPDATE summaries SET attempts = 0, failure_kind = NULL, next_retry_at = NULL WHERE link = ?",
+                    (link,),
+                )
+            self._db.commit()
+        return removed
+
+    def to_dataframe(self, status=None, since=None):
+        """
+        Tous les documents au format du CSV.
+
+        Args:
+            status: Ne garder que ce statut (ex: "Processed")
+            since: Date ISO (AAAA-MM-JJ) de réception minimale
+        """
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("received_on >= ?")
+            params.append(since)
+        return self._dataframe(f"WHERE {' AND '.join(conditions)}" if conditions else "", params)
+
+    def save_dataframe(self, df):
+        """
+        Enregistre les lignes d'un DataFrame au format du CSV (une mise à jour par lien).
+        Un lien présent sur plusieurs lignes n'est conservé qu'une fois, avec les valeurs de sa
+        dernière ligne : les lignes écartées sont signalées.
+
+        Returns:
+            int: Nombre de documents enregistrés
+        """
+        columns = [column for column in CSV_COLUMNS if column in df.columns and column != "Link"]
+        df = df[df["Link"].notna()]
+        report_duplicates(df)
+        rows = {row["Link"]: {column: row[column] for column in columns} for _, row in df.iterrows()}
+        self.upsert_many(rows.items())
+        return len(rows)
+
+    def import_csv(self, csv_file):
+        """Importe un fichier de suivi existant ; les valeurs du CSV remplacent celles du stockage."""
+        df = pd.read_csv(csv_file)
+        if "Link" not in df.columns:
+            raise ValueError(f"Colonne Link absente de {csv_file}")
+        # Index = numéro de ligne dans le fichier (après l'en-tête), pour signaler les doublons
+        df.index = df.index + 2
+        return self.save_dataframe(df)
+
+    def export(self, output_file, status=None, since=None):
+        """Exporte les documents en CSV ou en Excel (.xlsx) selon l'extension du fichier."""
+        df = self.to_dataframe(status, since)
+        if output_file.lower().endswith((".xlsx", ".xls")):
+            df.to_excel(output_file, index=False)
+        else:
+            df.to_csv(output_file, index=False)
+        return len(df)
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT COALESCE(status, 'À traiter'), COUNT(*) FROM summaries GROUP BY 1 ORDER BY 2 DESC"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M")
+
+
+def print_report(store, limit=50):
+    dead = store.dead_letters()
+    print(f"🪦 {len(dead)} lettres mortes (ignorées par le pipeline)")
+    if len(dead):
+        print("   " + ", ".join(f"{kind}: {count}" for kind, count in dead["failure_kind"].value_counts().items()))
+    for row in dead.head(limit).itertuples():
+        print(f"   - {_format_timestamp(row.dead_at)}  {row.failure_kind:10} {row.attempts} tentatives  {row.link}")
+        print(f"     {row.error[:150]}")
+
+    retries = store.scheduled_retries()
+    print(f"\n⏳ {len(retries)} nouvelles tentatives planifiées")
+    for row in retries.head(limit).itertuples():
+        print(f"   - {_format_timestamp(row.next_retry_at)}  {row.failure_kind:10} tentative {row.attempts + 1}  {row.link}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importer, exporter ou inspecter le stockage des résumés.")
+    parser.add_argument("--path", default=DEFAULT_STORE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Importer des fichiers de suivi CSV existants")
+    import_parser.add_argument("csv_files", nargs="+")
+
+    export_parser = subparsers.add_parser("export", help="Exporter en CSV ou Excel (.xlsx)")
+    export_parser.add_argument("output_file")
+    export_parser.add_argument("--status", help="Ne garder que ce statut (ex: Processed)")
+    export_parser.add_argument("--since", metavar="AAAA-MM-JJ", help="Date de réception minimale")
+
+    subparsers.add_parser("stats", help="Nombre de documents par statut")
+
+    report_parser = subparsers.add_parser("report", help="Lettres mortes et nouvelles tentatives planifiées")
+    report_parser.add_argument("--limit", type=int, default=50, help="Nombre de lignes affichées par liste")
+
+    requeue_parser = subparsers.add_parser("requeue", help="Remettre des lettres mortes dans la file du pipeline")
+    requeue_parser.add_argument("links", nargs="*", help="Liens à remettre en file (toutes les lettres mortes si absent)")
+
+    args = parser.parse_args()
+    store = SummaryStore(args.path)
+
+    if args.command == "import":
+        for csv_file in args.csv_files:
+            print(f"📥 {csv_file} : {store.import_csv(csv_file)} lignes importées")
+    elif args.command == "export":
+        print(f"📤 {store.export(args.output_file, args.status, args.since)} lignes exportées dans {args.output_file}")
+    elif args.command == "stats":
+        print(f"📦 {store.count()} documents")
+        for status, count in store.stats().items():
+            print(f"   - {status}: {count}")
+    elif args.command == "report":
+        print_report(store, args.limit)
+    elif args.command == "requeue":
+        print(f"🔁 {store.requeue(args.links or None)} documents remis en file")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import processing.data_extractor as d_ex
 import processing.data_classifier as d_c
-from summarization.summarizerAgent import generate_summary, criticize_summary, classify_document
+from summarization.summarizerAgent import stream_summary, stream_critique, classify_document, stream_classify_and_summarize
 from summarization.evaluate_rouge import evaluate_summary_with_original
 from datetime import datetime, date,timedelta
 import time
@@ -32,6 +32,12 @@ if 'selected_article' not in st.session_state:
     st.session_state.selected_article = None
 if 'selected_url' not in st.session_state:
     st.session_state.selected_url = None
+if 'combined_mode' not in st.session_state:
+    # Classification, résumé et mots-clés en un seul appel LLM (sinon deux appels séparés)
+    st.session_state.combined_mode = True
+if 'bypass_llm_cache' not in st.session_state:
+    # Forcer un nouvel appel LLM au lieu de réutiliser un résultat déjà obtenu (pipeline ou application)
+    st.session_state.bypass_llm_cache = False
 
 #-------------------- FONCTIONS UTILITAIRES --------------------#
 
@@ -83,8 +89,13 @@ def extract_data_from_url(url_or_id):
             extractor = d_ex.DataExtractor()
             data = extractor.extract(url_or_id).to_dict()
             
-            # Classifier le contenu
-            category, (input_tok, output_tok) = classify_document(data)
+            # Classifier le contenu (en mode combiné, la classification est faite avec le résumé)
+            # Modèles, datasets et bibliothèques reconnus par leurs métadonnées : pas d'appel LLM
+            category = d_c.DataClassifier.certain_category(data)
+            st.session_state.classification_tokens = (0, 0)
+            if category is None and not st.session_state.combined_mode:
+                category, (input_tok, output_tok) = classify_document(data, use_cache=not st.session_state.bypass_llm_cache)
+                st.session_state.classification_tokens = (input_tok, output_tok)
             
             # Marquer la source et harmoniser la structure de données
             data["source"] = "url"
@@ -167,7 +178,9 @@ def prepare_arxiv_article_data(article, full_extraction=True):
             
             # Pour les articles ArXiv, la catégorie est toujours "research paper"
             category = "research paper"
-            
+            # Aucun appel de classification : ne pas facturer celui d'une extraction d'URL précédente
+            st.session_state.classification_tokens = (0, 0)
+
             return data, category, True
             
         except Exception as e:
@@ -248,11 +261,41 @@ def generate_content_summary():
     Génère un résumé du contenu extrait
     """
     try:
-        with st.spinner("Résumé en cours..."):
-            summary, (input_tok, output_tok) = generate_summary(st.session_state.extracted_data)
-            st.session_state.summary = summary
-            st.session_state.summary_price = float(input_tok)*0.150/1e6 + float(output_tok)*0.6/1e6
-            return True
+        data = st.session_state.extracted_data
+        use_cache = not st.session_state.bypass_llm_cache
+        st.session_state.summary_timing = None
+        if st.session_state.combined_mode:
+            # Réponse JSON diffusée : le take-away s'affiche au fil des tokens, puis l'affichage habituel
+            report = {}
+            placeholder = st.empty()
+            with placeholder.container():
+                st.write_stream(stream_classify_and_summarize(data, use_cache=use_cache, report=report))
+            placeholder.empty()
+            summary = report["take_away"]
+            input_tok, output_tok = report["input_tokens"], report["output_tokens"]
+            st.session_state.summary_timing = (report["ttft_seconds"], report["total_seconds"])
+            st.session_state.extracted_category = st.session_state.get("extracted_category") or report["category"]
+            st.session_state.keywords = report["keywords"]
+        else:
+            # Classification déjà faite à l'extraction, sauf si elle a eu lieu en mode combiné
+            class_in, class_out = st.session_state.get("classification_tokens", (0, 0))
+            if st.session_state.get("extracted_category") is None:
+                with st.spinner("Classification en cours..."):
+                    category, (class_in, class_out) = classify_document(data, use_cache=use_cache)
+                st.session_state.extracted_category = category
+            # Résumé affiché au fil des tokens, puis remplacé par l'affichage habituel
+            report = {}
+            placeholder = st.empty()
+            with placeholder.container():
+                summary = st.write_stream(stream_summary(data, use_cache=use_cache, report=report))
+            placeholder.empty()
+            input_tok, output_tok = report["input_tokens"] + class_in, report["output_tokens"] + class_out
+            st.session_state.summary_timing = (report["ttft_seconds"], report["total_seconds"])
+            st.session_state.keywords = []
+        st.session_state.summary = summary
+        st.session_state.summary_tokens = (input_tok, output_tok)
+        st.session_state.summary_price = float(input_tok)*0.150/1e6 + float(output_tok)*0.6/1e6
+        return True
     except Exception as e:
         st.warning(f"Erreur lors du résumé : {e}")
         return False
@@ -262,10 +305,15 @@ def evaluate_summary_with_critique():
     Génère une critique du résumé
     """
     try:
-        with st.spinner("Critique en cours..."):
-            review = criticize_summary(st.session_state.extracted_data, st.session_state.summary)
-            st.session_state.review = review
-            return True
+        report = {}
+        placeholder = st.empty()
+        with placeholder.container():
+            review = st.write_stream(stream_critique(st.session_state.extracted_data, st.session_state.summary,
+                                                     use_cache=not st.session_state.bypass_llm_cache, report=report))
+        placeholder.empty()
+        st.session_state.review = review
+        st.session_state.review_timing = (report["ttft_seconds"], report["total_seconds"])
+        return True
     except Exception as e:
         st.error(f"Erreur lors de la critique: {e}")
         return False
@@ -750,13 +798,25 @@ def process_data_pipeline():
         # Informations de catégorie
         st.markdown("### Classification")
         with st.container():
-            if "extracted_category" in st.session_state:
+            if st.session_state.get("extracted_category"):
                 st.success(f"**Catégorie détectée :** {st.session_state.extracted_category}")
+            elif st.session_state.combined_mode:
+                st.info("La catégorie sera détectée avec le résumé.")
             else:
                 st.warning("Aucune catégorie détectée")
         
         # Section de résumé - Action commune quelle que soit la source
         st.markdown("## Interprétation")
+        st.session_state.combined_mode = st.toggle(
+            "Classification et résumé en un seul appel",
+            value=st.session_state.combined_mode,
+            help="Envoie le contenu une seule fois au LLM au lieu de deux (classification puis résumé)."
+        )
+        st.session_state.bypass_llm_cache = st.checkbox(
+            "Ignorer le cache LLM",
+            value=st.session_state.bypass_llm_cache,
+            help="Par défaut, un contenu déjà résumé (ici ou par le pipeline) est servi depuis le cache sans appel au LLM."
+        )
         if st.button("Résumer le contenu 📝"):
             generate_content_summary()
         
@@ -764,7 +824,13 @@ def process_data_pipeline():
         if "summary" in st.session_state:
             st.markdown("### Résumé Généré")
             st.write(st.session_state.summary)
+            if st.session_state.get("keywords"):
+                st.write(f"**Mots-clés :** {', '.join(st.session_state.keywords)}")
+            input_tok, output_tok = st.session_state.summary_tokens
+            st.write(f"**Tokens (classification + résumé)** 🪙: {input_tok} en entrée, {output_tok} en sortie")
             st.write(f"**Prix du résumé** 💸: {st.session_state.summary_price}$")
+            if st.session_state.get("summary_timing"):
+                st.caption("⏱️ Premier token après {:.1f} s, résumé complet en {:.1f} s".format(*st.session_state.summary_timing))
     
             # Section d'évaluation - Actions communes quelle que soit la source
             st.markdown("## Evaluation et Critique")
@@ -777,6 +843,8 @@ def process_data_pipeline():
                 if "review" in st.session_state:
                     st.markdown("### Critique du résumé :")
                     st.write(st.session_state.review)
+                    if st.session_state.get("review_timing"):
+                        st.caption("⏱️ Premier token après {:.1f} s, critique complète en {:.1f} s".format(*st.session_state.review_timing))
                 
             with col2:
                 if st.button("Évaluer le Résumé avec Rouge 🧮"):
@@ -0,0 +1,95 @@
+import re
+
+from summarization.token_counter import count_tokens, DEFAULT_MODEL
+
+# Nombre maximal de tokens de contenu envoyés en une requête, par modèle.
+# Au-delà, le document est découpé et résumé par parties (map-reduce).
+TOKEN_BUDGETS = {
+    "gpt-4o-mini": 16000,
+    "llama3.2": 6000,
+}
+DEFAULT_TOKEN_BUDGET = 8000
+
+# Taille maximale d'une partie : des parties plus petites que le budget sont résumées en parallèle
+CHUNK_TOKENS = 4000
+
+# Nombre maximal de passes de réduction quand les résumés des parties dépassent encore le budget ;
+# au-delà, le texte condensé est tronqué au budget
+MAX_REDUCE_ROUNDS = 3
+
+# Titres de section : Markdown (README, blogs), sections numérotées d'un article
+# ("3 Method", "2.1. Results", "IV. EXPERIMENTS") et sections usuelles sans numéro.
+# Le titre numéroté doit commencer par une majuscule : une ligne coupée qui commence par
+# un nombre ("3 images were used...") n'est pas un titre. Les noms de sections usuelles
+# ignorent la casse ("ABSTRACT", "Related work") mais doivent aussi commencer par une majuscule.
+SECTION_HEADING = re.compile(
+    r"^(?:#{1,6}\s+\S.*"
+    r"|(?:\d{1,2}(?:\.\d{1,2})*\.?|[IVX]{1,5}\.)\s+[A-Z][^\n]{0,80}"
+    r"|(?=[A-Z])(?i:Abstract|Introduction|Related Work|Background|Methods?|Experiments?|Results|Discussion|"
+    r"Conclusions?|Limitations|Acknowledge?ments|References|Appendix)\b[^\n]{0,40})$",
+    re.MULTILINE,
+)
+
+
+def token_budget(model):
+    return TOKEN_BUDGETS.get(model, DEFAULT_TOKEN_BUDGET)
+
+
+def split_sections(text):
+    """Découpe un texte juste avant chaque titre de section (le titre reste en tête de sa section)."""
+    starts = [match.start() for match in SECTION_HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[start:stop] for start, stop in zip(bounds, bounds[1:]) if text[start:stop].strip()]
+
+
+def _split_oversized(section, max_tokens, model):
+    """Découpe une section trop longue par paragraphes, puis par phrases, puis en tranches de caractères."""
+    for separator in ("\n\n", "\n", ". "):
+        pieces = section.split(separator)
+        if len(pieces) > 1 and all(count_tokens(piece, model) <= max_tokens for piece in pieces):
+            return _pack([piece + separator for piece in pieces], max_tokens, model)
+    # Dernier recours : tranches de taille fixe, estimée à partir du ratio caractères / tokens
+    tokens = count_tokens(section, model)
+    size = max(1, int(len(section) * max_tokens / tokens * 0.9))
+    return [section[start:start + size] for start in range(0, len(section), size)]
+
+
+def _pack(pieces, max_tokens, model):
+    """Regroupe des morceaux consécutifs tant que le total reste sous max_tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = count_tokens(piece, model)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, model=DEFAULT_MODEL):
+    """
+    Découpe un texte en parties d'au plus max_tokens tokens, en coupant de préférence
+    aux frontières de sections, et en regroupant les sections courtes consécutives.
+
+    Returns:
+        list: Parties du texte, dans l'ordre
+    """
+    pieces = []
+    for section in split_sections(text):
+        if count_tokens(section, model) > max_tokens:
+            pieces.extend(_split_oversized(section, max_tokens, model))
+        else:
+            pieces.append(section)
+    return [chunk for chunk in _pack(pieces, max_tokens, model) if chunk.strip()]
+
+
+def truncate_to_budget(text, max_tokens, model=DEFAULT_MODEL):
+    """Garde le début du texte dans la limite de max_tokens, coupé de préférence entre deux paragraphes."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    return chunk_text(text, max_tokens, model)[0]
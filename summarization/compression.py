@@ -0,0 +1,184 @@
+import re
+
+import numpy as np
+
+from summarization.chunking import split_sections
+from summarization.token_counter import count_tokens, DEFAULT_MODEL
+
+# Nombre de tokens conservés par document ; un contenu plus court est laissé tel quel
+COMPRESSION_TARGET_TOKENS = 3000
+
+# Sections sans intérêt pour un take-away de 150 mots
+BACK_MATTER_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:[A-Z]\.?\s+|\d{1,2}\.?\s+)?"
+    r"(?:References|Bibliography|Appendix|Appendices|Supplementary Materials?|Acknowledge?ments?)\b",
+    re.IGNORECASE,
+)
+ACKNOWLEDGMENTS = re.compile(r"Acknowledge?ments?", re.IGNORECASE)
+# Les références ne sont coupées que si elles arrivent après ce ratio du document (évite une table des matières)
+MIN_BACK_MATTER_POSITION = 0.3
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+WORD = re.compile(r"[a-z][a-z0-9\-]+")
+MIN_SENTENCE_WORDS = 5
+MIN_ALPHA_RATIO = 0.6  # en dessous, la ligne est un morceau de tableau ou d'équation
+
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+him his how however i if in into is it its itself just may me might more most must my no nor not now of off on
+once only or other our ours out over own same she should so some such than that the their theirs them then there
+these they this those through to too under until up us very was we were what when where which while who whom why
+will with would you your yours et al fig figure table eq
+""".split())
+
+
+def strip_back_matter(text):
+    """Retire remerciements, références et annexes (tout ce qui suit les références ou l'annexe)."""
+    kept = []
+    position = 0
+    for section in split_sections(text):
+        heading = section.lstrip().split("\n", 1)[0]
+        match = BACK_MATTER_HEADING.match(heading)
+        if match and not ACKNOWLEDGMENTS.search(match.group(0)) and position >= MIN_BACK_MATTER_POSITION * len(text):
+            break
+        if not match:
+            kept.append(section)
+        position += len(section)
+    return "".join(kept)
+
+
+def _is_prose(line):
+    letters = sum(character.isalpha() or character.isspace() for character in line)
+    return len(line) > 0 and letters / len(line) >= MIN_ALPHA_RATIO
+
+
+def split_sentences(text):
+    """Phrases du texte, sans les lignes de tableaux / équations ni les fragments trop courts."""
+    prose = " ".join(line.strip() for line in text.splitlines() if _is_prose(line.strip()))
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(prose)
+            if len(sentence.split()) >= MIN_SENTENCE_WORDS]
+
+
+def _term_matrix(documents_sentences):
+    """
+    Matrice creuse (format COO en tableaux NumPy) des occurrences de termes de toutes les phrases du corpus.
+
+    Returns:
+        tuple: ((lignes, colonnes, comptes), nombre de phrases, nombre de termes, document de chaque phrase)
+    """
+    vocabulary = {}
+    rows, cols, sentence_document = [], [], []
+    row = 0
+    for document_index, sentences in enumerate(documents_sentences):
+        for sentence in sentences:
+            for word in WORD.findall(sentence.lower()):
+                if word not in STOPWORDS:
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(word, len(vocabulary)))
+            sentence_document.append(document_index)
+            row += 1
+
+    n_rows, n_terms = row, len(vocabulary)
+    if not rows:
+        return (np.zeros(0, dtype=np.int64),) * 2 + (np.zeros(0),), n_rows, n_terms, np.array(sentence_document)
+    # Occurrences identiques (même phrase, même terme) regroupées : équivalent d'un sum_duplicates
+    keys, counts = np.unique(np.array(rows, dtype=np.int64) * n_terms + np.array(cols, dtype=np.int64),
+                             return_counts=True)
+    return (keys // n_terms, keys % n_terms, counts.astype(np.float64)), n_rows, n_terms, np.array(sentence_document)
+
+
+def _tfidf(coo, n_rows, n_terms, sentence_document, n_documents):
+    """
+    Poids TF-IDF normalisés (L2 par phrase), l'IDF étant calculé sur les n_documents unités
+    auxquelles appartiennent les phrases (sentence_document) : les documents du lot, ou les
+    phrases elles-mêmes pour un document seul.
+    """
+    rows, cols, counts = coo
+    if not len(rows):
+        return coo
+    # Nombre de documents contenant chaque terme
+    document_terms = np.unique(sentence_document[rows] * n_terms + cols)
+    document_frequency = np.bincount(document_terms % n_terms, minlength=n_terms)
+    idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_rows))
+    return rows, cols, weights / norms[rows]
+
+
+def _textrank(rows, cols, weights, n_sentences):
+    """Score TextRank des phrases d'un document à partir de leur similarité cosinus TF-IDF."""
+    if n_sentences <= 2:
+        return np.ones(n_sentences)
+    # Matrice dense restreinte aux termes présents dans le document
+    terms, local_cols = np.unique(cols, return_inverse=True)
+    matrix = np.zeros((n_sentences, len(terms)), dtype=np.float32)
+    matrix[rows, local_cols] = weights
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+    scores = np.full(n_sentences, 1 / n_sentences)
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = (1 - TEXTRANK_DAMPING) / n_sentences + TEXTRANK_DAMPING * transition.T @ scores
+    return scores
+
+
+def _select(sentences, scores, target_tokens, model):
+    """Meilleures phrases jusqu'à target_tokens, remises dans l'ordre du document."""
+    tokens = np.array([count_tokens(sentence, model) for sentence in sentences])
+    order = np.argsort(-scores, kind="stable")
+    kept = order[np.cumsum(tokens[order]) <= target_tokens]
+    if not len(kept):
+        kept = order[:1]
+    return " ".join(sentences[i] for i in np.sort(kept))
+
+
+def compress_documents(texts, target_tokens=COMPRESSION_TARGET_TOKENS, model=DEFAULT_MODEL):
+    """
+    Compresse un lot de documents avant l'appel au LLM : retire références et annexes,
+    puis garde les phrases les mieux classées par TextRank (similarité TF-IDF, IDF calculé
+    sur tout le lot, ou sur les phrases d'un document seul) jusqu'à target_tokens. Les documents déjà assez courts sont inchangés.
+
+    Args:
+        texts: Contenus des documents
+        target_tokens: Nombre de tokens visé par document
+
+    Returns:
+        list: Contenus compressés, dans l'ordre
+    """
+    results = list(texts)
+    to_compress = [i for i, text in enumerate(texts) if text and count_tokens(text, model) > target_tokens]
+    if not to_compress:
+        return results
+
+    stripped = [strip_back_matter(texts[i]) for i in to_compress]
+    documents_sentences = [split_sentences(text) for text in stripped]
+    coo, n_rows, n_terms, sentence_document = _term_matrix(documents_sentences)
+    if len(to_compress) > 1:
+        rows, cols, weights = _tfidf(coo, n_rows, n_terms, sentence_document, len(to_compress))
+    else:
+        # Sur un seul document, l'IDF vaudrait 1 pour tous les termes : il est calculé sur ses phrases,
+        # ce qui pénalise les termes présents partout dans le document
+        rows, cols, weights = _tfidf(coo, n_rows, n_terms, np.arange(n_rows), n_rows)
+
+    # Les phrases sont numérotées document après document : chaque document est un bloc de lignes
+    offsets = np.concatenate([[0], np.cumsum([len(sentences) for sentences in documents_sentences])])
+    row_document = sentence_document[rows] if len(rows) else rows
+    for position, (index, sentences) in enumerate(zip(to_compress, documents_sentences)):
+        if not sentences:
+            results[index] = stripped[position]
+            continue
+        in_document = row_document == position
+        scores = _textrank(rows[in_document] - offsets[position], cols[in_document], weights[in_document], len(sentences))
+        results[index] = _select(sentences, scores, target_tokens, model)
+    return results
+
+
+def compress_text(text, target_tokens=COMPRESSION_TARGET_TOKENS, model=DEFAULT_MODEL):
+    """Compresse un seul document (voir compress_documents)."""
+    return compress_documents([text], target_tokens, model)[0]
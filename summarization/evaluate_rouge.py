@@ -1,23 +1,148 @@
-from rouge_score import rouge_scorer
-import processing.data_extractor as d_ex
-from summarization.summarizerAgent import generate_summary
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from nltk.stem import porter
+from rouge_score import scoring
+from rouge_score.tokenize import NON_ALPHANUM_RE, SPACES_RE, VALID_TOKEN_RE
+
+ROUGE_TYPES = ("rouge1", "rouge2", "rougeL")
+
+# Processus utilisés par score_batch ; en dessous de MIN_ROWS_PER_WORKER lignes par processus, le calcul reste local
+ROUGE_WORKERS = os.cpu_count() or 1
+MIN_ROWS_PER_WORKER = 200
+
+# Textes dont les tokens sont gardés en mémoire (les take-aways de référence reviennent à chaque évaluation)
+TOKEN_CACHE_SIZE = 8192
+
+_stemmer = porter.PorterStemmer()
+
+
+@lru_cache(maxsize=None)
+def _stem(word):
+    # Comme rouge_score : seuls les mots de plus de 3 caractères sont racinisés
+    return _stemmer.stem(word) if len(word) > 3 else word
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenize(text):
+    """Tokens racinisés d'un texte, identiques à ceux de RougeScorer(use_stemmer=True) (mémoïsé)."""
+    words = SPACES_RE.split(NON_ALPHANUM_RE.sub(" ", text.lower()))
+    return tuple(token for token in map(_stem, words) if VALID_TOKEN_RE.match(token))
+
+
+def _ngrams(tokens, n):
+    return Counter(zip(*(tokens[i:] for i in range(n))))
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _ngram_counts(text, n):
+    return _ngrams(tokenize(text), n)
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _position_masks(text):
+    """Pour chaque token du texte, masque binaire (entier) de ses positions."""
+    masks = {}
+    for position, token in enumerate(tokenize(text)):
+        masks[token] = masks.get(token, 0) | (1 << position)
+    return masks
+
+
+def _lcs_length(target, prediction_tokens):
+    """
+    Longueur de la plus longue sous-séquence commune, par l'algorithme bit-parallèle
+    de Hyyrö : une addition et quelques opérations binaires par token de la prédiction,
+    au lieu de la table len(cible) x len(prédiction) de rouge_score.
+    """
+    length = len(tokenize(target))
+    masks = _position_masks(target)
+    full = (1 << length) - 1
+    v = full
+    for token in prediction_tokens:
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+    return length - bin(v).count("1")
 
-def evaluate_summary_with_original(generated_summary: str, original_content: str):
 
-    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
-    scores = scorer.score(original_content, generated_summary)
-    
-    results = {
-        "rouge1_precision": scores["rouge1"].precision,
-        "rouge2_precision": scores["rouge2"].precision,
-        "rougeL_precision": scores["rougeL"].precision,
-    }
+def _score(precision_overlap, prediction_count, target_count):
+    precision = precision_overlap / max(prediction_count, 1)
+    recall = precision_overlap / max(target_count, 1)
+    return precision, recall, scoring.fmeasure(precision, recall)
+
+
+def score_pair(prediction, target):
+    """
+    Scores ROUGE-1, ROUGE-2 et ROUGE-L (précision, rappel, F1) d'une prédiction par rapport à
+    une cible, identiques à rouge_score.RougeScorer(use_stemmer=True).score(target, prediction).
+
+    Returns:
+        dict: rouge1_precision, rouge1_recall, rouge1_f1, ... rougeL_f1
+    """
+    results = {}
+    for n, rouge_type in ((1, "rouge1"), (2, "rouge2")):
+        target_ngrams = _ngram_counts(target, n)
+        prediction_ngrams = _ngram_counts(prediction, n)
+        overlap = sum((target_ngrams & prediction_ngrams).values())
+        scores = _score(overlap, sum(prediction_ngrams.values()), sum(target_ngrams.values()))
+        results.update(zip((f"{rouge_type}_precision", f"{rouge_type}_recall", f"{rouge_type}_f1"), scores))
+
+    prediction_tokens = tokenize(prediction)
+    target_tokens = tokenize(target)
+    if prediction_tokens and target_tokens:
+        scores = _score(_lcs_length(target, prediction_tokens), len(prediction_tokens), len(target_tokens))
+    else:
+        scores = (0, 0, 0)
+    results.update(zip(("rougeL_precision", "rougeL_recall", "rougeL_f1"), scores))
     return results
 
+
+def _score_rows(rows):
+    return [score_pair(prediction, target) for prediction, target in rows]
+
+
+def score_batch(predictions, targets, workers=ROUGE_WORKERS):
+    """
+    Scores ROUGE de toutes les paires (prédiction, cible) en un appel. Chaque texte n'est
+    tokenisé et racinisé qu'une fois ; les gros lots sont répartis sur un pool de processus.
+
+    Args:
+        predictions: Textes générés
+        targets: Textes de référence, dans le même ordre
+        workers: Nombre maximal de processus (1 pour tout calculer dans le processus courant)
+
+    Returns:
+        list: Un dictionnaire de scores par paire (voir score_pair), dans l'ordre
+    """
+    rows = list(zip(predictions, targets))
+    workers = min(workers, len(rows) // MIN_ROWS_PER_WORKER)
+    if workers <= 1:
+        return _score_rows(rows)
+
+    # Lignes triées par cible : chaque processus retrouve les mêmes références dans son cache
+    order = sorted(range(len(rows)), key=lambda i: rows[i][1])
+    size = -(-len(order) // workers)
+    chunks = [order[start:start + size] for start in range(0, len(order), size)]
+    results = [None] * len(rows)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk, scores in zip(chunks, executor.map(_score_rows, [[rows[i] for i in chunk] for chunk in chunks])):
+            for index, score in zip(chunk, scores):
+                results[index] = score
+    return results
+
+
+def evaluate_summary_with_original(generated_summary: str, original_content: str):
+    return score_pair(generated_summary, original_content)
+
+
 if __name__ == "__main__":
+    import processing.data_extractor as d_ex
+    from summarization.summarizerAgent import generate_summary
+
     extractor = d_ex.DataExtractor()
     original_content = extractor.extract("https://arxiv.org/pdf/1611.07004").to_dict()
-    generated_summary = generate_summary(original_content)
+    generated_summary, _ = generate_summary(original_content)
     rouge_results = evaluate_summary_with_original(generated_summary, original_content["content"])
 
     print(f"ROUGE Evaluation Results: {rouge_results}")
@@ -0,0 +1,356 @@
+"""
+Classifieur local de catégorie (TF-IDF haché + régression logistique multinomiale en NumPy).
+
+Entraîné sur les catégories annotées de output/AI takeaways benchmark.csv, il répond en
+quelques microsecondes ; classify_document ne fait appel au LLM que lorsque sa confiance
+est sous le seuil. Les modèles sont versionnés dans models/fast_classifier (v<N>.npz + v<N>.json).
+    python -m summarization.fast_classifier train
+    python -m summarization.fast_classifier evaluate --llm
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_DIR = "./models/fast_classifier"
+BENCHMARK_FILE = "./output/AI takeaways benchmark.csv"
+LABEL_COLUMN = "Category (Illuin)"
+# Texte utilisé avec --no-extract (hors ligne) : plus court que le contenu complet classé en production
+FALLBACK_TEXT_COLUMNS = ["Topic / Keywords (Illuin)", "Take-away (Illuin)"]
+
+N_FEATURES = 2 ** 16
+MAX_TEXT_CHARS = 20000  # le début d'un document suffit à le catégoriser
+CONFIDENCE_THRESHOLD = 0.6  # en dessous, la classification est confiée au LLM
+
+L2_PENALTY = 1e-3
+LEARNING_RATE = 0.5
+EPOCHS = 300
+
+WORD = re.compile(r"[a-z][a-z0-9\-]+")
+
+
+#-------------------- Vectorisation --------------------#
+
+def hashed_terms(text):
+    """Indices hachés (stables d'un processus à l'autre) des unigrammes et bigrammes du texte."""
+    words = WORD.findall((text or "")[:MAX_TEXT_CHARS].lower())
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.array([zlib.crc32(term.encode("utf-8")) % N_FEATURES for term in terms], dtype=np.int64)
+
+
+def term_counts(text):
+    """(indices, comptes) des termes du texte."""
+    return np.unique(hashed_terms(text), return_counts=True)
+
+
+def vectorize(indices, counts, idf):
+    """Poids TF-IDF (tf sous-linéaire) normalisés L2 d'un document."""
+    weights = (1 + np.log(counts)) * idf[indices]
+    norm = np.sqrt((weights ** 2).sum())
+    return weights / norm if norm else weights
+
+
+def _stack(documents, idf):
+    """Lot de documents au format COO : (lignes, colonnes, poids)."""
+    rows, cols, values = [], [], []
+    for row, (indices, counts) in enumerate(documents):
+        rows.append(np.full(len(indices), row))
+        cols.append(indices)
+        values.append(vectorize(indices, counts, idf))
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+#-------------------- Modèle --------------------#
+
+class FastClassifier:
+    def __init__(self, classes, weights, bias, idf, metadata=None):
+        self.classes = list(classes)
+        self.weights = weights  # (classes, N_FEATURES)
+        self.bias = bias
+        self.idf = idf
+        self.metadata = metadata or {}
+
+    @classmethod
+    def train(cls, texts, labels, classes=None, epochs=EPOCHS):
+        """Entraîne le modèle par descente de gradient sur l'entropie croisée régularisée."""
+        classes = sorted(set(labels)) if classes is None else list(classes)
+        class_index = {label: i for i, label in enumerate(classes)}
+        y = np.array([class_index[label] for label in labels])
+        documents = [term_counts(text) for text in texts]
+
+        document_frequency = np.zeros(N_FEATURES)
+        for indices, _ in documents:
+            document_frequency[indices] += 1
+        idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+        rows, cols, values = _stack(documents, idf)
+        n, k = len(documents), len(classes)
+        targets = np.eye(k)[y]
+        weights = np.zeros((k, N_FEATURES))
+        bias = np.zeros(k)
+        for _ in range(epochs):
+            # Produits matrice creuse x dense, classe par classe, via bincount sur les lignes / colonnes
+            logits = np.stack([np.bincount(rows, weights=weights[c, cols] * values, minlength=n) for c in range(k)], axis=1)
+            error = (_softmax(logits + bias) - targets) / n
+            gradient = np.stack([np.bincount(cols, weights=error[rows, c] * values, minlength=N_FEATURES) for c in range(k)])
+            weights -= LEARNING_RATE * (gradient + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * error.sum(axis=0)
+        return cls(classes, weights.astype(np.float32), bias.astype(np.float32), idf.astype(np.float32))
+
+    def predict_proba(self, text):
+        indices, counts = term_counts(text)
+        values = vectorize(indices, counts, self.idf)
+        logits = self.weights[:, indices] @ values + self.bias
+        return _softmax(logits[None, :])[0]
+
+    def predict(self, text):
+        """Retourne (catégorie, confiance)."""
+        probabilities = self.predict_proba(text)
+        best = int(np.argmax(probabilities))
+        return self.classes[best], float(probabilities[best])
+
+    #-------------------- Artefact versionné --------------------#
+
+    def save(self, model_dir=DEFAULT_MODEL_DIR):
+        os.makedirs(model_dir, exist_ok=True)
+        version = (latest_version(model_dir) or 0) + 1
+        path = os.path.join(model_dir, f"v{version}")
+        np.savez_compressed(path + ".npz", weights=self.weights, bias=self.bias, idf=self.idf)
+        self.metadata = {**self.metadata, "version": version, "classes": self.classes, "n_features": N_FEATURES,
+                         "created": datetime.now().isoformat(timespec="seconds")}
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, model_dir=DEFAULT_MODEL_DIR, version=None):
+        """Charge une version du modèle (la plus récente par défaut) ; None si aucun modèle n'est disponible."""
+        version = version or latest_version(model_dir)
+        if version is None:
+            return None
+        path = os.path.join(model_dir, f"v{version}")
+        with open(path + ".json", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("n_features") != N_FEATURES:
+            return None
+        arrays = np.load(path + ".npz")
+        return cls(metadata["classes"], arrays["weights"], arrays["bias"], arrays["idf"], metadata)
+
+
+def latest_version(model_dir=DEFAULT_MODEL_DIR):
+    versions = [int(re.search(r"v(\d+)\.npz$", path).group(1)) for path in glob.glob(os.path.join(model_dir, "v*.npz"))]
+    return max(versions) if versions else None
+
+
+#-------------------- Données d'entraînement --------------------#
+
+def _normalize_label(label):
+    """Nettoie les étiquettes (ex: « Answer: Method » renvoyé par d'anciens prompts)."""
+    if not isinstance(label, str):
+        return None
+    return label.split(":", 1)[-1].strip() or None
+
+
+def load_training_data(input_file=BENCHMARK_FILE, classes=None, extract=True):
+    """
+    Textes et étiquettes du fichier annoté. Avec extract, le texte est le contenu extrait du
+    lien (cache HTTP), celui que predict reçoit en production : les lignes dont le contenu
+    n'est pas extractible (réseaux sociaux, presse payante...) sont écartées plutôt que
+    remplacées par un autre texte. Sans extract, toutes les lignes utilisent les colonnes de repli.
+
+    Returns:
+        tuple: (textes, étiquettes, liens, nombre de lignes écartées)
+    """
+    df = pd.read_csv(input_file)
+    df = df[df[LABEL_COLUMN].notna()]
+    if classes is not None:
+        df = df[df[LABEL_COLUMN].isin(classes)]
+
+    extractor = None
+    if extract:
+        from processing.data_extractor import DataExtractor
+        extractor = DataExtractor()
+
+    texts, labels, links, excluded = [], [], [], 0
+    for _, row in df.iterrows():
+        if extractor is None:
+            text = " ".join(str(row[column]) for column in FALLBACK_TEXT_COLUMNS if isinstance(row[column], str))
+        else:
+            text = None
+            if isinstance(row["Link"], str):
+                try:
+                    text = extractor.extract(row["Link"]).content
+                except Exception:
+                    text = None
+            if not text:
+                excluded += 1
+                continue
+        texts.append(text)
+        labels.append(row[LABEL_COLUMN])
+        links.append(row["Link"])
+    return texts, labels, links, excluded
+
+
+def _report_training_data(texts, excluded, extract):
+    """Affiche la provenance des exemples ; retourne False s'il n'y en a aucun."""
+    if not texts:
+        print(f"⚠️ Aucun exemple utilisable ({excluded} ligne(s) écartée(s)) : "
+              f"vérifiez l'accès au réseau ou utilisez --no-extract")
+        return False
+    if extract:
+        print(f"📚 {len(texts)} exemples, {excluded} ligne(s) écartée(s) (contenu non extractible)")
+    else:
+        print(f"📚 {len(texts)} exemples tirés des colonnes {', '.join(FALLBACK_TEXT_COLUMNS)}")
+        print("⚠️ En production le classifieur reçoit le contenu complet : "
+              "l'exactitude mesurée ici ne la reflète pas")
+    return True
+
+
+def _folds(labels, k, seed=0):
+    """Indices de validation croisée à k plis, stratifiés par étiquette."""
+    rng = np.random.default_rng(seed)
+    folds = [[] for _ in range(k)]
+    for label in sorted(set(labels)):
+        indices = rng.permutation([i for i, value in enumerate(labels) if value == label])
+        for position, index in enumerate(indices):
+            folds[position % k].append(int(index))
+    return folds
+
+
+def cross_validate(texts, labels, classes, k=5):
+    """Prédictions hors échantillon (catégorie, confiance) pour chaque texte."""
+    predictions = [None] * len(texts)
+    for fold in _folds(labels, k):
+        held_out = set(fold)
+        train = [i for i in range(len(texts)) if i not in held_out]
+        model = FastClassifier.train([texts[i] for i in train], [labels[i] for i in train], classes)
+        for i in fold:
+            predictions[i] = model.predict(texts[i])
+    return predictions
+
+
+#-------------------- CLI --------------------#
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def train_command(args):
+    from summarization.summarizerAgent import CATEGORIES
+    texts, labels, _, excluded = load_training_data(args.input_file, CATEGORIES, extract=not args.no_extract)
+    if not _report_training_data(texts, excluded, not args.no_extract):
+        return
+    classes = [label for label in CATEGORIES if label in set(labels)]
+    print(f"🏷️ Classes : {', '.join(classes)}")
+
+    predictions = cross_validate(texts, labels, classes)
+    accuracy = np.mean([prediction == label for (prediction, _), label in zip(predictions, labels)])
+    print(f"🎯 Exactitude en validation croisée (5 plis) : {accuracy:.1%}")
+
+    start = time.perf_counter()
+    model = FastClassifier.train(texts, labels, classes)
+    model.metadata = {"training_file": args.input_file, "training_file_sha256": _file_hash(args.input_file),
+                      "examples": len(texts), "excluded_rows": excluded,
+                      "text_source": "columns" if args.no_extract else "content",
+                      "cv_accuracy": round(float(accuracy), 4), "threshold": CONFIDENCE_THRESHOLD,
+                      "training_seconds": round(time.perf_counter() - start, 2)}
+    path = model.save(args.model_dir)
+    print(f"💾 Modèle enregistré : {path}.npz")
+
+
+def evaluate_command(args):
+    from summarization.summarizerAgent import CATEGORIES, classify_document
+    from summarization.token_counter import count_tokens
+
+    start = time.perf_counter()
+    model = FastClassifier.load(args.model_dir)
+    load_ms = (time.perf_counter() - start) * 1000
+    if model is None:
+        print("⚠️ Aucun modèle : lancez d'abord `python -m summarization.fast_classifier train`.")
+        return
+
+    texts, labels, links, excluded = load_training_data(args.input_file, CATEGORIES, extract=not args.no_extract)
+    if not _report_training_data(texts, excluded, not args.no_extract):
+        return
+    # Hors échantillon : on réentraîne par plis plutôt que d'évaluer le modèle sur ses propres données
+    predictions = cross_validate(texts, labels, model.classes)
+
+    start = time.perf_counter()
+    for text in texts:
+        model.predict(text)
+    predict_us = (time.perf_counter() - start) * 1e6 / len(texts)
+
+    # Référence LLM seul : la colonne « Category AI » du fichier, ou de nouveaux appels avec --llm
+    df = pd.read_csv(args.input_file).set_index("Link")
+    llm_predictions, llm_seconds = [], []
+    for link, text in zip(links, texts):
+        if args.llm:
+            start = time.perf_counter()
+            category, _ = classify_document({"content": text}, use_cache=False, fast_path=False)
+            llm_seconds.append(time.perf_counter() - start)
+            llm_predictions.append(_normalize_label(category))
+        else:
+            value = df["Category AI"].get(link) if link in df.index else None
+            llm_predictions.append(_normalize_label(value if isinstance(value, str) else None))
+
+    # Coût LLM estimé : tokens du document, prix d'entrée de gpt-4o-mini (0.150 $ / 1M tokens)
+    llm_tokens = np.array([count_tokens(text) for text in texts])
+    llm_correct = np.array([prediction == label for prediction, label in zip(llm_predictions, labels)])
+    llm_known = np.array([prediction is not None for prediction in llm_predictions])
+    fast_correct = np.array([prediction == label for (prediction, _), label in zip(predictions, labels)])
+    confidences = np.array([confidence for _, confidence in predictions])
+
+    print(f"⏱️ Chargement {load_ms:.1f} ms, prédiction {predict_us:.0f} µs/document"
+          + (f", LLM {np.mean(llm_seconds) * 1000:.0f} ms/document" if llm_seconds else ""))
+    print(f"{len(texts)} documents annotés\n")
+    print(f"{'stratégie':28} {'exactitude':>11} {'appels LLM':>11} {'coût LLM':>10}")
+    llm_accuracy = llm_correct[llm_known].mean() if llm_known.any() else float("nan")
+    print(f"{'LLM seul':28} {llm_accuracy:>10.1%} {len(texts):>11} {llm_tokens.sum() * 0.150 / 1e6:>9.4f}$")
+    print(f"{'local seul':28} {fast_correct.mean():>10.1%} {0:>11} {0:>9.4f}$")
+    for threshold in sorted({args.threshold, 0.4, 0.5, 0.6, 0.7, 0.8}):
+        confident = confidences >= threshold
+        # Cascade : prédiction locale si confiante, sinon celle du LLM
+        cascade_correct = np.where(confident, fast_correct, llm_correct)
+        evaluated = confident | llm_known
+        accuracy = cascade_correct[evaluated].mean() if evaluated.any() else float("nan")
+        cost = llm_tokens[~confident].sum() * 0.150 / 1e6
+        print(f"{f'cascade (seuil {threshold:.2f})':28} {accuracy:>10.1%} {int((~confident).sum()):>11} {cost:>9.4f}$")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--input-file", default=BENCHMARK_FILE)
+    parser.add_argument("--no-extract", action="store_true", help="N'utiliser que les colonnes du fichier (sans réseau)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("train", help="Entraîner et enregistrer une nouvelle version")
+    evaluate_parser = subparsers.add_parser("evaluate", help="Exactitude, latence et coût face au LLM seul")
+    evaluate_parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    evaluate_parser.add_argument("--llm", action="store_true", help="Rappeler le LLM au lieu d'utiliser la colonne Category AI")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train_command(args)
+    else:
+        evaluate_command(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "./cache/llm_cache.sqlite"
+DEFAULT_MAX_BYTES = 200 * 1024 ** 2  # 200 Mo, au-delà les résultats les moins récemment utilisés sont évincés
+
+
+def template_version(template):
+    """Version d'un prompt : modifier le template invalide les résultats obtenus avec l'ancien."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+class LlmCache:
+    """
+    Cache persistant des résultats LLM (classification, résumé, critique...).
+
+    La clé est le hash de la tâche, de la version du prompt, du modèle, de la température
+    et des entrées : un même contenu n'est jamais renvoyé au LLM, que la demande vienne
+    du pipeline ou de l'application Streamlit (même fichier SQLite). La taille totale
+    est bornée par une éviction LRU.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counters = {}  # tâche -> {"hits": n, "misses": n}
+        # Partagé entre processus (pipeline et Streamlit) : WAL et attente sur verrou
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                task TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(task, version, model, temperature, inputs):
+        payload = json.dumps([task, version, model, temperature, inputs], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, task, counter):
+        counters = self._counters.setdefault(task, {"hits": 0, "misses": 0, "tokens_saved": 0})
+        counters[counter] += 1
+        return counters
+
+    def get(self, key, task):
+        """Retourne le résultat mis en cache (désérialisé) ou None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, input_tokens, output_tokens FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count(task, "misses")
+                return None
+            self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            counters = self._count(task, "hits")
+            counters["tokens_saved"] += row[1] + row[2]
+        return json.loads(row[0])
+
+    def set(self, key, task, model, value, usage=(0, 0)):
+        serialized = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, task, model, serialized, usage[0], usage[1], len(serialized.encode("utf-8")), now, now),
+            )
+            self._db.commit()
+        self.evict()
+
+    #-------------------- Maintenance --------------------#
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def evict(self):
+        """Évince les résultats les moins récemment utilisés jusqu'à repasser sous max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            rows = self._db.execute("SELECT key, size FROM results ORDER BY last_access").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            self._db.commit()
+        return evicted
+
+    def purge(self, task=None, older_than=None):
+        """Supprime tous les résultats, ou ceux d'une tâche / plus vieux que older_than secondes."""
+        clauses, params = [], []
+        if task:
+            clauses.append("task = ?")
+            params.append(task)
+        if older_than is not None:
+            clauses.append("stored_at < ?")
+            params.append(time.time() - older_than)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            removed = self._db.execute(f"DELETE FROM results {where}", params).rowcount
+            self._db.commit()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT task, COUNT(*), COALESCE(SUM(size), 0) FROM results GROUP BY task"
+            ).fetchall()
+            counters = {task: dict(values) for task, values in self._counters.items()}
+        hits = sum(values["hits"] for values in counters.values())
+        misses = sum(values["misses"] for values in counters.values())
+        return {
+            "entries": sum(count for _, count, _ in rows),
+            "bytes": sum(size for _, _, size in rows),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "tokens_saved": sum(values["tokens_saved"] for values in counters.values()),
+            "per_task": {task: {"entries": count, "bytes": size, **counters.get(task, {})}
+                         for task, count, size in rows},
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspecter ou purger le cache des résultats LLM.")
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Taille et nombre de résultats par tâche")
+
+    purge_parser = subparsers.add_parser("purge", help="Supprimer des résultats")
+    purge_parser.add_argument("--task", help="classify, summary, critique ou combined")
+    purge_parser.add_argument("--older-than", type=float, metavar="JOURS",
+                              help="Ne supprimer que les résultats stockés il y a plus de JOURS jours")
+
+    args = parser.parse_args()
+    cache = LlmCache(args.path)
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"📦 {stats['entries']} résultats, {stats['bytes'] / 1e6:.1f} Mo / {stats['max_bytes'] / 1e6:.0f} Mo")
+        for task, values in sorted(stats["per_task"].items()):
+            print(f"   - {task}: {values['entries']} résultats, {values['bytes'] / 1e6:.2f} Mo")
+    elif args.command == "purge":
+        older_than = args.older_than * 24 * 3600 if args.older_than is not None else None
+        removed = cache.purge(task=args.task, older_than=older_than)
+        print(f"🗑️ {removed} résultats supprimés.")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
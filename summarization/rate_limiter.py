@@ -0,0 +1,115 @@
+import asyncio
+import re
+import time
+
+# Seuils en dessous desquels on ralentit avant de recevoir des 429
+LOW_REMAINING_RATIO = 0.1  # part restante du quota (requêtes ou tokens) de la fenêtre courante
+DEFAULT_RETRY_AFTER = 2.0  # secondes d'attente après un 429 sans indication du serveur
+MAX_RETRY_AFTER = 60.0
+
+
+def parse_duration(value):
+    """Convertit une durée d'en-tête OpenAI ("1s", "6m0s", "120ms", "0.5") en secondes, None si illisible."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrency:
+    """
+    Limite de concurrence asyncio qui s'adapte aux quotas du fournisseur LLM.
+
+    Augmentation additive (+1 après une « fenêtre » de succès) jusqu'à maximum,
+    diminution multiplicative (÷2) et pause globale sur un 429. Les en-têtes
+    x-ratelimit-remaining-requests / -tokens font baisser la limite avant le 429.
+    """
+
+    def __init__(self, initial=4, maximum=32, minimum=1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.active = 0
+        self.rate_limited = 0
+        self.peak = self.limit
+        self._successes = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    # Le verrou est relâché pendant la pause ; on revérifie au réveil
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.active < self.limit:
+                    break
+                await self._condition.wait()
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def _set_limit(self, limit):
+        self.limit = max(self.minimum, min(self.maximum, limit))
+        self.peak = max(self.peak, self.limit)
+
+    async def on_success(self, headers=None):
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        async with self._condition:
+            remaining = [
+                (_header_int(headers, f"x-ratelimit-remaining-{kind}"), _header_int(headers, f"x-ratelimit-limit-{kind}"))
+                for kind in ("requests", "tokens")
+            ]
+            if any(left is not None and total and left < total * LOW_REMAINING_RATIO for left, total in remaining):
+                # Quota presque épuisé : on réduit la concurrence et on attend la réinitialisation
+                self._set_limit(self.limit - 1)
+                resets = [parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) for kind in ("requests", "tokens")]
+                resets = [reset for reset in resets if reset]
+                if resets:
+                    self._paused_until = max(self._paused_until, time.monotonic() + min(min(resets), MAX_RETRY_AFTER))
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self._set_limit(self.limit + 1)
+                    self._successes = 0
+            self._condition.notify_all()
+
+    async def on_rate_limited(self, headers=None):
+        """Un 429 a été reçu : divise la limite par deux et suspend les envois. Retourne l'attente appliquée."""
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        delays = [parse_duration(headers.get(name))
+                  for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+        delay = next((delay for delay in delays if delay), DEFAULT_RETRY_AFTER)
+        delay = min(delay, MAX_RETRY_AFTER)
+        async with self._condition:
+            self.rate_limited += 1
+            self._set_limit(self.limit // 2)
+            self._successes = 0
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._condition.notify_all()
+        return delay
@@ -1,31 +1,59 @@
 from langchain_ollama import OllamaLLM
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal
 import processing.data_extractor as d_ex
+from summarization.llm_cache import LlmCache, DEFAULT_CACHE_PATH, template_version
+from summarization.chunking import token_budget, chunk_text, truncate_to_budget, CHUNK_TOKENS, MAX_REDUCE_ROUNDS
+from summarization.token_counter import count_tokens
+from summarization.rate_limiter import AdaptiveConcurrency
+from summarization.fast_classifier import FastClassifier, DEFAULT_MODEL_DIR, CONFIDENCE_THRESHOLD
 import openai
+import asyncio
+import httpx
+import json
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env.local")
 API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # optionnel (proxy, serveur compatible OpenAI)
 
+OPENAI_MODEL = "gpt-4o-mini"  # Use "gpt-4" if desired
+OLLAMA_MODEL = "llama3.2"
+TEMPERATURE = 0.5  # Controls the randomness of the output
 
-def classify_document(data, gpt = True) -> str:
+# Pool de connexions HTTP partagé par tous les clients LLM
+LLM_MAX_CONNECTIONS = 20
+LLM_MAX_KEEPALIVE = 10
+LLM_TIMEOUT = 120
+# Transport httpx du client OpenAI synchrone (None : réseau) ; les benchmarks y branchent une cassette
+LLM_HTTP_TRANSPORT = None
 
-    if gpt:
-        model = ChatOpenAI(
-            model="gpt-4o-mini",  # Use "gpt-4" if desired
-            temperature=0.5,  # Controls the randomness of the output
-            openai_api_key=API_KEY
-        )
-    else:
-        model = OllamaLLM(model="llama3.2")
+# Cache persistant des résultats, partagé par le pipeline et l'application Streamlit
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = DEFAULT_CACHE_PATH
 
-    template = """
-    You are given this document: {text}
+# Classifieur local essayé avant le LLM (voir summarization/fast_classifier.py)
+USE_FAST_CLASSIFIER = True
+FAST_CLASSIFIER_DIR = DEFAULT_MODEL_DIR
+FAST_CLASSIFIER_THRESHOLD = CONFIDENCE_THRESHOLD
 
-    Classify the document between these different classes: Model, Method, Dataset, Library, Tips and Tricks, Pedagogy.
+# Parties d'un document trop long résumées en parallèle (voir summarization/chunking.py)
+CHUNK_CONCURRENCY = 4
 
+# Traitement asynchrone par lots : concurrence de départ et plafond, ajustés selon les quotas
+ASYNC_INITIAL_CONCURRENCY = 4
+ASYNC_MAX_CONCURRENCY = 32
+MAX_RATE_LIMIT_RETRIES = 5
+
+CATEGORIES = ("Model", "Method", "Dataset", "Library", "Tips and Tricks", "Pedagogy")
+
+CLASS_DESCRIPTIONS = """
     Here is a description of the different classes:
 
     - Model: You will classify a document as Model if the document present a machine learning model or a new neural network architecture. 
@@ -34,64 +62,29 @@ def classify_document(data, gpt = True) -> str:
     - Library: You will classify a document as a Library if the document present a new library, or module in any programming language. A repository containing a collection of code that can be used to perform a task can be seen as a Library too. 
     - Tips and Tricks: You will classify as Tips and Tricks a document that presents tips about something, tips and tricks are lighter than a whole method.
     - Pedagogy: You will classify as Pedagogy a document that compile information from different source on a subject in order to give pedagogical overview of the concept. A survey on different deep learning approaches to solve a problem, a collection of ressources on a thematic or a course on Deep Learning should be considered as Pedagogy.
+"""
+
+CLASSIFY_TEMPLATE = """
+    You are given this document: {text}
 
+    Classify the document between these different classes: Model, Method, Dataset, Library, Tips and Tricks, Pedagogy.
+""" + CLASS_DESCRIPTIONS + """
     Your answer should only contain the class and nothing else.
 
     Exemple:
     Question: What is the class of this document?
     Answer: Method
     """
-    prompt = ChatPromptTemplate.from_template(template)
-    chain = prompt | model
-
-    summary = chain.invoke({"text": data["content"]})
 
-    if hasattr(summary,'content'):
-        return summary.content, (summary.usage_metadata["input_tokens"],summary.usage_metadata["output_tokens"])
-    
-    return summary, (0,0)
-
-
-def generate_summary(data: str, gpt = True) -> str:
-
-    if gpt:
-        model = ChatOpenAI(
-            model="gpt-4o-mini",  # Use "gpt-4" if desired
-            temperature=0.5,  # Controls the randomness of the output
-            openai_api_key=API_KEY
-        )
-    else:
-        model = OllamaLLM(model="llama3.2")
-
-    template = """
+SUMMARY_TEMPLATE = """
     Summarize the following text: {text}
 
     Your summary should follow this structure: At first, explain the context of the document, what the document is about.
     Then, make bullet points summarizing the principal topics of the document. It could be about the model used, the method used, the results or other topics you consider relevent.
     The summary should be very concise: maximum 150 words
     """
-    prompt = ChatPromptTemplate.from_template(template)
-    chain = prompt | model
-
-    summary = chain.invoke({"text": data["content"]})
 
-    if hasattr(summary,'content'):
-        return summary.content, (summary.usage_metadata["input_tokens"],summary.usage_metadata["output_tokens"])
-    
-    return summary, (0,0)
-
-def criticize_summary(data,summary: str, gpt=True) -> str:
-    
-    if gpt:
-        model = ChatOpenAI(
-            model="gpt-4o-mini",  # Use "gpt-4" if desired
-            temperature=0.5,  # Controls the randomness of the output
-            openai_api_key=API_KEY
-        )
-    else:
-        model = OllamaLLM(model="llama3.2")
-        
-    template = """
+CRITIQUE_TEMPLATE = """
     You are an agent trained to criticize an AI generated summary of a text.
     The original text is here: {text}
     And the summary is here: {summary}
@@ -104,12 +97,786 @@ def criticize_summary(data,summary: str, gpt=True) -> str:
     For each axis, give a grade from 1 to 10, explaining possible improvement. For the correctness. Flag every piece of info that either doesn't appear or contradicts the original text.
     At the end, give a general grade, from 1 to 10 to the summary.
     """
-    prompt = ChatPromptTemplate.from_template(template)
-    chain = prompt | model
 
-    review = chain.invoke({"text": data["content"], "summary": summary})
+# Classification + résumé + mots-clés en une seule requête (sortie structurée)
+COMBINED_TEMPLATE = """
+    You are given this document: {text}
+
+    1. Classify the document between these different classes: Model, Method, Dataset, Library, Tips and Tricks, Pedagogy.
+""" + CLASS_DESCRIPTIONS + """
+    2. Summarize the document: At first, explain the context of the document, what the document is about.
+    Then, make bullet points summarizing the principal topics of the document. It could be about the model used, the method used, the results or other topics you consider relevent.
+    The summary should be very concise: maximum 150 words
+
+    3. Give between 3 and 6 short topic keywords describing the document.
+    """
+
+# Les modèles sans sortie structurée (Ollama) reçoivent le schéma JSON attendu dans le prompt
+JSON_INSTRUCTIONS = """
+    Answer only with a JSON object with the keys "category", "take_away" and "keywords", and nothing else.
+    """
+
+# Résumé d'une partie d'un document trop long pour le budget de tokens du modèle
+CHUNK_TEMPLATE = """
+    You are given part {part} of {parts} of a longer document: {text}
+
+    Summarize this part in a few sentences. Keep the key facts: what is presented, the method, the results and the numbers that matter.
+    Do not add any introduction or conclusion of your own.
+    """
+
+TEMPLATES = {
+    "classify": CLASSIFY_TEMPLATE,
+    "summary": SUMMARY_TEMPLATE,
+    "critique": CRITIQUE_TEMPLATE,
+    "combined": COMBINED_TEMPLATE,
+    "chunk": CHUNK_TEMPLATE,
+}
+
+# Tâches dont le contenu est condensé par parties quand il dépasse le budget du modèle
+CONDENSED_TASKS = ("summary", "combined")
+
+
+class ClassifiedSummary(BaseModel):
+    """Category, take-away and topic keywords of a document."""
+
+    category: Literal[CATEGORIES] = Field(description="Class of the document")
+    take_away: str = Field(description="Summary of the document, maximum 150 words")
+    keywords: List[str] = Field(description="Between 3 and 6 short topic keywords")
+
+# Registre des clients et des chaînes, partagé entre threads
+_registry_lock = threading.Lock()
+_http_clients = {}
+_llm_cache = None
+_fast_classifier = None
+_models = {}
+_chains = {}
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "setup_seconds": 0.0, "request_seconds": 0.0, "models_built": 0, "chains_built": 0,
+          "input_tokens": 0, "output_tokens": 0, "structured_fallbacks": 0, "chunked_documents": 0, "chunks": 0, "fast_classifications": 0,
+          "streams": 0, "ttft_seconds": 0.0}
+
+
+def _get_http_clients():
+    """Clients httpx (sync et async) partagés par tous les modèles OpenAI."""
+    if not _http_clients:
+        limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE)
+        _http_clients["sync"] = httpx.Client(limits=limits, timeout=LLM_TIMEOUT, transport=LLM_HTTP_TRANSPORT)
+        _http_clients["async"] = httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT)
+    return _http_clients["sync"], _http_clients["async"]
+
+
+def get_llm_cache():
+    """Cache des résultats LLM partagé (None s'il est désactivé)."""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _registry_lock:
+            if _llm_cache is None:
+                _llm_cache = LlmCache(LLM_CACHE_PATH)
+    return _llm_cache
+
+
+def get_fast_classifier():
+    """Classifieur local (chargé une fois), None s'il est désactivé ou qu'aucun modèle n'a été entraîné."""
+    global _fast_classifier
+    if not USE_FAST_CLASSIFIER:
+        return None
+    if _fast_classifier is None:
+        with _registry_lock:
+            if _fast_classifier is None:
+                # False : aucun modèle disponible, inutile de rechercher l'artefact à chaque appel
+                _fast_classifier = FastClassifier.load(FAST_CLASSIFIER_DIR) or False
+    return _fast_classifier or None
+
+
+def _fast_classify(content):
+    """Catégorie prédite localement si le classifieur est assez confiant, sinon None."""
+    classifier = get_fast_classifier()
+    if classifier is None or not content:
+        return None
+    category, confidence = classifier.predict(content)
+    if confidence < FAST_CLASSIFIER_THRESHOLD:
+        return None
+    with _stats_lock:
+        _stats["fast_classifications"] += 1
+    return category
+
+
+def _model_key(gpt):
+    return ("openai", OPENAI_MODEL, TEMPERATURE) if gpt else ("ollama", OLLAMA_MODEL, None)
+
+
+def _build_model(provider, model_name, temperature):
+    if provider == "openai":
+        http_client, http_async_client = _get_http_clients()
+        return ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            openai_api_key=API_KEY,
+            base_url=OPENAI_BASE_URL,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            stream_usage=True,  # usage des tokens dans le dernier morceau des réponses en streaming
+        )
+    return OllamaLLM(
+        model=model_name,
+        temperature=temperature,
+        client_kwargs={"limits": httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                              max_keepalive_connections=LLM_MAX_KEEPALIVE)},
+    )
+
+
+def get_model(gpt=True):
+    """Retourne le client LLM partagé pour ce fournisseur / modèle / température (créé au premier appel)."""
+    key = _model_key(gpt)
+    model = _models.get(key)
+    if model is None:
+        with _registry_lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = _build_model(*key)
+                with _stats_lock:
+                    _stats["models_built"] += 1
+    return model
+
+
+def _build_chain(task, model, gpt):
+    if task == "combined_stream":
+        # Réponse JSON en texte brut, diffusable au fil des tokens (voir stream_classify_and_summarize)
+        if gpt:
+            model = model.bind(response_format={"type": "json_object"})
+        return ChatPromptTemplate.from_template(COMBINED_TEMPLATE + JSON_INSTRUCTIONS) | model
+    if task != "combined":
+        return ChatPromptTemplate.from_template(TEMPLATES[task]) | model
+    if gpt:
+        # Sortie validée contre le schéma ; include_raw conserve l'usage des tokens et l'erreur éventuelle
+        structured = model.with_structured_output(ClassifiedSummary, include_raw=True)
+        return ChatPromptTemplate.from_template(COMBINED_TEMPLATE) | structured
+    return ChatPromptTemplate.from_template(COMBINED_TEMPLATE + JSON_INSTRUCTIONS) | model
+
+
+def get_chain(task, gpt=True):
+    """Retourne la chaîne prompt | modèle compilée pour une tâche (classify, summary, critique)."""
+    key = (task,) + _model_key(gpt)
+    chain = _chains.get(key)
+    if chain is None:
+        model = get_model(gpt)
+        with _registry_lock:
+            chain = _chains.get(key)
+            if chain is None:
+                chain = _chains[key] = _build_chain(task, model, gpt)
+                with _stats_lock:
+                    _stats["chains_built"] += 1
+    return chain
+
+
+def _invoke(task, inputs, gpt):
+    """Exécute une tâche en mesurant séparément la préparation (client, chaîne) et la requête."""
+    start = time.perf_counter()
+    chain = get_chain(task, gpt)
+    ready = time.perf_counter()
+    result = None
+    try:
+        result = chain.invoke(inputs)
+        return result
+    finally:
+        done = time.perf_counter()
+        input_tokens, output_tokens = _usage(result)
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["setup_seconds"] += ready - start
+            _stats["request_seconds"] += done - ready
+            _stats["input_tokens"] += input_tokens
+            _stats["output_tokens"] += output_tokens
+
+
+def _batch(task, inputs_list, gpt, max_concurrency=CHUNK_CONCURRENCY):
+    """Comme _invoke, pour plusieurs entrées envoyées en parallèle (chain.batch)."""
+    start = time.perf_counter()
+    chain = get_chain(task, gpt)
+    ready = time.perf_counter()
+    results = []
+    try:
+        results = chain.batch(inputs_list, config={"max_concurrency": max_concurrency})
+        return results
+    finally:
+        done = time.perf_counter()
+        usages = [_usage(result) for result in results]
+        with _stats_lock:
+            _stats["calls"] += len(inputs_list)
+            _stats["setup_seconds"] += ready - start
+            _stats["request_seconds"] += done - ready
+            _stats["input_tokens"] += sum(usage[0] for usage in usages)
+            _stats["output_tokens"] += sum(usage[1] for usage in usages)
+
+
+def _stream(task, inputs, gpt):
+    """Comme _invoke, en produisant le texte de la réponse au fil des tokens (chain.stream)."""
+    start = time.perf_counter()
+    chain = get_chain(task, gpt)
+    ready = time.perf_counter()
+    first = None
+    input_tokens = output_tokens = 0
+    try:
+        for chunk in chain.stream(inputs):
+            chunk_input, chunk_output = _usage(chunk)
+            input_tokens += chunk_input
+            output_tokens += chunk_output
+            text = chunk.content if hasattr(chunk, "content") else chunk
+            if text:
+                if first is None:
+                    first = time.perf_counter()
+                yield text
+    finally:
+        done = time.perf_counter()
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["streams"] += 1
+            _stats["setup_seconds"] += ready - start
+            _stats["request_seconds"] += done - ready
+            _stats["ttft_seconds"] += (first or done) - ready
+            _stats["input_tokens"] += input_tokens
+            _stats["output_tokens"] += output_tokens
+    return input_tokens, output_tokens
+
+
+def get_llm_stats():
+    """Compteurs des appels LLM : nombre d'appels, temps de préparation vs temps de requête."""
+    with _stats_lock:
+        stats = dict(_stats)
+    calls = stats["calls"] or 1
+    stats["setup_ms_per_call"] = stats["setup_seconds"] * 1000 / calls
+    stats["request_ms_per_call"] = stats["request_seconds"] * 1000 / calls
+    stats["ttft_ms_per_stream"] = stats["ttft_seconds"] * 1000 / (stats["streams"] or 1)
+    return stats
+
+
+def print_llm_stats():
+    stats = get_llm_stats()
+    if stats["fast_classifications"]:
+        print(f"⚡ {stats['fast_classifications']} classification(s) par le modèle local, sans appel LLM")
+    if stats["chunked_documents"]:
+        print(f"✂️ {stats['chunked_documents']} document(s) découpé(s) en {stats['chunks']} parties")
+    print(f"🤖 LLM : {stats['calls']} appels, {stats['models_built']} client(s) et {stats['chains_built']} chaîne(s) construits, "
+          f"préparation {stats['setup_ms_per_call']:.2f} ms/appel, requête {stats['request_ms_per_call']:.0f} ms/appel")
+    if stats["streams"]:
+        print(f"⏱️ Streaming : {stats['streams']} réponse(s), premier token après {stats['ttft_ms_per_stream']:.0f} ms en moyenne")
+    print(f"🪙 Tokens : {stats['input_tokens']} en entrée, {stats['output_tokens']} en sortie"
+          + (f", {stats['structured_fallbacks']} repli(s) sur deux appels" if stats['structured_fallbacks'] else ""))
+    if _llm_cache is not None:
+        cache_stats = _llm_cache.stats()
+        print(f"💾 Cache LLM : {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+              f"({cache_stats['hit_ratio']:.0%}), {cache_stats['tokens_saved']} tokens économisés, "
+              f"{cache_stats['entries']} résultats ({cache_stats['bytes'] / 1e6:.1f} Mo)")
+
+
+def reset_llm_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0.0 if key.endswith("seconds") else 0
+
+
+def reset_llm_clients():
+    """
+    Oublie les clients HTTP, modèles et chaînes construits : les suivants reprennent
+    LLM_HTTP_TRANSPORT et OPENAI_BASE_URL tels qu'ils sont au moment de l'appel.
+    """
+    with _registry_lock:
+        sync_client = _http_clients.pop("sync", None)
+        _http_clients.clear()
+        _models.clear()
+        _chains.clear()
+    if sync_client is not None:
+        sync_client.close()
+
+
+def _usage(result):
+    """(tokens en entrée, tokens en sortie) d'une réponse, (0, 0) si le modèle ne les fournit pas."""
+    if isinstance(result, dict):
+        result = result.get("raw")
+    usage = getattr(result, "usage_metadata", None)
+    if not usage:
+        return 0, 0
+    return usage["input_tokens"], usage["output_tokens"]
+
+
+def _with_usage(result):
+    if hasattr(result,'content'):
+        return result.content, _usage(result)
+
+    return result, (0,0)
+
+
+def _parse_json_answer(text):
+    """Valide la réponse JSON d'un modèle sans sortie structurée (texte autour toléré)."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match is None:
+        raise ValueError("Aucun objet JSON dans la réponse")
+    return ClassifiedSummary.model_validate(json.loads(match.group(0)))
+
+
+_TAKE_AWAY_START = re.compile(r'"take_away"\s*:\s*"')
+
+
+def _partial_take_away(answer):
+    """Valeur de "take_away" déjà reçue dans une réponse JSON incomplète, décodée jusqu'au dernier caractère complet."""
+    match = _TAKE_AWAY_START.search(answer)
+    if match is None:
+        return ""
+    end = match.end()
+    while end < len(answer) and answer[end] != '"':
+        step = 6 if answer.startswith("\\u", end) else 2 if answer[end] == "\\" else 1
+        if end + step > len(answer):
+            break  # séquence d'échappement incomplète
+        end += step
+    try:
+        text = json.loads('"' + answer[match.end():end] + '"', strict=False)
+    except json.JSONDecodeError:
+        return ""  # échappement invalide : rien de plus à afficher, la réponse complète sera validée
+    # Paire de substitution (emoji) coupée entre deux morceaux
+    return text[:-1] if text and "\ud800" <= text[-1] <= "\udbff" else text
+
+
+def _cache_key(cache, task, inputs, gpt):
+    """Clé du cache LLM d'une tâche et nom du modèle (fournisseur/modèle)."""
+    provider, model_name, temperature = _model_key(gpt)
+    template = TEMPLATES[task] + (JSON_INSTRUCTIONS if task == "combined" and not gpt else "")
+    if task in CONDENSED_TASKS:
+        template += CHUNK_TEMPLATE + str(token_budget(model_name))
+    key = cache.make_key(task, template_version(template), f"{provider}/{model_name}", temperature, inputs)
+    return key, f"{provider}/{model_name}"
+
+
+def _cached(task, inputs, gpt, use_cache, compute):
+    """
+    Sert le résultat d'une tâche depuis le cache LLM, ou l'obtient avec compute() et le stocke.
+
+    Args:
+        compute: Fonction retournant (résultat, (tokens en entrée, tokens en sortie))
+        use_cache: False pour forcer un nouvel appel (le résultat remplace alors celui du cache)
+
+    Returns:
+        tuple: (résultat, usage) ; l'usage vaut (0, 0) quand le résultat vient du cache
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return compute()
+
+    key, model = _cache_key(cache, task, inputs, gpt)
+    if use_cache:
+        value = cache.get(key, task)
+        if value is not None:
+            return value, (0, 0)
+
+    value, usage = compute()
+    cache.set(key, task, model, value, usage)
+    return value, usage
+
+
+def _condense(content, gpt):
+    """
+    Garde le contenu tel quel s'il tient dans le budget de tokens du modèle ; sinon le découpe
+    aux frontières de sections, résume les parties en parallèle et retourne leurs résumés
+    mis bout à bout, sur lesquels la tâche finale (réduction) est ensuite appliquée.
+    Si ces résumés dépassent encore le budget, ils sont à leur tour découpés et résumés,
+    au plus MAX_REDUCE_ROUNDS fois ; au-delà (ou si une passe ne réduit plus rien), le
+    texte est tronqué au budget.
+
+    Returns:
+        tuple: (texte à envoyer, usage des résumés partiels, rapport ou None si non découpé)
+    """
+    model_name = _model_key(gpt)[1]
+    document_tokens = count_tokens(content, model_name)
+    budget = token_budget(model_name)
+    if document_tokens <= budget:
+        return content, (0, 0), None
+
+    start = time.perf_counter()
+    condensed, condensed_tokens = content, document_tokens
+    usage, chunk_count, rounds, truncated, stalled = (0, 0), 0, 0, False, False
+    while condensed_tokens > budget:
+        if rounds == MAX_REDUCE_ROUNDS or stalled:
+            condensed, truncated = truncate_to_budget(condensed, budget, model_name), True
+            condensed_tokens = count_tokens(condensed, model_name)
+            break
+        chunks = chunk_text(condensed, min(CHUNK_TOKENS, budget), model_name)
+        results = _batch("chunk", [{"text": chunk, "part": i + 1, "parts": len(chunks)}
+                                   for i, chunk in enumerate(chunks)], gpt)
+        partials = [_with_usage(result) for result in results]
+        text = "\n\n".join(f"Part {i + 1}: {summary}" for i, (summary, _) in enumerate(partials))
+        usage = (usage[0] + sum(u[0] for _, u in partials), usage[1] + sum(u[1] for _, u in partials))
+        chunk_count += len(chunks)
+        rounds += 1
+        text_tokens = count_tokens(text, model_name)
+        # Résumés pas plus courts que leur texte : une nouvelle passe n'y changerait rien
+        stalled = text_tokens >= condensed_tokens
+        condensed, condensed_tokens = text, text_tokens
+
+    with _stats_lock:
+        _stats["chunked_documents"] += 1
+        _stats["chunks"] += chunk_count
+    report = {
+        "document_tokens": document_tokens,
+        "budget": budget,
+        "chunks": chunk_count,
+        "rounds": rounds,
+        "truncated": truncated,
+        "condensed_tokens": condensed_tokens,
+        "map_seconds": time.perf_counter() - start,
+    }
+    return condensed, usage, report
+
+
+def _report_condensed(report, usage, final_usage, seconds):
+    """Affiche, pour un document découpé, la taille de l'appel final par rapport au document et la latence."""
+    rounds = f" en {report['rounds']} passes" if report["rounds"] > 1 else ""
+    truncated = " (tronqué au budget)" if report["truncated"] else ""
+    print(f"✂️ Document de {report['document_tokens']} tokens (budget {report['budget']}) : "
+          f"{report['chunks']} parties résumées en parallèle{rounds} en {report['map_seconds']:.1f}s, "
+          f"appel final{truncated} sur {report['condensed_tokens']} tokens au lieu de {report['document_tokens']}, "
+          f"{usage[0] + final_usage[0]} tokens envoyés au total en {seconds:.1f}s")
+
+
+def _condensed_task(content, gpt, finish):
+    """Applique finish(texte) au contenu, condensé au préalable s'il dépasse le budget du modèle."""
+    start = time.perf_counter()
+    text, map_usage, report = _condense(content, gpt)
+    value, usage = finish(text)
+    if report is None:
+        return value, usage
+    _report_condensed(report, map_usage, usage, time.perf_counter() - start)
+    return value, (map_usage[0] + usage[0], map_usage[1] + usage[1])
+
+
+def classify_document(data, gpt = True, use_cache=True, fast_path=True) -> str:
+    if fast_path:
+        category = _fast_classify(data["content"])
+        if category is not None:
+            return category, (0, 0)
+
+    inputs = {"text": data["content"]}
+    return _cached("classify", inputs, gpt, use_cache, lambda: _with_usage(_invoke("classify", inputs, gpt)))
+
+
+def generate_summary(data: str, gpt = True, use_cache=True) -> str:
+    inputs = {"text": data["content"]}
+    return _cached("summary", inputs, gpt, use_cache, lambda: _condensed_task(
+        data["content"], gpt, lambda text: _with_usage(_invoke("summary", {"text": text}, gpt))
+    ))
 
-    if hasattr(review,'content'):
-        return review.content
-    
+
+def criticize_summary(data,summary: str, gpt=True, use_cache=True) -> str:
+    inputs = {"text": data["content"], "summary": summary}
+    review, _ = _cached("critique", inputs, gpt, use_cache, lambda: _with_usage(_invoke("critique", inputs, gpt)))
     return review
+
+
+def _stream_cached(task, inputs, gpt, use_cache, stream, report):
+    """
+    Version streaming de _cached : un résultat en cache est produit d'un bloc, sinon le texte
+    de stream() est relayé au fil de l'eau puis stocké une fois complet.
+
+    Args:
+        stream: Générateur du texte, dont la valeur de retour est l'usage (tokens en entrée, en sortie)
+        report: Dictionnaire complété à la fin : input_tokens, output_tokens, ttft_seconds,
+            total_seconds, cached
+    """
+    start = time.perf_counter()
+    cache = get_llm_cache()
+    if cache is not None:
+        key, model = _cache_key(cache, task, inputs, gpt)
+        value = cache.get(key, task) if use_cache else None
+        if value is not None:
+            report.update(input_tokens=0, output_tokens=0, ttft_seconds=time.perf_counter() - start,
+                          total_seconds=time.perf_counter() - start, cached=True)
+            yield value
+            return
+
+    parts = []
+    first = None
+    generator = stream()
+    while True:
+        try:
+            text = next(generator)
+        except StopIteration as stop:
+            usage = stop.value or (0, 0)
+            break
+        if first is None:
+            first = time.perf_counter()
+        parts.append(text)
+        yield text
+
+    done = time.perf_counter()
+    report.update(input_tokens=usage[0], output_tokens=usage[1], ttft_seconds=(first or done) - start,
+                  total_seconds=done - start, cached=False)
+    if cache is not None:
+        cache.set(key, task, model, "".join(parts), usage)
+
+
+def stream_summary(data, gpt=True, use_cache=True, report=None):
+    """
+    Comme generate_summary, mais produit le résumé au fil des tokens (pour st.write_stream).
+    Un document trop long est d'abord condensé par parties ; seul l'appel final est diffusé.
+
+    Args:
+        report: Dictionnaire complété une fois le flux terminé (usage, TTFT, durée totale)
+    """
+    report = {} if report is None else report
+
+    def stream():
+        start = time.perf_counter()
+        text, map_usage, condensed = _condense(data["content"], gpt)
+        usage = yield from _stream("summary", {"text": text}, gpt)
+        if condensed is not None:
+            _report_condensed(condensed, map_usage, usage, time.perf_counter() - start)
+        return map_usage[0] + usage[0], map_usage[1] + usage[1]
+
+    return _stream_cached("summary", {"text": data["content"]}, gpt, use_cache, stream, report)
+
+
+def stream_critique(data, summary, gpt=True, use_cache=True, report=None):
+    """Comme criticize_summary, mais produit la critique au fil des tokens (voir stream_summary)."""
+    report = {} if report is None else report
+    inputs = {"text": data["content"], "summary": summary}
+    return _stream_cached("critique", inputs, gpt, use_cache, lambda: _stream("critique", inputs, gpt), report)
+
+
+def _structured_answer(inputs, gpt):
+    """Une requête combinée ; lève une exception si la réponse ne respecte pas le schéma."""
+    result = _invoke("combined", inputs, gpt)
+    if gpt:
+        parsed = result["parsed"]
+        if parsed is None:
+            raise ValueError(result.get("parsing_error") or "Réponse non structurée")
+    else:
+        parsed = _parse_json_answer(result.content if hasattr(result, 'content') else result)
+    return [parsed.category, parsed.take_away, parsed.keywords], _usage(result)
+
+
+def classify_and_summarize(data, gpt=True, use_cache=True):
+    """
+    Classifie, résume et extrait les mots-clés d'un document en une seule requête,
+    au lieu d'envoyer deux fois le contenu (classify_document puis generate_summary).
+
+    Si la réponse ne respecte pas le schéma, on se rabat sur les deux appels séparés
+    (les mots-clés sont alors vides).
+
+    Returns:
+        tuple: ((catégorie, take-away, mots-clés), (tokens en entrée, tokens en sortie))
+    """
+    inputs = {"text": data["content"]}
+    try:
+        (category, take_away, keywords), usage = _cached("combined", inputs, gpt, use_cache, lambda: _condensed_task(
+            data["content"], gpt, lambda text: _structured_answer({"text": text}, gpt)
+        ))
+        return (category, take_away, keywords), usage
+    except (ValueError, ValidationError, KeyError, TypeError, openai.LengthFinishReasonError) as e:
+        return _separate_calls(data, gpt, use_cache, e)
+
+
+def _separate_calls(data, gpt, use_cache, error):
+    """Repli de classify_and_summarize quand la réponse combinée est invalide : deux appels, sans mots-clés."""
+    print(f"⚠️ Sortie structurée invalide ({error}), repli sur deux appels")
+    with _stats_lock:
+        _stats["structured_fallbacks"] += 1
+    category, (class_in, class_out) = classify_document(data, gpt, use_cache)
+    take_away, (summary_in, summary_out) = generate_summary(data, gpt, use_cache)
+    return (category, take_away, []), (class_in + summary_in, class_out + summary_out)
+
+
+def stream_classify_and_summarize(data, gpt=True, use_cache=True, report=None):
+    """
+    Comme classify_and_summarize, mais produit le take-away au fil des tokens (pour st.write_stream) :
+    la réponse JSON est diffusée et la valeur de "take_away" en est extraite au fur et à mesure.
+    Le résultat partage le cache de classify_and_summarize. Un document trop long est d'abord
+    condensé par parties ; seul l'appel final est diffusé.
+
+    Args:
+        report: Dictionnaire complété une fois le flux terminé : category, take_away, keywords,
+            input_tokens, output_tokens, ttft_seconds, total_seconds, cached
+    """
+    report = {} if report is None else report
+    start = time.perf_counter()
+    cache = get_llm_cache()
+    if cache is not None:
+        key, model = _cache_key(cache, "combined", {"text": data["content"]}, gpt)
+        value = cache.get(key, "combined") if use_cache else None
+        if value is not None:
+            category, take_away, keywords = value
+            report.update(category=category, take_away=take_away, keywords=keywords, input_tokens=0,
+                          output_tokens=0, ttft_seconds=time.perf_counter() - start,
+                          total_seconds=time.perf_counter() - start, cached=True)
+            yield take_away
+            return
+
+    text, map_usage, condensed = _condense(data["content"], gpt)
+    parts = []
+    shown = ""
+    first = None
+    generator = _stream("combined_stream", {"text": text}, gpt)
+    while True:
+        try:
+            parts.append(next(generator))
+        except StopIteration as stop:
+            usage = stop.value or (0, 0)
+            break
+        take_away = _partial_take_away("".join(parts))
+        if len(take_away) > len(shown) and take_away.startswith(shown):
+            if first is None:
+                first = time.perf_counter()
+            yield take_away[len(shown):]
+            shown = take_away
+    if condensed is not None:
+        _report_condensed(condensed, map_usage, usage, time.perf_counter() - start)
+    usage = (map_usage[0] + usage[0], map_usage[1] + usage[1])
+
+    try:
+        parsed = _parse_json_answer("".join(parts))
+        category, take_away, keywords = parsed.category, parsed.take_away, parsed.keywords
+        if cache is not None:
+            cache.set(key, "combined", model, [category, take_away, keywords], usage)
+    except (ValueError, ValidationError) as e:
+        (category, take_away, keywords), fallback_usage = _separate_calls(data, gpt, use_cache, e)
+        usage = (usage[0] + fallback_usage[0], usage[1] + fallback_usage[1])
+        if not shown:
+            yield take_away
+
+    done = time.perf_counter()
+    report.update(category=category, take_away=take_away, keywords=keywords, input_tokens=usage[0],
+                  output_tokens=usage[1], ttft_seconds=(first or done) - start, total_seconds=done - start,
+                  cached=False)
+
+
+#-------------------- Traitement asynchrone par lots --------------------#
+
+def _build_async_chain(task, gpt):
+    """
+    Chaîne dédiée à un lot asynchrone : sans nouvelle tentative automatique du SDK (les 429
+    doivent remonter au limiteur) et avec les en-têtes de quota dans la réponse. Le client
+    async est lié à la boucle d'événements du lot, il est donc créé pour le lot.
+    """
+    provider, model_name, temperature = _model_key(gpt)
+    if provider == "openai":
+        http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONCURRENCY, max_keepalive_connections=ASYNC_MAX_CONCURRENCY),
+            timeout=LLM_TIMEOUT,
+        )
+        model = ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            openai_api_key=API_KEY,
+            base_url=OPENAI_BASE_URL,
+            max_retries=0,
+            include_response_headers=True,
+            http_async_client=http_async_client,
+        )
+    else:
+        http_async_client = None
+        model = OllamaLLM(model=model_name, temperature=temperature)
+    return ChatPromptTemplate.from_template(TEMPLATES[task]) | model, http_async_client
+
+
+def _rate_limit_headers(error):
+    """En-têtes d'une erreur 429 (None si l'erreur n'est pas un dépassement de quota)."""
+    if isinstance(error, openai.RateLimitError):
+        return dict(error.response.headers) if error.response is not None else {}
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return dict(response.headers)
+    return None
+
+
+async def _ainvoke_adaptive(chain, inputs, limiter):
+    """Un appel sous le limiteur adaptatif, relancé après les 429."""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                result = await chain.ainvoke(inputs)
+            except Exception as e:
+                headers = _rate_limit_headers(e)
+                if headers is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+            else:
+                input_tokens, output_tokens = _usage(result)
+                with _stats_lock:
+                    _stats["calls"] += 1
+                    _stats["request_seconds"] += time.perf_counter() - start
+                    _stats["input_tokens"] += input_tokens
+                    _stats["output_tokens"] += output_tokens
+                await limiter.on_success(getattr(result, "response_metadata", {}).get("headers"))
+                return result
+        # Hors du limiteur : l'emplacement est libéré pendant l'attente imposée par le 429
+        await limiter.on_rate_limited(headers)
+
+
+async def _arun_batch(task, documents, gpt, use_cache, max_concurrency, limiter):
+    """
+    Exécute une tâche (classify ou summary) sur tous les documents avec une concurrence bornée
+    et adaptative.
+
+    Returns:
+        list: Un (résultat, erreur) par document, dans l'ordre d'entrée ; résultat = (contenu, usage)
+    """
+    limiter = limiter or AdaptiveConcurrency(min(ASYNC_INITIAL_CONCURRENCY, max_concurrency), max_concurrency)
+    chain, http_async_client = _build_async_chain(task, gpt)
+    cache = get_llm_cache()
+    model_name = _model_key(gpt)[1]
+
+    async def run(data):
+        inputs = {"text": data["content"]}
+        if task == "classify":
+            category = _fast_classify(data["content"])
+            if category is not None:
+                return category, (0, 0)
+        if task == "summary" and count_tokens(data["content"], model_name) > token_budget(model_name):
+            # Document à découper : chemin synchrone habituel (map-reduce), hors de la boucle
+            async with limiter:
+                return await asyncio.to_thread(generate_summary, data, gpt, use_cache)
+
+        if cache is not None:
+            key, model = _cache_key(cache, task, inputs, gpt)
+            if use_cache:
+                value = cache.get(key, task)
+                if value is not None:
+                    return value, (0, 0)
+        value, usage = _with_usage(await _ainvoke_adaptive(chain, inputs, limiter))
+        if cache is not None:
+            cache.set(key, task, model, value, usage)
+        return value, usage
+
+    async def run_safely(data):
+        try:
+            return await run(data), None
+        except Exception as e:
+            return None, e
+
+    try:
+        return await asyncio.gather(*(run_safely(data) for data in documents))
+    finally:
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+
+async def aclassify_documents(documents, gpt=True, use_cache=True, max_concurrency=ASYNC_MAX_CONCURRENCY, limiter=None):
+    """
+    Classifie plusieurs documents en parallèle, la concurrence s'adaptant aux 429 et aux
+    en-têtes de quota (requêtes et tokens par minute).
+
+    Returns:
+        list: (résultat, erreur) par document, dans l'ordre d'entrée ; résultat = (catégorie, usage)
+    """
+    return await _arun_batch("classify", documents, gpt, use_cache, max_concurrency, limiter)
+
+
+async def agenerate_summaries(documents, gpt=True, use_cache=True, max_concurrency=ASYNC_MAX_CONCURRENCY, limiter=None):
+    """
+    Résume plusieurs documents en parallèle, la concurrence s'adaptant aux 429 et aux
+    en-têtes de quota (requêtes et tokens par minute).
+
+    Returns:
+        list: (résultat, erreur) par document, dans l'ordre d'entrée ; résultat = (résumé, usage)
+    """
+    return await _arun_batch("summary", documents, gpt, use_cache, max_concurrency, limiter)
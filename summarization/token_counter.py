@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_MODEL = "gpt-4o-mini"
+CHARS_PER_TOKEN = 4  # estimation utilisée quand tiktoken n'est pas disponible
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Modèles inconnus de tiktoken (llama3.2 via Ollama...) : encodage des modèles OpenAI récents
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Fichier d'encodage non téléchargeable (hors ligne) : on se rabat sur l'estimation
+        return None
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Compte localement les tokens d'un texte pour un modèle donné (estimation si tiktoken est absent)."""
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
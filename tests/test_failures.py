@@ -0,0 +1,41 @@
+import requests
+
+import ai_summary_pipeline as pipeline
+from processing.data_extractor import DataExtractor
+from processing.failures import PARSE, PERMANENT, TRANSIENT, classify_failure
+from storage.summary_store import SummaryStore
+
+ARXIV_LINK = "https://arxiv.org/abs/2401.00001"
+
+
+def test_unreadable_pdf_is_a_parse_failure_without_llm_call(tmp_path, monkeypatch):
+    extractor = DataExtractor(use_cache=False)
+    monkeypatch.setattr(extractor, "fetch_arxiv", lambda arxiv_id: {
+        "arxiv_id": arxiv_id,
+        "entry": {"title": "Corrupt", "metadata": {}, "pdf_url": ARXIV_LINK},
+        "pdf": b"%PDF-1.4 truncated",
+    })
+    llm_calls = []
+    for name in ("classify_and_summarize", "classify_document", "generate_summary"):
+        monkeypatch.setattr(pipeline, name, lambda *args, **kwargs: llm_calls.append(args))
+
+    store = SummaryStore(str(tmp_path / "summaries.sqlite"))
+    store.add_links([ARXIV_LINK])
+    pipeline.process_documents(store.pending(), extractor, classifier=None, max_workers=1, checkpoint=store)
+
+    retries = store.scheduled_retries()
+    assert llm_calls == []
+    assert retries["link"].tolist() == [ARXIV_LINK]
+    assert retries["failure_kind"].tolist() == [PARSE]
+    assert retries["attempts"].tolist() == [1]
+    assert store.to_dataframe()["Status"].iloc[0].startswith("Error: Erreur lors de l'extraction du texte PDF")
+    store.close()
+
+
+def test_truncated_download_is_transient():
+    assert classify_failure(requests.exceptions.ChunkedEncodingError("Connection broken"), "fetch") == TRANSIENT
+    assert classify_failure(requests.exceptions.ContentDecodingError("bad gzip"), "fetch") == TRANSIENT
+
+
+def test_invalid_url_stays_permanent():
+    assert classify_failure(requests.exceptions.MissingSchema("no scheme"), "fetch") == PERMANENT
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from storage.summary_store import SummaryStore
+
+
+def test_import_reports_duplicate_links(tmp_path, capsys):
+    csv_file = tmp_path / "summaries.csv"
+    pd.DataFrame({
+        "Link": ["https://a.example", "https://b.example", "https://a.example"],
+        "Take-away (Illuin)": ["first", "other", "last"],
+    }).to_csv(csv_file, index=False)
+
+    store = SummaryStore(str(tmp_path / "summaries.sqlite"))
+    imported = store.import_csv(str(csv_file))
+
+    output = capsys.readouterr().out
+    assert imported == 2
+    assert store.count() == 2
+    assert "1 lien(s) en double" in output
+    assert "https://a.example : lignes 2, 4 -> ligne 4 conservée" in output
+    df = store.to_dataframe().set_index("Link")
+    assert df.at["https://a.example", "Take-away (Illuin)"] == "last"
+    store.close()